@@ -0,0 +1,159 @@
+
+"""
+Runs gaston on the bundled chemical datasets and records, for the parse, node, path, tree
+and cycle phases, the wall time, the peak RSS and the number of patterns found per second.
+
+The search runs level by level, so each phase is timed as the patterns of its graph type are
+found, and every case runs in its own process so its peak RSS is not hidden by earlier cases.
+
+Usage:
+    python benchmarks/bench_gaston.py [-o results.json] [-b baseline.json] [-t 0.25] [-k dataset]
+
+With a baseline, a case regresses if it finds a different number of patterns, or its total
+wall time or peak RSS exceeds the baseline by more than the tolerance.  Wall times within
+MIN_SECONDS of the baseline never regress, so short cases do not flag timer noise.
+Regressions are printed and the exit status is 1.
+"""
+
+import argparse
+import json
+import multiprocessing
+import platform
+import resource
+import sys
+import time
+
+import gaston_py.dataset as dataset
+import gaston_py.factory as factory
+import gaston_py.search as search
+
+# (input file, min support, support counting)
+DATASETS = [
+    ('test_files/small_chemical.txt', 6, 'occurrence'),
+    ('test_files/small_chemical.txt', 3, 'occurrence'),
+    ('test_files/medium_chemical.txt', 0.5, 'transaction'),
+    ('test_files/medium_chemical.txt', 0.3, 'transaction'),
+    ('test_files/Chemical_340.txt', 0.2, 'transaction'),
+    ('test_files/Chemical_340.txt', 0.1, 'transaction'),
+]
+
+# (mode name, dont_generate_cycles, dont_generate_trees), named by their command line flags
+MODES = [('', False, False), ('-c', True, False), ('-t', False, True)]
+
+PHASES = ('parse', 'Node', 'Path', 'Tree', 'Cycle')
+MIN_SECONDS = 0.1
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark gaston on the bundled datasets.')
+    parser.add_argument('-o', '--output', help='File the results are written to as JSON.')
+    parser.add_argument('-b', '--baseline', help='Results of an earlier run to compare with.')
+    parser.add_argument('-t', '--tolerance', type=float, default=0.25,
+                        help='Allowed relative increase of wall time and peak RSS.')
+    parser.add_argument('-k', '--keyword', default='',
+                        help='Only run the cases whose name contains this keyword.')
+    args = parser.parse_args()
+
+    cases = [case for case in _cases() if args.keyword in case_name(*case)]
+    results = {'python': platform.python_version(), 'machine': platform.machine(),
+               'cases': {}}
+
+    for case in cases:
+        name = case_name(*case)
+        results['cases'][name] = result = run_in_process(case)
+        print("{:<42} {:8.3f} s {:8.1f} MB {:6d} patterns".format(
+            name, result['seconds'], result['peak_rss_mb'], result['patterns']))
+
+    if args.output is not None:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2, sort_keys=True)
+
+    if args.baseline is not None:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.tolerance)
+        for regression in regressions:
+            print("REGRESSION: " + regression)
+        if len(regressions) > 0:
+            sys.exit(1)
+
+def case_name(input_file, min_support, support_counting, mode, *_):
+    return ' '.join(part for part in (input_file.split('/')[-1], str(min_support),
+                                      '-e' if support_counting == 'occurrence' else '', mode)
+                    if part != '')
+
+def run_in_process(case):
+    """ Runs a case in a new process and returns its result. """
+    pool = multiprocessing.Pool(1)
+    try:
+        return pool.apply(run_case, case)
+    finally:
+        pool.terminate()
+
+def run_case(input_file, min_support, support_counting, mode,
+             dont_generate_cycles, dont_generate_trees):
+    """
+    Mines a dataset like gaston, timing the parse and each graph type separately.  The time
+    between two patterns is spent finding the second one, so it is added to its graph type.
+    Patterns are found without their networkx graphs, as the command line prints them.
+    """
+    phases = {phase: {'seconds': 0.0, 'patterns': 0, 'peak_rss_mb': 0.0} for phase in PHASES}
+
+    start = time.perf_counter()
+    graphs = dataset.load_graphs(input_file)
+    min_frequency = max(int(min_support * len(graphs)), 1)
+    _end_phase(phases['parse'], start)
+
+    frequent_subgraphs = search.iter_frequent_subgraphs(
+        factory.initial_node_fragments(graphs), min_frequency, dont_generate_cycles,
+        dont_generate_trees, support_counting=support_counting, nx_graphs=False)
+
+    phase, found = phases['Node'], time.perf_counter()
+    for _, _, graph_type, _ in frequent_subgraphs:
+        phase = phases[graph_type]
+        phase['patterns'] += 1
+        found = _end_phase(phase, found)
+    # The search ends after the last pattern is refined without finding another
+    _end_phase(phase, found)
+
+    for phase in phases.values():
+        phase['patterns_per_second'] = phase['patterns'] / phase['seconds'] \
+            if phase['seconds'] > 0 else 0.0
+
+    return {'seconds': time.perf_counter() - start, 'peak_rss_mb': _peak_rss_mb(),
+            'patterns': sum(phase['patterns'] for phase in phases.values()),
+            'phases': phases}
+
+def compare(results, baseline, tolerance):
+    """ Returns a description of each case that regressed from the baseline. """
+    regressions = []
+    for name, result in results['cases'].items():
+        if name not in baseline['cases']:
+            continue
+        base = baseline['cases'][name]
+        if result['patterns'] != base['patterns']:
+            regressions.append("{}: found {} patterns, the baseline found {}".format(
+                name, result['patterns'], base['patterns']))
+        for key, unit, slack in (('seconds', 's', MIN_SECONDS), ('peak_rss_mb', 'MB', 0)):
+            if result[key] > max(base[key] * (1 + tolerance), base[key] + slack):
+                regressions.append("{}: {:.3f} {} against {:.3f} {} in the baseline".format(
+                    name, result[key], unit, base[key], unit))
+    return regressions
+
+def _cases():
+    return [(input_file, min_support, support_counting) + mode
+            for input_file, min_support, support_counting in DATASETS for mode in MODES]
+
+def _end_phase(phase, start):
+    """ Adds the time since start to a phase and returns the current time. """
+    now = time.perf_counter()
+    phase['seconds'] += now - start
+    phase['peak_rss_mb'] = _peak_rss_mb()
+    return now
+
+def _peak_rss_mb():
+    # ru_maxrss is in kilobytes on Linux and in bytes on macOS
+    peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak_rss / (1 << 20) if sys.platform == 'darwin' else peak_rss / (1 << 10)
+
+if __name__ == '__main__':
+    main()
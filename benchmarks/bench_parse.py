@@ -0,0 +1,53 @@
+
+"""
+Measures the throughput of read_line_graphs on a line graph file, plain and compressed,
+and with several workers.
+
+Usage: python benchmarks/bench_parse.py [line graph file] [repeats]
+"""
+
+import bz2
+import gzip
+import lzma
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+import gaston_py.graph as graph_module
+
+DEFAULT_INPUT_FILE = 'test_files/Chemical_340.txt'
+
+def main():
+    input_file = sys.argv[1] if len(sys.argv) > 1 else DEFAULT_INPUT_FILE
+    repeats = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+    size = os.path.getsize(input_file)
+
+    directory = tempfile.mkdtemp()
+    try:
+        cases = [('plain', input_file, 1), ('plain, 2 workers', input_file, 2)]
+        for extension, module in (('.gz', gzip), ('.bz2', bz2), ('.xz', lzma)):
+            file_path = os.path.join(directory, os.path.basename(input_file) + extension)
+            with open(input_file, 'rb') as f, module.open(file_path, 'wb') as compressed:
+                shutil.copyfileobj(f, compressed)
+            cases.append((extension[1:], file_path, 1))
+
+        print("{}: {:.1f} MB".format(input_file, size / 1e6))
+        for name, file_path, workers in cases:
+            seconds = measure(file_path, workers, repeats)
+            print("{:<18} {:8.3f} s {:8.1f} MB/s".format(name, seconds, size / 1e6 / seconds))
+    finally:
+        shutil.rmtree(directory)
+
+def measure(file_path, workers, repeats):
+    """ Returns the fastest time to read the file out of the given number of repeats. """
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        graph_module.read_line_graphs(file_path, workers)
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+if __name__ == '__main__':
+    main()
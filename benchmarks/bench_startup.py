@@ -0,0 +1,48 @@
+
+"""
+Measures the startup time of the gaston command line interface against a time budget.
+
+'gaston -h' should only pay for the interpreter and gaston_py itself, and a mining run without
+an output folder should not import networkx or matplotlib.  Exits with status 1 if a budget is exceeded.
+
+Usage: python benchmarks/bench_startup.py [repeats]
+"""
+
+import os
+import subprocess
+import sys
+import time
+
+BUDGETS = [
+    ('gaston -h', ['-h'], 0.25),
+    ('gaston 0.5 medium_chemical.txt', ['0.5', 'test_files/medium_chemical.txt'], 0.5),
+]
+
+def main():
+    repeats = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    command = [sys.executable, os.path.join(os.path.dirname(__file__), '..', 'bin', 'gaston')]
+
+    print("{:<32} {:>8} {:>8}".format('command', 'seconds', 'budget'))
+    print("{:<32} {:8.3f}".format('python -c pass', measure([sys.executable, '-c', 'pass'],
+                                                           repeats)))
+
+    exceeded = False
+    for name, arguments, budget in BUDGETS:
+        seconds = measure(command + arguments, repeats)
+        exceeded = exceeded or seconds > budget
+        print("{:<32} {:8.3f} {:8.3f}{}".format(name, seconds, budget,
+                                                ' exceeded' if seconds > budget else ''))
+
+    sys.exit(1 if exceeded else 0)
+
+def measure(command, repeats):
+    """ Returns the fastest wall time of running the command out of the given repeats. """
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        subprocess.check_call(command, stdout=subprocess.DEVNULL)
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,50 @@
+
+from collections import OrderedDict
+
+class LRUCache(object):
+    """
+    A size-bounded mapping that evicts its least recently used entry when it is full.
+
+    hits: the number of lookups that found an entry
+    misses: the number of lookups that did not
+    """
+
+    def __init__(self, maxsize):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    def get(self, key, default=None):
+        """ Returns the entry for key and marks it as recently used, or default. """
+        entries = self._entries
+        if key in entries:
+            self.hits += 1
+            entries.move_to_end(key)
+            return entries[key]
+
+        self.misses += 1
+        return default
+
+    def put(self, key, value):
+        entries = self._entries
+        entries[key] = value
+        entries.move_to_end(key)
+        if len(entries) > self.maxsize:
+            entries.popitem(last=False)
+
+    def clear(self):
+        """ Removes all entries and resets the counters. """
+        self._entries.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def info(self):
+        """ Returns (hits, misses, maxsize, size), like functools.lru_cache. """
+        return self.hits, self.misses, self.maxsize, len(self._entries)
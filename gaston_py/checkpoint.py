@@ -0,0 +1,118 @@
+# A checkpoint file starts with a pickled dictionary holding a key of the search it belongs
+# to, the level being mined, the border, the length of the queue of each level and how much
+# of the outputs file holds output found before the checkpoint.  The fragments waiting in the
+# queues follow, pickled one at a time with their occurrences packed as (graph index, nodes,
+# edges), so queues spilled to disk are never all in memory.  It is written to a temporary
+# file first, so a search killed while saving keeps the last one.
+#
+# The output goes to a separate outputs file next to it, as pickled (embedding list, nodes,
+# edges, graph type, frequency) tuples.  Each checkpoint only appends the output found since
+# the last one, and anything past the saved length, written by a search killed while saving,
+# is overwritten when the resumed search saves.
+import os
+import pickle
+
+FORMAT = 'gaston checkpoint'
+VERSION = 2
+
+# The number of fragments mined between two checkpoints, besides those at the end of levels
+CHECKPOINT_INTERVAL = 10000
+
+class Checkpoint(object):
+    """
+    Where and how often a level-order search saves its state, so a search that is stopped
+    can be resumed with the same output as if it had not been.  Passed as checkpoint to gaston
+    or find_frequent_subgraphs.
+
+    file_path: the checkpoint file, removed when the search ends along with its outputs file,
+        file_path + '.outputs'
+    interval: the number of fragments mined between two checkpoints.  A checkpoint is also
+        saved at the end of each level.
+    resume: a flag specifying whether to resume from the checkpoint file if it exists
+    saved: the number of checkpoints saved so far
+    """
+
+    def __init__(self, file_path, interval=CHECKPOINT_INTERVAL, resume=False):
+        if interval < 1:
+            raise ValueError("The checkpoint interval must be at least 1.")
+        self.file_path = file_path
+        self.interval = interval
+        self.resume = resume
+        self.saved = 0
+        self.outputs_path = file_path + '.outputs'
+        # The length of the output saved in the outputs file
+        self._outputs_end = 0
+
+    def load(self, key):
+        """
+        Returns the state saved for the search identified by key, or None if there is no
+        checkpoint file to resume from.
+
+        Returns:
+            a tuple (state, outputs, packed_fragments), where outputs is an iterator of the
+            saved output and packed_fragments one of (queue index, packed fragment) in queue
+            order, both reading their file as they are iterated
+        """
+        if not self.resume or not os.path.exists(self.file_path):
+            return None
+
+        with open(self.file_path, 'rb') as f:
+            try:
+                contents = pickle.load(f)
+            except (pickle.UnpicklingError, EOFError, ValueError):
+                contents = None
+            offset = f.tell()
+
+        if not isinstance(contents, dict) or contents.get('format') != FORMAT:
+            raise ValueError("'{}' is not a gaston checkpoint file.".format(self.file_path))
+        if contents['version'] != VERSION or contents['key'] != key:
+            raise ValueError("The checkpoint file '{}' was saved by a different search, so it "
+                             "can not be resumed.".format(self.file_path))
+        self._outputs_end = contents['outputs_end']
+        return (contents['state'], _read_outputs(self.outputs_path, self._outputs_end),
+                _read_fragments(self.file_path, offset, contents['queue_lengths']))
+
+    def save(self, key, state, queues, pack, new_outputs):
+        """
+        Saves the state of the search identified by key and the fragments of its queues,
+        packed by pack, replacing the last checkpoint, and appends new_outputs, the
+        (embedding list, nodes, edges, graph type, frequency) of each subgraph output since
+        the last checkpoint, to the outputs file.
+        """
+        with open(self.outputs_path, 'r+b' if self._outputs_end > 0 else 'wb') as f:
+            f.seek(self._outputs_end)
+            f.truncate()
+            for output in new_outputs:
+                pickle.dump(output, f, pickle.HIGHEST_PROTOCOL)
+            outputs_end = f.tell()
+
+        temporary_path = self.file_path + '.tmp'
+        with open(temporary_path, 'wb') as f:
+            pickle.dump({'format': FORMAT, 'version': VERSION, 'key': key, 'state': state,
+                         'queue_lengths': [len(queue) for queue in queues],
+                         'outputs_end': outputs_end}, f, pickle.HIGHEST_PROTOCOL)
+            for queue in queues:
+                for fragment in queue:
+                    pickle.dump(pack(fragment), f, pickle.HIGHEST_PROTOCOL)
+        os.replace(temporary_path, self.file_path)
+        self._outputs_end = outputs_end
+        self.saved += 1
+
+    def remove(self):
+        for file_path in (self.file_path, self.outputs_path):
+            if os.path.exists(file_path):
+                os.remove(file_path)
+
+def _read_outputs(outputs_path, outputs_end):
+    if outputs_end == 0:
+        return
+    with open(outputs_path, 'rb') as f:
+        while f.tell() < outputs_end:
+            yield pickle.load(f)
+
+def _read_fragments(file_path, offset, queue_lengths):
+    with open(file_path, 'rb') as f:
+        f.seek(offset)
+        for queue_index, queue_length in enumerate(queue_lengths):
+            for _ in range(queue_length):
+                yield queue_index, pickle.load(f)
@@ -2,9 +2,16 @@
 import sys
 import os
 import argparse
+import json
 
+import gaston_py.checkpoint as checkpoint_module
+import gaston_py.dataset as dataset
 import gaston_py.gaston as gaston_alg
 import gaston_py.graph as graph_module
+import gaston_py.index as index_module
+import gaston_py.sampling as sampling
+import gaston_py.search as search
+import gaston_py.stats as stats
 
 DESCRIPTION = 'A command line interface for interacting with the gaston python implementation.'
 
@@ -13,37 +20,192 @@ def main():
     A command line interface for interacting with the gaston python implementation.
     Args:
         min_support: a float or integer
-        input_file_path: file path to a text file in line graph format
+        input_file_path: file path to a text file in line graph format, optionally compressed
+            (.gz, .bz2, .xz), or '-' to read from stdin
         output_folder_path: location to output frequent subgraphs in line graph format and drawings
         dont_generate_cycles: a flag to specify that cycles should not be generated
-        don_generate_trees: a flag to specify that trees should not be generated
+        don_generate_trees: a flag to specify that trees should not be generated, which also
+            leaves out every cycle with a node outside its rings
+        search_order: 'bfs' (level by level) or 'dfs' (one branch at a time, less memory)
+        workers: the number of processes to mine with
+        count_occurrences: a flag to count every occurrence of a subgraph instead of the graphs
+            containing it
+        cache: a dataset file to load instead of parsing the input file again
+        max_drawings: the maximum number of frequent subgraphs to draw
+        top_drawings: only draw the given number of most frequent subgraphs
+        max_edges: the maximum number of edges of a frequent subgraph
+        max_nodes: the maximum number of nodes of a frequent subgraph
+        top_k: only find the given number of most frequent subgraphs
+        closed: a flag to only find subgraphs contained in more graphs than their supergraphs
+        maximal: a flag to only find subgraphs without a frequent supergraph
+        state: a file the state of the run is kept in, so a later run on the input file with
+            graphs appended to it only mines the new graphs
+        checkpoint: a file the search saves its state to, every checkpoint_interval mined
+            subgraphs and at the end of each level
+        resume: a flag to resume the search from the checkpoint file, if it exists
+        memory_limit: megabytes of queued subgraphs kept in memory, beyond which they are
+            written to temporary files
+        sample: the fraction of the graphs to mine at a lowered support, keeping the subgraphs
+            found that are frequent in all graphs, with exact frequencies
+        sample_confidence: the probability with which the sample finds each frequent subgraph
+        seed: the seed of the random sample
+        stats_json: a file to write counters, phase times and peak memory of the search to as JSON
+
+    'gaston convert input_file_path dataset_file_path' writes a line graph file to a binary
+    dataset file, which can be given as the input file path of later runs.
+
+    'gaston sweep input_file_path index_file_path min_support [min_support ...]' mines once at
+    the lowest support and writes every frequent subgraph to a pattern index file, and
+    'gaston query index_file_path --support min_support' answers any support above it from
+    the index.
 
     Examples: 
     gaston 0.95 test_files/medium_chemical.txt -o output_files/ -c -t
-    gaston 6 test_files/medium_chemical.txt
-    gaston 3 test_files/Chemical_340.txt
+    gaston 0.2 test_files/Chemical_340.txt -o output_files/ -w 4 --top_drawings 100
+    gaston 0.5 test_files/medium_chemical.txt
+    gaston 0.2 test_files/Chemical_340.txt
+    gaston 6 test_files/small_chemical.txt -e
+    gaston 0.01 test_files/Chemical_340.txt --top_k 50 --max_edges 6
+    gaston 0.05 test_files/Chemical_340.txt --closed
+    gzip -c test_files/Chemical_340.txt | gaston 0.2 - -w 4
+    gaston convert test_files/Chemical_340.txt Chemical_340.gds
+    gaston 0.2 test_files/Chemical_340.txt --cache Chemical_340.gds
+    gaston 0.2 test_files/Chemical_340.txt --state Chemical_340.state
+    gaston 0.05 test_files/Chemical_340.txt --checkpoint Chemical_340.ckpt --resume
+    gaston 0.02 test_files/Chemical_340.txt --memory_limit 2000
+    gaston 0.2 test_files/Chemical_340.txt --sample 0.8 --sample_confidence 0.85 --seed 1
+    gaston sweep test_files/Chemical_340.txt Chemical_340.idx 0.5 0.2 0.1
+    gaston query Chemical_340.idx --support 0.2 -o output_files/
     """
 
+    commands = {'convert': convert, 'sweep': sweep, 'query': query}
+    if len(sys.argv) > 1 and sys.argv[1] in commands:
+        commands[sys.argv[1]](sys.argv[2:])
+        return
+
     # Parse command line input
     parser = argparse.ArgumentParser(description=DESCRIPTION)
 
     parser.add_argument("min_support", type=float, help='Minimum support for the gaston algorithm.')
     parser.add_argument("input_file_path",
-                        help='Input file path containing graphs in line graph format.')
+                        help='Input file path containing graphs in line graph format, '
+                             'optionally compressed (.gz, .bz2, .xz), or - for stdin.')
     parser.add_argument("-o", "--output_folder_path", help='Ouput location for frequent subgraphs.')
     parser.add_argument("-c", "--dont_generate_cycles", default=False,
                         help='Do not generate cyclic subgraphs.', action="store_true")
     parser.add_argument("-t", "--dont_generate_trees", default=False,
-                        help='Do not generate tree subgraphs.', action="store_true")
+                        help='Do not generate tree subgraphs.  Cycles are then only closed on '
+                             'paths, so only rings without substituents are found.',
+                        action="store_true")
+    parser.add_argument("-s", "--search_order", default='bfs', choices=search.SEARCH_ORDERS,
+                        help='Search level by level (bfs) or one branch at a time (dfs).')
+    parser.add_argument("-w", "--workers", type=int, default=1,
+                        help='Number of processes used for mining.')
+    parser.add_argument("-e", "--count_occurrences", default=False,
+                        help='Count every occurrence of a subgraph, not the graphs containing it.',
+                        action="store_true")
+    parser.add_argument("--cache", dest='cache_file_path',
+                        help='Dataset file written on the first run and loaded on later runs.')
+    parser.add_argument("--max_edges", type=int,
+                        help='Do not refine subgraphs with this many edges.')
+    parser.add_argument("--max_nodes", type=int,
+                        help='Do not add nodes to subgraphs with this many nodes.')
+    parser.add_argument("--top_k", type=int,
+                        help='Only find this many of the most frequent subgraphs, raising the '
+                             'minimum support while searching.')
+    parser.add_argument("--closed", default=False, action="store_true",
+                        help='Only find subgraphs contained in more graphs than each of their '
+                             'supergraphs.')
+    parser.add_argument("--maximal", default=False, action="store_true",
+                        help='Only find subgraphs none of whose supergraphs is frequent.')
+    parser.add_argument("--state", dest='state_file_path',
+                        help='File the state of the run is kept in, so that a later run with '
+                             'graphs appended to the input only mines the new graphs.')
+    parser.add_argument("--checkpoint", dest='checkpoint_file_path',
+                        help='File the level-order search saves its state to, so that it can '
+                             'be resumed with --resume.')
+    parser.add_argument("--checkpoint_interval", type=int,
+                        default=checkpoint_module.CHECKPOINT_INTERVAL,
+                        help='Number of subgraphs mined between two checkpoints, besides the '
+                             'checkpoint at the end of each level.')
+    parser.add_argument("--resume", default=False, action="store_true",
+                        help='Resume from the checkpoint file, if it exists.')
+    parser.add_argument("--memory_limit", type=int,
+                        help='Megabytes of queued subgraphs kept in memory; the others are '
+                             'written to temporary files in TMPDIR.')
+    parser.add_argument("--sample", type=float,
+                        help='Fraction of the graphs to mine at a lowered support; the '
+                             'subgraphs found are counted in the other graphs, and only those '
+                             'frequent in all graphs are kept, so a few may be missed.')
+    parser.add_argument("--sample_confidence", type=float, default=0.99,
+                        help='Probability with which the sample finds each frequent subgraph.')
+    parser.add_argument("--seed", type=int, help='Seed of the random sample.')
+    parser.add_argument("--stats_json", dest='stats_json_path',
+                        help='Write counters, phase times and peak memory of the search to this '
+                             'JSON file.')
+    parser.add_argument("--max_drawings", type=int,
+                        help='Draw at most this many frequent subgraphs.')
+    parser.add_argument("--top_drawings", type=int,
+                        help='Only draw this many of the most frequent subgraphs.')
 
     args = parser.parse_args()
 
     # Validate input
     if args.min_support <= 0:
         raise argparse.ArgumentTypeError("\n\n\t Minimum support must be greater than 0.\n")
-    if not os.path.exists(args.input_file_path):
+    if args.min_support > 1 and not args.count_occurrences:
+        raise argparse.ArgumentTypeError(
+            "\n\n\t Minimum support can only be greater than 1 when counting occurrences (-e).\n")
+    if args.workers < 1:
+        raise argparse.ArgumentTypeError("\n\n\t The number of workers must be at least 1.\n")
+    if args.input_file_path != '-' and not os.path.exists(args.input_file_path):
         raise argparse.ArgumentTypeError(
             "\n\n\t The input file path '{}' does not exist.\n".format(args.input_file_path))
+    if args.input_file_path == '-' and args.cache_file_path is not None:
+        raise argparse.ArgumentTypeError("\n\n\t A cache file can not be used with stdin.\n")
+    if any(limit is not None and limit < 1 for limit in (args.max_edges, args.max_nodes,
+                                                         args.top_k)):
+        raise argparse.ArgumentTypeError(
+            "\n\n\t --max_edges, --max_nodes and --top_k must be at least 1.\n")
+    if (args.closed or args.maximal) and (args.count_occurrences or args.dont_generate_trees):
+        raise argparse.ArgumentTypeError(
+            "\n\n\t --closed and --maximal can not be combined with -e or -t.\n")
+    if args.top_k is not None and (args.maximal or args.count_occurrences):
+        raise argparse.ArgumentTypeError(
+            "\n\n\t --top_k can not be combined with --maximal or -e.\n")
+    if args.state_file_path is not None and (args.count_occurrences or args.top_k is not None or
+                                             args.closed or args.maximal):
+        raise argparse.ArgumentTypeError(
+            "\n\n\t --state can not be combined with -e, --top_k, --closed or --maximal.\n")
+    if args.resume and args.checkpoint_file_path is None:
+        raise argparse.ArgumentTypeError("\n\n\t --resume needs a --checkpoint file.\n")
+    if args.checkpoint_interval < 1:
+        raise argparse.ArgumentTypeError(
+            "\n\n\t The checkpoint interval must be at least 1.\n")
+    if args.checkpoint_file_path is not None and (
+            args.search_order != 'bfs' or args.workers > 1 or args.top_k is not None or
+            args.state_file_path is not None):
+        raise argparse.ArgumentTypeError(
+            "\n\n\t --checkpoint can not be combined with -s dfs, -w, --top_k or --state.\n")
+    if args.memory_limit is not None and (args.memory_limit < 1 or args.search_order != 'bfs' or
+                                          args.workers > 1 or args.top_k is not None):
+        raise argparse.ArgumentTypeError(
+            "\n\n\t --memory_limit must be at least 1, and can not be combined with -s dfs, "
+            "-w or --top_k.\n")
+    if args.sample is not None and (not 0 < args.sample <= 1 or
+                                    not 0 < args.sample_confidence < 1):
+        raise argparse.ArgumentTypeError(
+            "\n\n\t --sample must be in (0, 1], and --sample_confidence in (0, 1).\n")
+    if args.sample is not None and (args.count_occurrences or args.top_k is not None or
+                                    args.closed or args.maximal or
+                                    args.state_file_path is not None or
+                                    args.checkpoint_file_path is not None):
+        raise argparse.ArgumentTypeError(
+            "\n\n\t --sample can not be combined with -e, --top_k, --closed, --maximal, "
+            "--state or --checkpoint.\n")
+    if any(count is not None and count < 0 for count in (args.max_drawings, args.top_drawings)):
+        raise argparse.ArgumentTypeError(
+            "\n\n\t The number of drawings can not be negative.\n")
     if args.output_folder_path is not None and not os.path.exists(args.output_folder_path):
         raise argparse.ArgumentTypeError(
             "\n\n\t The output folder path '{}' does not exist.\n".format(args.output_folder_path))
@@ -56,26 +218,228 @@ def main():
     if args.dont_generate_trees:
         print("Trees will not be generated.")
 
-    frequent_output = gaston_alg.gaston(args.min_support, args.input_file_path,
-                                        args.dont_generate_cycles, args.dont_generate_trees,
-                                        should_print_graph_information=True)
+    if args.count_occurrences:
+        print("Every occurrence of a subgraph will be counted.")
 
-    gaston_alg.print_statistics(frequent_output)
+    if args.maximal:
+        print("Only maximal subgraphs will be found.")
+    elif args.closed:
+        print("Only closed subgraphs will be found.")
 
-    # If a file path to an output folder is provided,
-    # write frequently occurring subgraphs to 'line_graphs.txt' in line graph format.
-    # Also, create a graphs folder if necessary, draw graphs, and save them to a 'graphs' folder.
+    search_stats = stats.SearchStats() if args.stats_json_path is not None else None
+    checkpoint = None
+    if args.checkpoint_file_path is not None:
+        checkpoint = checkpoint_module.Checkpoint(args.checkpoint_file_path,
+                                                  args.checkpoint_interval, args.resume)
+    memory_limit = args.memory_limit << 20 if args.memory_limit is not None else None
+    modes = search.Modes(args.max_edges, args.max_nodes, args.top_k, args.closed, args.maximal)
+    sample = None
+    if args.sample is not None:
+        # The candidates found in the sample are only known to be frequent once all graphs
+        # are counted, so subgraphs are only known once the run ends
+        sample = sampling.Sample(args.sample, args.sample_confidence, args.seed)
+        frequent_output = gaston_alg.gaston(
+            args.min_support, args.input_file_path,
+            args.dont_generate_cycles, args.dont_generate_trees,
+            should_print_graph_information=True,
+            search_order=args.search_order,
+            workers=args.workers,
+            cache_file=args.cache_file_path,
+            stats=search_stats,
+            modes=modes,
+            memory_limit=memory_limit,
+            sample=sample)
+        frequent_subgraphs = ((embedding_list,) + values
+                              for embedding_list, values in frequent_output.items())
+    elif args.state_file_path is not None:
+        # Only the new graphs are mined, so subgraphs are only known once the run ends
+        frequent_output = gaston_alg.gaston(
+            args.min_support, args.input_file_path,
+            args.dont_generate_cycles, args.dont_generate_trees,
+            should_print_graph_information=True,
+            search_order=args.search_order,
+            workers=args.workers,
+            cache_file=args.cache_file_path,
+            stats=search_stats,
+            modes=modes,
+            state_file=args.state_file_path,
+            memory_limit=memory_limit)
+        frequent_subgraphs = ((embedding_list,) + values
+                              for embedding_list, values in frequent_output.items())
+    else:
+        frequent_subgraphs = gaston_alg.iter_frequent_subgraphs(
+            args.min_support, args.input_file_path,
+            args.dont_generate_cycles, args.dont_generate_trees,
+            should_print_graph_information=True,
+            search_order=args.search_order,
+            workers=args.workers,
+            support_counting='occurrence' if args.count_occurrences else 'transaction',
+            cache_file=args.cache_file_path,
+            stats=search_stats,
+            modes=modes,
+            checkpoint=checkpoint,
+            memory_limit=memory_limit,
+            nx_graphs=args.output_folder_path is not None)
+
+    # Subgraphs are printed, written and drawn as they are found, in the order they are found
     if args.output_folder_path is not None:
-        print("\nProcessing output...")
+        frequent_subgraphs = _written(args.output_folder_path, frequent_subgraphs, args.workers,
+                                      args.max_drawings, args.top_drawings)
+
+    gaston_alg.print_statistics(frequent_subgraphs)
+    if sample is not None:
+        _print_sample_report(sample)
+
+    if search_stats is not None:
+        with open(args.stats_json_path, 'w') as f:
+            json.dump(search_stats.as_dict(), f, indent=2, sort_keys=True)
+
+    print("Completed execution of program.\n")
+
+def _written(output_folder_path, frequent_subgraphs, workers, max_drawings, top_drawings):
+    """
+    Yields frequent subgraphs, writing each one to 'line_graphs.txt' in line graph format as it
+    is yielded.  Also, creates a graphs folder if necessary, and draws the subgraphs into it in
+    other processes, finishing the drawings once the last subgraph is yielded.
+    """
+    output_dirname = os.path.dirname(output_folder_path)
+    output_file_path = os.path.join(output_dirname, "line_graphs.txt")
+    graph_drawings_file_path = os.path.join(os.path.dirname(output_folder_path), "graphs", "")
+
+    if not os.path.exists(graph_drawings_file_path):
+        os.makedirs(graph_drawings_file_path)
+
+    import gaston_py.output as output
+    with open(output_file_path, "w") as f, \
+            output.DrawingPool(graph_drawings_file_path, workers, max_drawings,
+                               top_drawings) as drawings:
+        for graph_id, frequent_subgraph in enumerate(frequent_subgraphs):
+            embedding_list, graph, graph_type, frequency = frequent_subgraph
+            graph_module.write_line_graph(f, graph, graph_id)
+            drawings.add(graph_id, embedding_list, graph, graph_type, frequency)
+            yield frequent_subgraph
+
+def _print_sample_report(sample):
+    print("Sample: {} of {} graphs, minimum frequency {}".format(
+        sample.sample_size, sample.graph_count, sample.sample_min_frequency))
+    if sample.exact:
+        print("The sample support was too low to pay off, so all graphs were mined exactly.\n")
+        return
+    print("Candidates: {}, infrequent in all graphs: {}".format(sample.candidates,
+                                                              sample.false_positives))
+    print("Frequent subgraphs found missing from the sample: {}".format(len(sample.missed)))
+    print("Estimated fraction of frequent subgraphs missed: {:.4f}\n".format(
+        sample.estimated_false_negative_rate))
+
+def convert(arguments):
+    """ Parses a line graph file and writes it to a binary dataset file. """
+    parser = argparse.ArgumentParser(prog='gaston convert',
+                                     description='Write line graphs to a binary dataset file.')
+    parser.add_argument("input_file_path", help='Input file path containing line graphs.')
+    parser.add_argument("dataset_file_path", help='Output path of the dataset file.')
 
-        output_dirname = os.path.dirname(args.output_folder_path)
-        output_file_path = os.path.join(output_dirname, "line_graphs.txt")
-        graph_drawings_file_path = os.path.join(os.path.dirname(args.output_folder_path), "graphs", "")
+    args = parser.parse_args(arguments)
 
-        if not os.path.exists(graph_drawings_file_path):
-            os.makedirs(graph_drawings_file_path)
+    if not os.path.exists(args.input_file_path):
+        raise argparse.ArgumentTypeError(
+            "\n\n\t The input file path '{}' does not exist.\n".format(args.input_file_path))
+
+    graphs = graph_module.read_line_graphs(args.input_file_path)
+    dataset.write_dataset(graphs, args.dataset_file_path, args.input_file_path)
+    print("Wrote {} graphs to '{}'.".format(len(graphs), args.dataset_file_path))
+
+def sweep(arguments):
+    """ Mines once at the lowest of several supports and writes a pattern index file. """
+    parser = argparse.ArgumentParser(prog='gaston sweep',
+                                     description='Mine once at the lowest support and write '
+                                                 'the frequent subgraphs to a pattern index.')
+    parser.add_argument("input_file_path",
+                        help='Input file path containing graphs in line graph format, '
+                             'optionally compressed (.gz, .bz2, .xz), or - for stdin.')
+    parser.add_argument("index_file_path", help='Output path of the pattern index file.')
+    parser.add_argument("min_supports", type=float, nargs='+',
+                        help='Minimum supports to report, the lowest of which is mined.')
+    parser.add_argument("-c", "--dont_generate_cycles", default=False,
+                        help='Do not generate cyclic subgraphs.', action="store_true")
+    parser.add_argument("-t", "--dont_generate_trees", default=False,
+                        help='Do not generate tree subgraphs.', action="store_true")
+    parser.add_argument("-s", "--search_order", default='bfs', choices=search.SEARCH_ORDERS,
+                        help='Search level by level (bfs) or one branch at a time (dfs).')
+    parser.add_argument("-w", "--workers", type=int, default=1,
+                        help='Number of processes used for mining.')
+    parser.add_argument("--cache", dest='cache_file_path',
+                        help='Dataset file written on the first run and loaded on later runs.')
+    parser.add_argument("--max_edges", type=int,
+                        help='Do not refine subgraphs with this many edges.')
+    parser.add_argument("--max_nodes", type=int,
+                        help='Do not add nodes to subgraphs with this many nodes.')
+    parser.add_argument("--closed", default=False, action="store_true",
+                        help='Only index subgraphs contained in more graphs than each of their '
+                             'supergraphs.')
+
+    args = parser.parse_args(arguments)
 
-        gaston_alg.write_frequent_subgraphs_to_file_path(output_file_path, frequent_output)
-        graph_module.draw_nx_graphs(graph_drawings_file_path, frequent_output)
+    if any(min_support <= 0 or min_support > 1 for min_support in args.min_supports):
+        raise argparse.ArgumentTypeError("\n\n\t Minimum supports must be in (0, 1].\n")
+    if args.workers < 1:
+        raise argparse.ArgumentTypeError("\n\n\t The number of workers must be at least 1.\n")
+    if args.input_file_path != '-' and not os.path.exists(args.input_file_path):
+        raise argparse.ArgumentTypeError(
+            "\n\n\t The input file path '{}' does not exist.\n".format(args.input_file_path))
+    if args.input_file_path == '-' and args.cache_file_path is not None:
+        raise argparse.ArgumentTypeError("\n\n\t A cache file can not be used with stdin.\n")
+    if any(limit is not None and limit < 1 for limit in (args.max_edges, args.max_nodes)):
+        raise argparse.ArgumentTypeError(
+            "\n\n\t --max_edges and --max_nodes must be at least 1.\n")
+    if args.closed and args.dont_generate_trees:
+        raise argparse.ArgumentTypeError("\n\n\t --closed can not be combined with -t.\n")
 
-    print("Completed execution of program.\n")
\ No newline at end of file
+    index = gaston_alg.sweep(args.min_supports, args.input_file_path, args.index_file_path,
+                             args.dont_generate_cycles, args.dont_generate_trees,
+                             search_order=args.search_order, workers=args.workers,
+                             cache_file=args.cache_file_path,
+                             modes=search.Modes(args.max_edges, args.max_nodes,
+                                                closed=args.closed))
+
+    print("Wrote {} subgraphs to '{}'.".format(len(index.patterns), args.index_file_path))
+    for min_support in sorted(set(args.min_supports), reverse=True):
+        print("Minimum Support: {}, subgraphs: {}".format(min_support, index.count(min_support)))
+
+def query(arguments):
+    """ Prints, and optionally writes, the frequent subgraphs at a support from a pattern index. """
+    parser = argparse.ArgumentParser(prog='gaston query',
+                                     description='Answer a minimum support from a pattern index.')
+    parser.add_argument("index_file_path", help='Pattern index file written by gaston sweep.')
+    parser.add_argument("--support", dest='min_support', type=float, required=True,
+                        help='Minimum support, at least the support the index was built at.')
+    parser.add_argument("-o", "--output_folder_path", help='Ouput location for frequent subgraphs.')
+    parser.add_argument("-w", "--workers", type=int, default=1,
+                        help='Number of processes used for drawing.')
+    parser.add_argument("--max_drawings", type=int,
+                        help='Draw at most this many frequent subgraphs.')
+    parser.add_argument("--top_drawings", type=int,
+                        help='Only draw this many of the most frequent subgraphs.')
+
+    args = parser.parse_args(arguments)
+
+    if not os.path.exists(args.index_file_path):
+        raise argparse.ArgumentTypeError(
+            "\n\n\t The index file path '{}' does not exist.\n".format(args.index_file_path))
+    if args.output_folder_path is not None and not os.path.exists(args.output_folder_path):
+        raise argparse.ArgumentTypeError(
+            "\n\n\t The output folder path '{}' does not exist.\n".format(args.output_folder_path))
+
+    index = index_module.read_index(args.index_file_path)
+    try:
+        frequent_output = index.query(args.min_support)
+    except ValueError as error:
+        raise argparse.ArgumentTypeError("\n\n\t {}\n".format(error))
+
+    print("\nMinimum Support:{}".format(args.min_support))
+    print("Minimum Frequency: {}\n".format(index.min_frequency(args.min_support)))
+    frequent_subgraphs = ((embedding_list,) + values
+                          for embedding_list, values in frequent_output.items())
+    if args.output_folder_path is not None:
+        frequent_subgraphs = _written(args.output_folder_path, frequent_subgraphs, args.workers,
+                                      args.max_drawings, args.top_drawings)
+    gaston_alg.print_statistics(frequent_subgraphs)
\ No newline at end of file
@@ -5,6 +5,8 @@ from gaston_py.level import Level
 class Cycle(Fragment):
     """ A fragment containing a subgraph with one or more cycles. """
 
+    __slots__ = ()
+
     def __str__(self):
         return "Cycle"
 
@@ -0,0 +1,141 @@
+
+import json
+import mmap
+import os
+import struct
+import sys
+from array import array
+
+import gaston_py.graph as graph_module
+
+# A dataset file starts with MAGIC, the size of a JSON header as a little endian uint64, and
+# the header.  The header holds the labels, the line graph file the dataset was converted from
+# and, for each graph, its id, original node ids, embeddings and the sizes of its arrays.
+# The arrays of all graphs follow as native ints, starting at the next multiple of 8 bytes.
+MAGIC = b'GASTONDS'
+VERSION = 1
+_HEADER_SIZE = struct.Struct('<Q')
+_ARRAY_NAMES = ('node_labels', 'edge_labels', 'edge_nodes', 'offsets', 'neighbors',
+                'incident_edges')
+
+def write_dataset(graphs, file_path, source_file=None):
+    """
+    Writes parsed LineGraphs to a binary dataset file that read_dataset maps into memory.
+
+    Node ids, labels, graph ids and embeddings must be JSON serializable, which they are for
+    graphs read from a line graph file.  If the graphs were read from source_file, its path,
+    size and modification time are stored so load_graphs can tell when the dataset is stale.
+    """
+    values = array('i')
+    header = {'version': VERSION, 'byteorder': sys.byteorder, 'itemsize': values.itemsize,
+              'source': _source(source_file) if source_file is not None else None,
+              'labels': graphs[0].labels if len(graphs) > 0 else [], 'graphs': []}
+
+    for graph in graphs:
+        sizes = []
+        for name in _ARRAY_NAMES:
+            graph_values = getattr(graph, name)
+            values.extend(graph_values)
+            sizes.append(len(graph_values))
+
+        header['graphs'].append({'id': graph.id, 'node_ids': list(graph.node_ids),
+                                 'embeddings': graph.embeddings, 'sizes': sizes})
+
+    encoded_header = json.dumps(header).encode('utf-8')
+    start = _array_start(len(encoded_header))
+
+    with open(file_path, 'wb') as f:
+        f.write(MAGIC)
+        f.write(_HEADER_SIZE.pack(len(encoded_header)))
+        f.write(encoded_header)
+        f.write(b'\0' * (start - f.tell()))
+        values.tofile(f)
+
+def read_dataset(file_path):
+    """
+    Returns the LineGraphs of a dataset file written by write_dataset.
+
+    The file is mapped into memory read-only, and the integer arrays of the graphs are
+    memoryviews of the mapping, so loading does not parse or copy them and worker processes
+    forked while mining share the same pages.
+    """
+    with open(file_path, 'rb') as f:
+        header, header_size = _read_header(f, file_path)
+        buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    values = memoryview(buffer)[_array_start(header_size):].cast('i')
+    labels = header['labels']
+
+    graphs, position = [], 0
+    for index, graph in enumerate(header['graphs']):
+        arrays = []
+        for size in graph['sizes']:
+            arrays.append(values[position:position + size])
+            position += size
+
+        graphs.append(graph_module.LineGraph.from_arrays(graph['id'], labels, graph['node_ids'],
+                                                         tuple(arrays), graph['embeddings'],
+                                                         index))
+    return graphs
+
+def is_dataset(file_path):
+    """ Returns True if the file starts like a dataset file.  Stdin ('-') is never one. """
+    if file_path == '-':
+        return False
+    with open(file_path, 'rb') as f:
+        return f.read(len(MAGIC)) == MAGIC
+
+def load_graphs(input_file, cache_file=None, workers=1):
+    """
+    Returns the LineGraphs of a line graph file or a dataset file.
+
+    If cache_file is given, a line graph file is only parsed when the cache file is missing or
+    was converted from a different file, or from an earlier version of the same file.  The
+    parsed graphs are then written to the cache file for the next run.  Line graph files are
+    parsed by read_line_graphs with the given number of workers.
+    """
+    if is_dataset(input_file):
+        return read_dataset(input_file)
+
+    if cache_file is not None and input_file == '-':
+        raise ValueError("A cache file can not be used when reading graphs from stdin.")
+
+    if cache_file is not None and _is_converted_from(cache_file, input_file):
+        return read_dataset(cache_file)
+
+    graphs = graph_module.read_line_graphs(input_file, workers)
+    if cache_file is not None:
+        write_dataset(graphs, cache_file, input_file)
+    return graphs
+
+def _read_header(f, file_path):
+    """ Reads and checks the header of an open dataset file, returning it and its size. """
+    if f.read(len(MAGIC)) != MAGIC:
+        raise ValueError("'{}' is not a gaston dataset file.".format(file_path))
+
+    header_size, = _HEADER_SIZE.unpack(f.read(_HEADER_SIZE.size))
+    header = json.loads(f.read(header_size).decode('utf-8'))
+    if header['version'] != VERSION or header['byteorder'] != sys.byteorder or \
+            header['itemsize'] != array('i').itemsize:
+        raise ValueError("The dataset file '{}' was written by an incompatible version or "
+                         "platform, convert the line graph file again.".format(file_path))
+    return header, header_size
+
+def _source(file_path):
+    status = os.stat(file_path)
+    return {'path': os.path.abspath(file_path), 'size': status.st_size,
+            'mtime': status.st_mtime_ns}
+
+def _is_converted_from(dataset_file, source_file):
+    if not os.path.exists(dataset_file):
+        return False
+    with open(dataset_file, 'rb') as f:
+        try:
+            header, _ = _read_header(f, dataset_file)
+        except ValueError:
+            return False
+    return header['source'] == _source(source_file)
+
+def _array_start(header_size):
+    end = len(MAGIC) + _HEADER_SIZE.size + header_size
+    return end + -end % 8
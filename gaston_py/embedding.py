@@ -1,77 +1,207 @@
-
-def create_embedding_list(graph, source_id):
-    """ Generalized, slow method for creating unique embedded lists for any type of graph. """
-    embedding_labels = [graph.node[source_id]['label']]
-    embed_iter = _create_embedding_list(graph, visited=set(), node_id=source_id)
-    
-    for node_id, (edge_label, neighbor_label) in embed_iter:
-        embedding_labels.append(edge_label)
-        embedding_labels.append(neighbor_label)
-    
-    return tuple(embedding_labels)
-
-def create_embedding_list_if_unique(graph, source_id, alt_source_id):
-    node_label = graph.node[source_id]['label']
-    alt_node_label = graph.node[alt_source_id]['label']
-
-    if node_label > alt_node_label:
+from gaston_py.cache import LRUCache
+
+def create_embedding_list(node_labels, edges, prefix=None):
+    """
+    Creates the unique embedding list of a connected pattern.
+
+    node_labels: the label of each pattern node
+    edges: (u, v, edge label) tuples over pattern nodes
+    prefix: if given, the DFS code of a tree or cyclic pattern is only computed as long as
+        it starts with prefix, and None is returned as soon as it does not
+
+    Paths are represented by the smaller of their two label sequences,
+    (l0, e1, l1, ..., en, ln).  Trees and cyclic graphs are represented by their
+    minimum DFS code, (l0, (i, j, e, lj), ...), in which each edge is given by the
+    discovery indices of its end points.
+
+    Returns:
+        (embedding_list, order) where order lists the pattern nodes by their position
+        in the embedding list
+    """
+    if not edges:
+        return (node_labels[0],), [0]
+
+    if len(edges) == len(node_labels) - 1 and _is_path(node_labels, edges):
+        return _path_embedding_list(node_labels, edges)
+
+    return _dfs_embedding_list(node_labels, edges, prefix)
+
+def path_embedding_list(sequence):
+    """ Returns the smaller of a path's label sequence and its reverse, and whether it was reversed. """
+    reversed_sequence = tuple(reversed(sequence))
+    if reversed_sequence < sequence:
+        return reversed_sequence, True
+    return tuple(sequence), False
+
+def is_dfs_code(embedding_list):
+    """ Trees and cyclic graphs are represented by DFS codes, nodes and paths by label sequences. """
+    return len(embedding_list) > 1 and isinstance(embedding_list[1], tuple)
+
+def is_cyclic(embedding_list):
+    return is_dfs_code(embedding_list) and any(j < i for i, j, _, _ in embedding_list[1:])
+
+def pattern_structure(embedding_list):
+    """ Returns the (node_labels, edges) of the pattern represented by an embedding list. """
+    if not is_dfs_code(embedding_list):
+        node_labels = embedding_list[::2]
+        edge_labels = embedding_list[1::2]
+        return node_labels, tuple((i, i + 1, label) for i, label in enumerate(edge_labels))
+
+    node_labels = [embedding_list[0]]
+    edges = []
+    for i, j, edge_label, node_label in embedding_list[1:]:
+        if j == len(node_labels):
+            node_labels.append(node_label)
+        edges.append((i, j, edge_label))
+    return tuple(node_labels), tuple(edges)
+
+# Parents of cyclic patterns, which are the only ones computed from scratch.
+# The same cyclic pattern is usually closed from several fragments.
+PARENT_CACHE_SIZE = 1 << 14
+parent_cache = LRUCache(PARENT_CACHE_SIZE)
+
+def parent_embedding_list(embedding_list):
+    """
+    Returns the embedding list of the unique parent a pattern is generated from.
+
+    A path's parent is the path without its last node, a tree's parent is the
+    tree without the node discovered last, and a cyclic graph's parent is the
+    graph without the last cycle closing edge of its DFS code.
+    """
+    if len(embedding_list) == 1:
         return None
 
-    # If a cycle is formed by wrapping back to source_id, source_id == alt_source_id
-    elif node_label < alt_node_label or source_id == alt_source_id:
-        return create_embedding_list(graph, source_id)
-    else:
-        return _embedding_list_with_comparison(graph, source_id, alt_source_id, node_label, alt_node_label)
-    
-def _embedding_list_with_comparison(graph, source_id, alt_source_id, node_label, alt_node_label):
-
-    embedding_list = [node_label]
-    source_node_ids = [source_id]
-    alt_node_ids = [alt_source_id]
-
-    embed_iter = _create_embedding_list(graph, visited=set(), node_id=source_id)
-    alt_embed_iter = _create_embedding_list(graph, visited=set(), node_id=alt_source_id)
-
-    should_compare = True
-
-    while True:
-        try:
-            node_id, edge = next(embed_iter)
-            embedding_list.extend(edge)
-
-            if should_compare:
-                alt_node_id, alt_edge = next(alt_embed_iter)
-
-                source_node_ids.append(node_id)
-                alt_node_ids.append(alt_node_id)
-
-                if edge > alt_edge:
-                    return None
-                elif edge < alt_edge:
-                    should_compare = False
-                    del source_node_ids
-                    del alt_node_ids
-
-        except StopIteration:
-            break
-
-    if should_compare and source_node_ids > alt_node_ids:
+    if not is_dfs_code(embedding_list):
+        if len(embedding_list) == 3:
+            return embedding_list[:1]
+        return path_embedding_list(embedding_list[:-2])[0]
+
+    entries = embedding_list[1:]
+    closing_entries = [index for index, (i, j, _, _) in enumerate(entries) if j < i]
+
+    # A minimum DFS code without its last entry is the minimum DFS code of the rest of the tree
+    if not closing_entries:
+        node_labels, edges = pattern_structure(embedding_list[:-1])
+        if _is_path(node_labels, edges):
+            return _path_embedding_list(node_labels, edges)[0]
+        return embedding_list[:-1]
+
+    parent = parent_cache.get(embedding_list)
+    if parent is None:
+        entries = entries[:closing_entries[-1]] + entries[closing_entries[-1] + 1:]
+        node_labels, edges = pattern_structure(embedding_list[:1] + entries)
+        parent = create_embedding_list(node_labels, edges)[0]
+        parent_cache.put(embedding_list, parent)
+    return parent
+
+def _adjacency(node_labels, edges):
+    adjacency = [[] for _ in node_labels]
+    for index, (u, v, label) in enumerate(edges):
+        adjacency[u].append((v, index, label))
+        adjacency[v].append((u, index, label))
+    return adjacency
+
+def _is_path(node_labels, edges):
+    degrees = [0] * len(node_labels)
+    for u, v, _ in edges:
+        degrees[u] += 1
+        degrees[v] += 1
+    return len(edges) == len(node_labels) - 1 and max(degrees) <= 2
+
+def _path_embedding_list(node_labels, edges):
+    adjacency = _adjacency(node_labels, edges)
+    start = next(node for node, neighbors in enumerate(adjacency) if len(neighbors) <= 1)
+
+    order = [start]
+    sequence = [node_labels[start]]
+    previous, current = None, start
+    while len(order) < len(node_labels):
+        neighbor, _, label = next(x for x in adjacency[current] if x[0] != previous)
+        order.append(neighbor)
+        sequence.extend((label, node_labels[neighbor]))
+        previous, current = current, neighbor
+
+    embedding_list, is_reversed = path_embedding_list(tuple(sequence))
+    return embedding_list, order[::-1] if is_reversed else order
+
+def _dfs_embedding_list(node_labels, edges, prefix=None):
+    """
+    The minimum DFS code of a tree or cyclic graph is found by growing every DFS traversal
+    that can still produce the smallest code, one edge at a time.
+
+    Entries are ordered as in gSpan: cycle closing edges come before edges to new nodes,
+    and edges to new nodes are taken from the deepest possible node first.  With this order,
+    a minimum DFS code without its last entry is a minimum DFS code itself.
+    """
+    adjacency = _adjacency(node_labels, edges)
+    smallest_label = min(node_labels)
+    if prefix is not None and prefix[0] != smallest_label:
         return None
-    
-    return tuple(embedding_list)
-
-def _create_embedding_list(graph, visited, node_id):
-    for edge_label, neighbor_label, neighbor_id in sorted(_neighbor_labels(graph, visited, node_id)):
-        if (node_id, neighbor_id) not in visited:
-            visited.add((node_id, neighbor_id))
-            visited.add((neighbor_id, node_id)) # if graph is undirected
-
-            yield node_id, (edge_label, neighbor_label)
-            yield from _create_embedding_list(graph, visited, neighbor_id)
-
-def _neighbor_labels(graph, visited, node_id):
-    for neighbor_id in graph.neighbors_iter(node_id):
-        if (node_id, neighbor_id) not in visited:
-            edge_label = graph.edge[node_id][neighbor_id]['label']
-            neighbor_label = graph.node[neighbor_id]['label']
-            yield edge_label, neighbor_label, neighbor_id
\ No newline at end of file
+
+    # state: (order, index, stack, emitted edges)
+    states = [([node], {node: 0}, [node], set())
+              for node, label in enumerate(node_labels) if label == smallest_label]
+    code = []
+
+    for step in range(len(edges)):
+        best, candidates = None, []
+        for state in states:
+            order, index, stack, emitted = state
+            options = []
+            while not options:
+                top = stack[-1]
+                options = [(_entry_key(index[top], index.get(neighbor, len(order)), label,
+                                       node_labels[neighbor]), neighbor, edge)
+                           for neighbor, edge, label in adjacency[top] if edge not in emitted]
+                if not options:
+                    stack.pop()
+
+            for option in options:
+                if best is None or option[0] < best:
+                    best, candidates = option[0], [(state, option)]
+                elif option[0] == best:
+                    candidates.append((state, option))
+
+        entry = _key_entry(best)
+        if prefix is not None and step + 1 < len(prefix) and entry != prefix[step + 1]:
+            return None
+
+        code.append(entry)
+        states = _distinct_states(_apply_option(state, option) for state, option in candidates)
+
+    return (smallest_label,) + tuple(code), states[0][0]
+
+def _entry_key(i, j, edge_label, node_label):
+    """ Cycle closing edges (j < i) sort first by j, edges to new nodes by decreasing i. """
+    if j < i:
+        return (0, j, edge_label, node_label, i)
+    return (1, -i, edge_label, node_label, j)
+
+def _key_entry(key):
+    kind, x, edge_label, node_label, y = key
+    if kind == 0:
+        return (y, x, edge_label, node_label)
+    return (-x, y, edge_label, node_label)
+
+def _apply_option(state, option):
+    order, index, stack, emitted = state
+    order, index, stack, emitted = list(order), dict(index), list(stack), set(emitted)
+    _, neighbor, edge = option
+    if neighbor not in index:
+        index[neighbor] = len(order)
+        order.append(neighbor)
+        stack.append(neighbor)
+    emitted.add(edge)
+    return order, index, stack, emitted
+
+def _distinct_states(states):
+    """
+    Drops traversals that continue exactly like another one.  Only nodes on the stack can
+    still have edges to emit, so the stack, its indices and the emitted edges decide the rest.
+    """
+    distinct = {}
+    for state in states:
+        _, index, stack, emitted = state
+        key = (tuple(stack), tuple(index[node] for node in stack), frozenset(emitted))
+        distinct.setdefault(key, state)
+    return list(distinct.values())
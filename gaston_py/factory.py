@@ -1,4 +1,6 @@
 
+from collections import namedtuple
+
 from gaston_py.node import Node
 from gaston_py.path import Path
 from gaston_py.tree import Tree
@@ -7,192 +9,217 @@ import gaston_py.graph as graph_module
 import gaston_py.embedding as embedding
 
 def initial_node_fragments(graphs):
-    """ Creates initial node fragments from networkx graphs. """
-    return iter(Node(node_id, source_graph) for source_graph in graphs for node_id in source_graph)
+    """ Creates a node fragment for each node label, with every node of that label as an occurrence. """
+    occurrences = {} # {node_label: [occurrences]}
+    for source_graph in graphs:
+        for node_id in source_graph:
+            occurrence = graph_module.Subgraph(source_graph, (node_id,))
+            occurrences.setdefault(source_graph.label(node_id), []).append(occurrence)
 
-def apply_refinement(prev_fragment, edge, dont_generate_cycles, dont_generate_trees):
-    """
-    Create a new fragment by applying a refinement to a frequently occurring fragment.
+    return iter(Node(node_label, occurrences[node_label]) for node_label in sorted(occurrences))
 
-    Returns None if the refinement produces a duplicated fragment.
-    Otherwise, returns a new fragment.
+def refinements(fragment, extend_cycles=False):
     """
+    Groups the frontier edges of all occurrences of a fragment by the refinement they apply.
 
-    origin_id, target_id = edge
-    new_fragment = None
-
-    # Create a path from a node.
-    if isinstance(prev_fragment, Node):
-        new_fragment = _create_path_from_node(prev_fragment, target_id)
+    A refinement is a tuple (origin, target, edge label, target label) in terms of pattern nodes.
+    The target of an edge leading to a new node is the index the new node will have.
 
-    # Create a cycle from either a path, tree, or cycle fragment.
-    elif target_id in prev_fragment.current_graph:
-        if not dont_generate_cycles:
-            new_fragment = _create_cycle(prev_fragment, origin_id, target_id)
+    Cycles are only refined by closing more cycles, since a cycle with one more node is
+    generated from a tree.  If extend_cycles is set, the edges leading out of a cycle are
+    grouped as well.
 
-    elif isinstance(prev_fragment, Path):
-        # Create a path by appending to a path fragment.
-        if origin_id == prev_fragment.back_node_id:
-            new_fragment = _append_to_path(prev_fragment, target_id)
+    Returns:
+        a dictionary of the form {refinement: [(occurrence, neighbor_id, edge_id)]}
+    """
+    refinements = {}
+    new_node = len(fragment.node_labels)
+    closes_cycles_only = isinstance(fragment, Cycle) and not extend_cycles
 
-        # Create a path by prepending to a path fragment.
-        # elif origin_id == prev_fragment.source_node_id:
-        #     new_fragment = _prepend_node_to_path(prev_fragment, target_id)
+    for occurrence, origin, target, neighbor_id, edge_id in fragment.frontier_edges:
+        if target is None:
+            if closes_cycles_only:
+                continue
+            target = new_node
 
-        # Create a tree by appending to a path fragment.
-        elif not dont_generate_trees:
-            new_fragment = _create_tree(prev_fragment, origin_id, target_id)
+        # Cycle closing edges are found from both of their end points, and self-loops
+        # (target == origin) are not part of any pattern
+        elif target <= origin:
+            continue
 
-    # Create a tree by appending to a tree fragment.
-    elif isinstance(prev_fragment, Tree) and not dont_generate_trees:
-        new_fragment = _create_tree(prev_fragment, origin_id, target_id)
+        source_graph = occurrence.source_graph
+        refinement = (origin, target,
+                      source_graph.edge_labels[edge_id], source_graph.node_labels[neighbor_id])
 
-    return new_fragment
+        if refinement in refinements:
+            refinements[refinement].append((occurrence, neighbor_id, edge_id))
+        else:
+            refinements[refinement] = [(occurrence, neighbor_id, edge_id)]
 
-def _create_path_from_node(node_fragment, appending_node_id):
-    source_node_id, source_graph = node_fragment.source_node_id, node_fragment.source_graph
+    return refinements
 
-    start_node_label = source_graph.node[source_node_id]['label']
-    appending_node_label = source_graph.node[appending_node_id]['label']
-    edge_label = source_graph.edge[source_node_id][appending_node_id]['label']
+RefinedPattern = namedtuple('RefinedPattern', ['embedding_list', 'order', 'symmetries'])
 
-    # Check if refinement is allowed
-    if appending_node_label < start_node_label:
-        return None
-
-    current_graph = graph_module.create_nx_graph(source_node_id, start_node_label,
-                                                 appending_node_id, appending_node_label,
-                                                 edge_label)
+def apply_refinement(prev_fragment, refinement, extensions,
+                     dont_generate_cycles, dont_generate_trees):
+    """
+    Create a new fragment by applying a refinement to a frequently occurring fragment.
+    Each extension in extensions adds an edge to one occurrence of prev_fragment.
 
-    # Find the embedding that begins at the previous path's back node
-    # The alt embedding beginning from the new back node will be created from a different fragment
-    embedding_list = embedding.create_embedding_list_if_unique(current_graph,
-                                                               source_id=source_node_id,
-                                                               alt_source_id=appending_node_id)
-    if embedding_list is None:
+    Returns None if the refinement is not allowed or if the new fragment is generated
+    from a different fragment.  Otherwise, returns a new fragment.
+    """
+    refined_pattern = refine_pattern(prev_fragment, refinement,
+                                     dont_generate_cycles, dont_generate_trees)
+    if refined_pattern is None:
         return None
 
-    # embedding_list = embedding.create_embedding_list(current_graph, node_fragment.source_node_id)
-
-    # total_symmetry = 0 if appending_node_label == start_node_label else 1
-
-    return Path(source_node_id, appending_node_id, current_graph,
-                source_graph, embedding_list,
-                total_symmetry=0, front_symmetry=0, back_symmetry=0)
-
-def _append_to_path(prev_path, new_back_id):
-
-    target_node_label = prev_path.source_graph.node[new_back_id]['label']
-    target_edge_label = prev_path.source_graph.edge[prev_path.back_node_id][new_back_id]['label']
-
-    # edge1 = tuple(prev_path.embedding_list[:2]) # (l(v1), l(e1))
-    # new_edge = (target_node_label, target_edge_label)
-    # embedding_list = prev_path.embedding_list + (target_edge_label, target_node_label)
-
-    # Needs to be changed if using the O(1) method for finding new path symmetries
-    # total_symmetry, front_symmetry, back_symmetry = Path.new_path_symmetries(embedding_list)
-
-    # Check if refinement is allowed
-    # append is allowed if total_symmetry == 0
-    # (l(v'), l(e')) > (l(v1), l(e1))
-    # if (l(v'), l(e')) == (l(v1), l(e1)) and back_symmetry >= 0
+    return create_fragment(prev_fragment, [(refinement, refined_pattern, extensions)])
 
-    # if total_symmetry == -1 or edge1 == new_edge and back_symmetry == -1:
-    #     return None
+def refine_pattern(prev_fragment, refinement, dont_generate_cycles, dont_generate_trees):
+    """
+    Applies a refinement to the pattern of a fragment, without touching its occurrences.
 
-    current_graph = graph_module.extend_nx_graph(prev_path.current_graph,
-                                                 prev_path.back_node_id, new_back_id,
-                                                 target_node_label, target_edge_label)
+    The embedding list of a refined pattern is derived from the embedding list of
+    prev_fragment where possible: paths use the symmetries of the path they extend and
+    trees only check that their minimum DFS code starts with the code of prev_fragment.
+    It is only computed from scratch when a tree is created from a path or a cycle is closed.
 
-    # Find the embedding that begins at the previous path's back node
-    # The alt embedding beginning from the new back node will be created from a different fragment
-    embedding_list = embedding.create_embedding_list_if_unique(current_graph,
-                                                               source_id=prev_path.source_node_id,
-                                                               alt_source_id=new_back_id)
-    if embedding_list is None:
-        return None
+    Returns None if the refinement is not allowed or if the refined pattern is generated
+    from a different fragment.  Otherwise, returns a RefinedPattern, whose order lists the
+    pattern nodes of prev_fragment (and the new node) in embedding list order and whose
+    symmetries are set for paths.
+    """
+    origin, target, edge_label, target_label = refinement
+    new_node = len(prev_fragment.node_labels)
 
-    # embedding_list = embedding.create_embedding_list(current_graph, prev_path.source_node_id)
+    # Create a path from a node.
+    if isinstance(prev_fragment, Node):
+        node_label = prev_fragment.embedding_list[0]
+        if target_label < node_label:
+            return None
+        total_symmetry = 0 if target_label == node_label else 1
+        return RefinedPattern((node_label, edge_label, target_label), [0, 1],
+                              (total_symmetry, 0, 0))
 
-    return Path(prev_path.source_node_id, new_back_id, current_graph,
-                prev_path.source_graph, embedding_list,
-                total_symmetry=0, front_symmetry=0, back_symmetry=0)
+    # Create a cycle from either a path, tree, or cycle fragment.
+    if target != new_node:
+        if dont_generate_cycles:
+            return None
+        return _refine_embedding_list(prev_fragment, refinement)
 
-def _prepend_node_to_path(prev_path, new_node_id):
+    if isinstance(prev_fragment, Path):
+        # Create a path by appending to or prepending to a path fragment.
+        if origin == new_node - 1 or origin == 0:
+            return _extend_path(prev_fragment, refinement)
 
-    new_node_label = prev_path.source_graph.node[new_node_id]['label']
-    new_edge_label = prev_path.source_graph.edge[new_node_id][prev_path.source_node_id]['label']
+        # Create a tree by appending to a path fragment.
+        if not dont_generate_trees:
+            return _refine_embedding_list(prev_fragment, refinement)
 
-    # edge1 = tuple(prev_path.embedding_list[:2]) # (l(v1), l(e1))
-    # new_edge = (new_node_label, new_edge_label)
-    # embedding_list = new_edge + prev_path.embedding_list
+    # Create a tree by appending to a tree fragment.
+    elif isinstance(prev_fragment, Tree) and not dont_generate_trees:
+        return _refine_embedding_list(prev_fragment, refinement,
+                                      prefix=prev_fragment.embedding_list)
 
-    # Needs to be changed if using the O(1) method for finding new path symmetries
-    # total_symmetry, front_symmetry, back_symmetry = Path.new_path_symmetries(embedding_list)
+    return None
 
-    # Check if refinement is allowed
-    # append is allowed if total_symmetry == 1
-    # (l(v'), l(e')) > (l(v1), l(e1))
-    # if (l(v'), l(e')) == (l(v1), l(e1)) and back_symmetry >= 0
+def create_fragment(prev_fragment, refinements, bitset=None, stats=None):
+    """
+    Creates the fragment of a refined pattern from the (refinement, refined_pattern, extensions)
+    tuples of every refinement producing it, extending each occurrence in extensions.
+    The fragment type follows from the embedding list.
 
-    # if total_symmetry != 1 or edge1 == new_edge and back_symmetry == -1:
-    #     return None
+    bitset is the graph bitset of the extensions, if it is already known.  If stats is a
+    SearchStats, the extended occurrences that were already reached are counted.
+    """
+    # Symmetric refinements reach the same subgraphs, so one set is shared by all of them
+    visited_occurrences = set()
+    occurrences = []
+    for refinement, refined_pattern, extensions in refinements:
+        occurrences.extend(_extend_occurrences(prev_fragment, refinement, refined_pattern.order,
+                                               extensions, visited_occurrences))
+    if stats is not None:
+        stats.count('duplicate_occurrences', sum(len(extensions) for _, _, extensions
+                                                  in refinements) - len(occurrences))
+
+    embedding_list, _, symmetries = refinements[0][1]
+    if not embedding.is_dfs_code(embedding_list):
+        total_symmetry, front_symmetry, back_symmetry = symmetries
+        return Path(embedding_list, occurrences, total_symmetry=total_symmetry,
+                    front_symmetry=front_symmetry, back_symmetry=back_symmetry, bitset=bitset)
+
+    if embedding.is_cyclic(embedding_list):
+        return Cycle(embedding_list, occurrences, bitset)
+
+    return Tree(embedding_list, occurrences, bitset)
+
+def refined_embedding_list(prev_fragment, refinement):
+    """
+    Returns the embedding list of the pattern a refinement of prev_fragment produces, whether
+    or not that pattern is generated from prev_fragment.
+    """
+    node_labels, edges = _refined_structure(prev_fragment, refinement)
+    return embedding.create_embedding_list(node_labels, edges)[0]
 
-    # Incorrect order if graph is directed
-    current_graph = graph_module.extend_nx_graph(prev_path.current_graph, prev_path.source_node_id,
-                                                 new_node_id, new_node_label, new_edge_label)
+def _extend_path(prev_fragment, refinement):
+    origin, _, edge_label, target_label = refinement
+    embedding_list, order, symmetries = prev_fragment.extend(origin, edge_label, target_label)
 
-    # Find the embedding that begins at the previous path's start node
-    # The alt embedding beginning from the new start node will be created from a different fragment
-    embedding_list = embedding.create_embedding_list_if_unique(current_graph,
-                                                               source_id=prev_path.source_node_id,
-                                                               alt_source_id=new_node_id)
-    if embedding_list is None or prev_path.embedding_list > embedding_list:
+    # A path is generated from the path without the last node of its embedding list,
+    # which is prev_fragment whenever the new node comes last.
+    if order[-1] != len(order) - 1 and \
+            embedding.parent_embedding_list(embedding_list) != prev_fragment.embedding_list:
         return None
 
-    # embedding_list = embedding.create_embedding_list(current_graph, prev_path.source_node_id)
-
-    return Path(prev_path.source_node_id, prev_path.back_node_id, current_graph,
-                prev_path.source_graph, embedding_list,
-                total_symmetry=0, front_symmetry=0, back_symmetry=0)
-
-def _create_tree(prev_fragment, origin_id, target_id):
-
-    source_graph = prev_fragment.source_graph
-
-    new_node_label = source_graph.node[target_id]['label']
-    new_edge_label = source_graph.edge[origin_id][target_id]['label']
-
-    current_graph = graph_module.extend_nx_graph(prev_fragment.current_graph, origin_id, target_id,
-                                                 new_node_label, new_edge_label)
+    return RefinedPattern(embedding_list, order, symmetries)
 
-    embedding_list = embedding.create_embedding_list_if_unique(current_graph,
-                                                               source_id=prev_fragment.source_node_id,
-                                                               alt_source_id=target_id)
-    if embedding_list is None:
+def _refine_embedding_list(prev_fragment, refinement, prefix=None):
+    """
+    Computes the embedding list of a refined pattern once for all of its occurrences.
+    Returns None unless prev_fragment is the parent the refined pattern is generated from,
+    so every pattern is produced by exactly one fragment.
+
+    If prefix is the embedding list of prev_fragment, the pattern's parent is prev_fragment
+    exactly when its minimum DFS code starts with prefix, so the parent is not recomputed.
+    The code of a tree is not appended to prefix directly: the new node's entry only ends
+    the minimum code if no traversal emits it earlier, and checking that is this search.
+    It only follows traversals that reproduce prefix and stops at the first entry that
+    differs from it, which is where most refinements of a tree are rejected.
+    """
+    node_labels, edges = _refined_structure(prev_fragment, refinement)
+    refined = embedding.create_embedding_list(node_labels, edges, prefix)
+    if refined is None:
         return None
 
-    # embedding_list = embedding.create_embedding_list(current_graph, prev_fragment.source_node_id)
-
-    return Tree(prev_fragment.source_node_id, current_graph, source_graph, embedding_list)
+    embedding_list, order = refined
+    if prefix is None and \
+            embedding.parent_embedding_list(embedding_list) != prev_fragment.embedding_list:
+        return None
 
-def _create_cycle(prev_fragment, origin_id, target_id):
+    return RefinedPattern(embedding_list, order, None)
 
-    source_graph = prev_fragment.source_graph
-    prev_graph = prev_fragment.current_graph
+def _refined_structure(prev_fragment, refinement):
+    """ Returns the (node_labels, edges) of prev_fragment's pattern with a refinement applied. """
+    origin, target, edge_label, target_label = refinement
 
-    new_node_label = source_graph.node[target_id]['label']
-    new_edge_label = source_graph.edge[origin_id][target_id]['label']
+    node_labels = prev_fragment.node_labels
+    if target == len(node_labels):
+        node_labels = node_labels + (target_label,)
+    return node_labels, prev_fragment.edges + ((origin, target, edge_label),)
 
-    current_graph = graph_module.extend_nx_graph(prev_graph, origin_id, target_id,
-                                                 new_node_label, new_edge_label)
+def _extend_occurrences(prev_fragment, refinement, order, extensions, visited_occurrences):
+    """ Adds the edge of each extension to its occurrence, with nodes in embedding list order. """
+    adds_node = refinement[1] == len(prev_fragment.node_labels)
 
-    embedding_list = embedding.create_embedding_list_if_unique(current_graph,
-                                                               source_id=prev_fragment.source_node_id,
-                                                               alt_source_id=target_id)
-    if embedding_list is None:
-        return None
+    occurrences = []
+    for occurrence, neighbor_id, edge_id in extensions:
+        nodes = occurrence.nodes + (neighbor_id,) if adds_node else occurrence.nodes
+        new_occurrence = occurrence.extend(tuple(nodes[index] for index in order), edge_id)
 
-    # embedding_list = embedding.create_embedding_list(current_graph, prev_fragment.source_node_id)
+        # The same subgraph is reached from each occurrence of prev_fragment it contains
+        if new_occurrence not in visited_occurrences:
+            visited_occurrences.add(new_occurrence)
+            occurrences.append(new_occurrence)
 
-    return Cycle(prev_fragment.source_node_id, current_graph, source_graph, embedding_list)
+    return occurrences
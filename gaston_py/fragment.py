@@ -1,43 +1,79 @@
 
+import gaston_py.embedding as embedding
 
 class Fragment(object):
     """
     Base class for node, path, tree, and cycle fragments.
 
-    current_graph: a networkx graph representing a subgraph in source_graph
-    source_node_id: the id of the source node in the graph
-    source_graph: a networkx graph containing current_graph
-    embedding_list: a unique tuple representation of current_graph
+    A fragment is a pattern together with the list of its occurrences in the source graphs.
+
+    embedding_list: a unique tuple representation of the pattern
+    occurrences: Subgraphs of the source graphs, with nodes ordered like node_labels
+    graph_bitset: an int with the bit of every source graph containing the pattern set
+
+    The node labels and edges of the pattern are derived from embedding_list when needed.
     """
 
-    def __init__(self, source_node_id, current_graph, source_graph, embedding_list):
-        self.source_node_id = source_node_id
-        self.current_graph = current_graph
-        self.source_graph = source_graph
+    __slots__ = ('embedding_list', 'occurrences', 'graph_bitset', '_structure')
+
+    def __init__(self, embedding_list, occurrences, bitset=None):
         self.embedding_list = embedding_list
+        self.occurrences = occurrences
+        self.graph_bitset = bitset if bitset is not None else \
+            graph_bitset(occurrence.source_graph for occurrence in occurrences)
+        self._structure = None
+
+    @property
+    def node_labels(self):
+        """ The label of each pattern node, ordered as in embedding_list. """
+        return self._pattern_structure()[0]
+
+    @property
+    def edges(self):
+        """ (u, v, edge label) tuples over pattern nodes. """
+        return self._pattern_structure()[1]
 
-        # Ensure correctness of gaston algorithm using unique hash values for each subgraph/fragment
-        # Will be removed if correctness of faster methods are proven
-        self.hash_value = hash(tuple(
-            sorted((u, data['label']) for u, data in self.current_graph.nodes_iter(data=True)) +
-            sorted(data['label'] for _, _, data in self.current_graph.edges_iter(data=True))
-            ))
+    def _pattern_structure(self):
+        if self._structure is None:
+            self._structure = embedding.pattern_structure(self.embedding_list)
+        return self._structure
+
+    @property
+    def frequency(self):
+        """ The number of occurrences of the pattern. """
+        return len(self.occurrences)
+
+    @property
+    def graph_count(self):
+        """ The number of distinct source graphs containing the pattern. """
+        return popcount(self.graph_bitset)
 
     @property
     def frontier_edges(self):
         """
-        Returns tuples representing edges to neighboring nodes not already in current_graph.
-        Used to find possible refinements to fragments.
+        Returns tuples representing edges of the source graphs that are not part of an occurrence
+        but touch one of its nodes.  Used to find possible refinements to fragments.
+
+        Each tuple is (occurrence, origin, target, neighbor, edge), where origin is the pattern
+        node the edge starts from and target is the pattern node it leads to, or None if
+        the edge leads to a node outside of the occurrence.
         """
-        for node_id in self.current_graph:
-            edges = self.current_graph.edge[node_id]
-            if node_id in self.source_graph:
-                for neighbor_id in self.source_graph.neighbors_iter(node_id):
-                    if neighbor_id not in edges:
-                        yield (node_id, neighbor_id)
-
-    def __hash__(self):
-        return self.hash_value
-
-    def __eq__(self, other):
-        return self.hash_value == other.hash_value
+        for occurrence in self.occurrences:
+            source_graph, edges = occurrence.source_graph, occurrence.edges
+            positions = {node_id: position for position, node_id in enumerate(occurrence.nodes)}
+
+            for origin, node_id in enumerate(occurrence.nodes):
+                if node_id in source_graph:
+                    for neighbor_id, edge_id in source_graph.adjacency(node_id):
+                        if edge_id not in edges:
+                            yield occurrence, origin, positions.get(neighbor_id), neighbor_id, edge_id
+
+def graph_bitset(source_graphs):
+    """ Returns an int with the bit of each source graph's index set. """
+    bitset = 0
+    for source_graph in source_graphs:
+        bitset |= 1 << source_graph.index
+    return bitset
+
+def popcount(bitset):
+    return bin(bitset).count('1')
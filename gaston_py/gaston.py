@@ -1,39 +1,128 @@
 
+import time
 from collections import Counter
 
+import gaston_py.dataset as dataset
 import gaston_py.graph as graph_module
 import gaston_py.factory as factory
+import gaston_py.incremental as incremental
+import gaston_py.index as index_module
+import gaston_py.sampling as sampling
 import gaston_py.search as search
 
 def gaston(min_support, input_file,
            dont_generate_cycles=False, dont_generate_trees=False,
-           should_print_graph_information=False):
+           should_print_graph_information=False, search_order='bfs', workers=1,
+           support_counting='transaction', cache_file=None, stats=None, modes=None,
+           state_file=None, checkpoint=None, memory_limit=None, sample=None):
     """
-    Reads graphs from a line graph file and finds frequently occurring
+    Reads graphs from a line graph or dataset file and finds frequently occurring
     subgraphs with support > min_support.
 
     Args:
         min_support: a float specifying the minimum support
-        input_file: a file path to the input file containing line graphs
+        input_file: a line graph file, optionally compressed, '-' for stdin, or a dataset file
         dont_generate_cycles: a flag specifying whether to generate cycles
         dont_generate_trees: a flag specifying whether to generate trees
         should_print_graph_information: a flag specifying whether to print graph info
+        search_order: 'bfs' to search level by level or 'dfs' to search one branch at a time
+        workers: the number of processes used to parse the input and to mine
+        support_counting: 'transaction' to count graphs or 'occurrence' to count occurrences
+        cache_file: a dataset file used to skip parsing the input file when it has not changed
+        stats: a gaston_py.stats.SearchStats to count the events of the search in
+        modes: a gaston_py.search.Modes limiting which frequent subgraphs are found
+        state_file: a file to keep the state of the run in, to only mine graphs appended later
+        checkpoint: a gaston_py.checkpoint.Checkpoint to save the state of the search to
+        memory_limit: the estimated bytes of queued subgraphs to keep in memory
+        sample: a gaston_py.sampling.Sample to mine a random sample of the graphs
 
     Returns:
         a dictionary of the form {embedding_list: (subgraph, graph type, frequency)}
     """
+    modes = search.Modes() if modes is None else modes
+    if sample is not None:
+        if support_counting != 'transaction' or not modes.limits_size_only or \
+                state_file is not None or checkpoint is not None:
+            raise ValueError("A sample can only be mined when counting transactions, without "
+                             "top_k, closed, maximal, a state file or a checkpoint.")
+        return _mine_sample(min_support, input_file, sample, dont_generate_cycles,
+                            dont_generate_trees, should_print_graph_information, search_order,
+                            workers, cache_file, stats, modes, memory_limit)
+    if state_file is not None:
+        if checkpoint is not None:
+            raise ValueError("A run keeping a state file can not be checkpointed.")
+        return _mine_incrementally(min_support, input_file, state_file, dont_generate_cycles,
+                                   dont_generate_trees, should_print_graph_information,
+                                   search_order, workers, support_counting, cache_file, stats,
+                                   modes, memory_limit)
+    return search.ordered_output(iter_frequent_subgraphs(
+        min_support, input_file, dont_generate_cycles, dont_generate_trees,
+        should_print_graph_information, search_order, workers, support_counting, cache_file,
+        stats, modes, checkpoint, memory_limit))
 
-    graphs = graph_module.read_line_graphs(input_file)
-    min_frequency = int(min_support * len(graphs))
-    if min_frequency < 1:
-        min_frequency = 1
+def iter_frequent_subgraphs(min_support, input_file,
+                            dont_generate_cycles=False, dont_generate_trees=False,
+                            should_print_graph_information=False, search_order='bfs', workers=1,
+                            support_counting='transaction', cache_file=None, stats=None,
+                            modes=None, checkpoint=None, memory_limit=None, nx_graphs=True):
+    """
+    Reads graphs like gaston and returns an iterator that yields each frequent subgraph as soon
+    as it is found.  Subgraphs are yielded in the order they are found, which depends on the
+    search order and the workers, and are not kept after they are yielded.  With top_k, they
+    are only yielded once the search ends.  If nx_graphs is not set, each subgraph is its
+    (nodes, edges) instead of a networkx graph, so networkx is not imported.
+
+    Returns:
+        an iterator of tuples (embedding_list, subgraph, graph type, frequency)
+    """
+    graphs = _load_graphs(input_file, cache_file, workers, stats)
+    min_frequency = search.checked_min_frequency(min_support, len(graphs), support_counting)
 
     if should_print_graph_information:
         print_graph_information(graphs, min_frequency)
 
     fragments = factory.initial_node_fragments(graphs)
-    return search.find_frequent_subgraphs(fragments, min_frequency,
-                                          dont_generate_cycles, dont_generate_trees)
+    return search.iter_frequent_subgraphs(fragments, min_frequency,
+                                          dont_generate_cycles, dont_generate_trees,
+                                          search_order, workers, support_counting, stats,
+                                          modes, checkpoint=checkpoint, memory_limit=memory_limit,
+                                          nx_graphs=nx_graphs)
+
+def sweep(min_supports, input_file, index_file,
+          dont_generate_cycles=False, dont_generate_trees=False, search_order='bfs', workers=1,
+          cache_file=None, stats=None, modes=None):
+    """
+    Mines once at the lowest of several supports and writes every frequent subgraph to a
+    pattern index file, from which the frequent subgraphs at each support, or at any support
+    above the lowest, are answered without mining again.  The arguments are those of gaston.
+
+    Subgraphs are counted by transaction, since a subgraph found at a higher support is
+    then always found at a lower one, and maximal subgraphs are not indexed, since whether
+    a subgraph is maximal depends on the support.
+
+    Returns:
+        a gaston_py.index.PatternIndex, whose query(min_support) returns the output gaston
+        would return at min_support
+    """
+    modes = search.Modes() if modes is None else modes
+    if modes.top_k is not None or modes.maximal:
+        raise ValueError("A sweep can not find the top_k or maximal subgraphs.")
+
+    min_support = min(min_supports)
+    graphs = _load_graphs(input_file, cache_file, workers, stats)
+    for checked_support in min_supports:
+        search.checked_min_frequency(checked_support, len(graphs))
+
+    fragments = factory.initial_node_fragments(graphs)
+    frequent_subgraphs = search.iter_frequent_subgraphs(
+        fragments, search.checked_min_frequency(min_support, len(graphs)), dont_generate_cycles,
+        dont_generate_trees, search_order, workers, stats=stats, modes=modes)
+
+    settings = {'input_file': input_file, 'dont_generate_cycles': dont_generate_cycles,
+                'dont_generate_trees': dont_generate_trees, 'max_edges': modes.max_edges,
+                'max_nodes': modes.max_nodes, 'closed': modes.closed}
+    return index_module.write_index(frequent_subgraphs, index_file, len(graphs), min_support,
+                                    settings)
 
 def print_graph_information(graphs, min_frequency):
     """ Prints relevant graph information such as min frequency and counts. """
@@ -46,21 +135,74 @@ def print_graph_information(graphs, min_frequency):
     print("Unique - nodes: {}, edges: {}\n".format(
         graph_module.count_unique_nodes(graphs), graph_module.count_unique_edges(graphs)))
 
-def write_frequent_subgraphs_to_file_path(output_file, frequent_output):
-    """ Writes frequently occurring subgraphs to the output filepath. """
-    frequent_graph_iter = iter(graph for graph, _, _ in frequent_output.values())
+def write_frequent_subgraphs_to_file_path(output_file, frequent_subgraphs):
+    """
+    Writes frequently occurring subgraphs to the output filepath.  Given an iterator from
+    iter_frequent_subgraphs, each subgraph is written as soon as it is found.
+    """
+    frequent_graph_iter = (graph for _, graph, _, _ in _iter_output(frequent_subgraphs))
     graph_module.write_line_graphs(frequent_graph_iter, output_file)
 
-def print_statistics(frequent_output):
-    """ Prints frequencies by graph type and embedding list. """
-    graph_type_frequency = Counter(graph_type for _, graph_type, _ in frequent_output.values())
+def print_statistics(frequent_subgraphs):
+    """
+    Prints frequencies by embedding list, and then by graph type.  Given an iterator from
+    iter_frequent_subgraphs, each subgraph is printed as soon as it is found.
+    """
+    graph_type_frequency = Counter()
+
+    print("Frequent Subgraphs:")
+    for embedding_list, _, graph_type, frequency in _iter_output(frequent_subgraphs):
+        graph_type_frequency[graph_type] += 1
+        print("embedding_list: {}, frequency: {}".format(
+            graph_module.format_embedding_list(embedding_list), frequency))
 
-    print("Frequencies:")
+    print("\nFrequencies:")
     print("Nodes: {}".format(graph_type_frequency['Node']))
     print("Paths: {}".format(graph_type_frequency['Path']))
     print("Trees: {}".format(graph_type_frequency['Tree']))
     print("Cycles: {}\n".format(graph_type_frequency['Cycle']))
 
-    print("Frequent Subgraphs:")
-    for embedding_list, (_, _, frequency) in frequent_output.items():
-        print("embedding_list: {}, frequency: {}".format(''.join(embedding_list), frequency))
+def _iter_output(frequent_subgraphs):
+    """ Iterates over a dictionary returned by gaston as iter_frequent_subgraphs would. """
+    if isinstance(frequent_subgraphs, dict):
+        return ((embedding_list,) + values for embedding_list, values in frequent_subgraphs.items())
+    return frequent_subgraphs
+
+def _mine_incrementally(min_support, input_file, state_file, dont_generate_cycles,
+                        dont_generate_trees, should_print_graph_information, search_order,
+                        workers, support_counting, cache_file, stats, modes, memory_limit):
+    if support_counting != 'transaction' or not modes.limits_size_only:
+        raise ValueError("A state file can only be kept when counting transactions, without "
+                         "top_k, closed or maximal.")
+
+    graphs = _load_graphs(input_file, cache_file, workers, stats)
+    min_frequency = search.checked_min_frequency(min_support, len(graphs))
+    if should_print_graph_information:
+        print_graph_information(graphs, min_frequency)
+
+    settings = {'dont_generate_cycles': dont_generate_cycles,
+                'dont_generate_trees': dont_generate_trees, 'max_edges': modes.max_edges,
+                'max_nodes': modes.max_nodes}
+    pattern_index = incremental.mine_incrementally(graphs, min_support, state_file, settings,
+                                                   search_order, workers, stats, memory_limit)
+    return pattern_index.query(min_support)
+
+def _mine_sample(min_support, input_file, sample, dont_generate_cycles, dont_generate_trees,
+                 should_print_graph_information, search_order, workers, cache_file, stats,
+                 modes, memory_limit):
+    graphs = _load_graphs(input_file, cache_file, workers, stats)
+    min_frequency = search.checked_min_frequency(min_support, len(graphs))
+    if should_print_graph_information:
+        print_graph_information(graphs, min_frequency)
+
+    return sampling.mine_sample(graphs, min_support, sample, dont_generate_cycles,
+                                dont_generate_trees, search_order, workers, stats, modes,
+                                memory_limit)
+
+def _load_graphs(input_file, cache_file, workers, stats):
+    if stats is not None:
+        start = time.perf_counter()
+    graphs = dataset.load_graphs(input_file, cache_file, workers)
+    if stats is not None:
+        stats.add_seconds('parse', start)
+    return graphs
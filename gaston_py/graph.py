@@ -1,96 +1,432 @@
+import bz2
 import functools
-import networkx as nx
-import matplotlib.pyplot as plt
+import gzip
+import itertools
+import lzma
+import multiprocessing
+import random
+import sys
+from array import array
 
-def draw_nx_graphs(output_file_path, frequent_output):
-    """ Save graphs with node and edge labels to output file path. """
+# The number of characters read at a time when parsing a line graph file
+PARSE_CHUNK_SIZE = 1 << 24
 
-    for graph_id, (embedding, (graph, graph_type, frequency)) in enumerate(frequent_output.items()):
+class LineGraph(object):
+    """
+    A source graph stored as CSR-style integer arrays.
+
+    Nodes and edges are referred to by their index.  Labels are interned integers
+    whose order matches the order of the original labels, so they can be compared
+    directly while searching.
+
+    id: the graph id
+    labels: the original labels, indexed by label id (shared by all graphs of a dataset)
+    node_ids: the original node ids, indexed by node
+    node_labels: the label id of each node
+    edge_labels: the label id of each edge
+    edge_nodes: the end points of each edge, flattened as (u0, v0, u1, v1, ...)
+    offsets: the adjacency of node u is stored in neighbors[offsets[u]:offsets[u + 1]]
+    neighbors: the neighboring node of each adjacency entry
+    incident_edges: the edge index of each adjacency entry
+    embeddings: embeddings annotated with '#=>' in the input file
+    removed: a flag for each node that is left out of a pruned view
+    index: the position of the graph in its dataset, used as its bit in graph bitsets
+    edge_keys: a random 64 bit Zobrist key for each edge, used to hash subgraphs
+    """
+
+    __slots__ = ('id', 'index', 'labels', 'node_ids', 'node_labels', 'edge_labels', 'edge_nodes',
+                 'offsets', 'neighbors', 'incident_edges', 'embeddings', 'removed', 'edge_keys')
+
+    def __init__(self, graph_id, labels, node_ids, node_labels, edges, embeddings=None, index=0):
+        self.id = graph_id
+        self.index = index
+        self.labels = labels
+        self.node_ids = node_ids
+        self.node_labels = array('i', node_labels)
+        self.edge_labels = array('i', (label for _, _, label in edges))
+        self.edge_nodes = array('i', (node for u, v, _ in edges for node in (u, v)))
+        self.embeddings = embeddings if embeddings is not None else []
+        self.removed = bytearray(len(node_ids))
+        self.edge_keys = _zobrist_keys(len(edges))
+
+        self._build_adjacency(range(len(edges)))
+
+    @staticmethod
+    def from_arrays(graph_id, labels, node_ids, arrays, embeddings=None, index=0):
+        """
+        Creates a graph from integer arrays that are used as they are, without copying them.
+        Any sequence of ints works, such as the memoryviews of a memory-mapped dataset file.
+
+        Args:
+            arrays: a tuple (node_labels, edge_labels, edge_nodes, offsets, neighbors,
+                incident_edges) laid out like the attributes of the same names
+        """
+        graph = LineGraph.__new__(LineGraph)
+        graph.id = graph_id
+        graph.index = index
+        graph.labels = labels
+        graph.node_ids = node_ids
+        graph.node_labels, graph.edge_labels, graph.edge_nodes, \
+            graph.offsets, graph.neighbors, graph.incident_edges = arrays
+        graph.embeddings = embeddings if embeddings is not None else []
+        graph.removed = bytearray(len(node_ids))
+        graph.edge_keys = _zobrist_keys(len(graph.edge_labels))
+        return graph
+
+    def _build_adjacency(self, edge_ids):
+        neighbors = [[] for _ in self.node_ids]
+        incident_edges = [[] for _ in self.node_ids]
+        edge_nodes = self.edge_nodes
+        for edge_id in edge_ids:
+            u, v = edge_nodes[2 * edge_id], edge_nodes[2 * edge_id + 1]
+            neighbors[u].append(v)
+            incident_edges[u].append(edge_id)
+            if u != v:
+                neighbors[v].append(u)
+                incident_edges[v].append(edge_id)
+
+        self.offsets = array('i', [0])
+        self.offsets.extend(itertools.accumulate(len(entries) for entries in neighbors))
+        self.neighbors = array('i', itertools.chain.from_iterable(neighbors))
+        self.incident_edges = array('i', itertools.chain.from_iterable(incident_edges))
+
+    def pruned_view(self, keep_node, keep_edge):
+        """
+        Returns a copy of the graph without the nodes and edges that are not kept.
+
+        The copy shares the labels, ids and Zobrist keys of this graph, so nodes and edges keep
+        their indices, and only the adjacency arrays are rebuilt.  This graph is not changed.
+
+        Args:
+            keep_node: a predicate taking a node index
+            keep_edge: a predicate taking an edge index, only asked for edges between kept nodes
+        """
+        view = LineGraph.__new__(LineGraph)
+        for attribute in ('id', 'index', 'labels', 'node_ids', 'node_labels', 'edge_labels',
+                          'edge_nodes', 'embeddings', 'edge_keys'):
+            setattr(view, attribute, getattr(self, attribute))
+
+        view.removed = bytearray(0 if node in self and keep_node(node) else 1
+                                 for node in range(len(self.node_ids)))
+        view._build_adjacency(edge_id for edge_id in sorted(set(self.incident_edges))
+                              if not view.removed[self.edge_nodes[2 * edge_id]] and
+                              not view.removed[self.edge_nodes[2 * edge_id + 1]] and
+                              keep_edge(edge_id))
+        return view
+
+    def __len__(self):
+        return len(self.node_ids) - sum(self.removed)
+
+    def __iter__(self):
+        return (node for node in range(len(self.node_ids)) if not self.removed[node])
+
+    def __contains__(self, node):
+        return not self.removed[node]
+
+    def label(self, node):
+        return self.node_labels[node]
+
+    def original_labels(self, embedding_list):
+        """ Translates the interned label ids of an embedding list back to the original labels. """
+        labels = self.labels
+        return tuple((x[0], x[1], labels[x[2]], labels[x[3]]) if isinstance(x, tuple) else labels[x]
+                     for x in embedding_list)
+
+    def adjacency(self, node):
+        """ Yields (neighbor, edge) pairs for the node. """
+        neighbors, incident_edges = self.neighbors, self.incident_edges
+        for index in range(self.offsets[node], self.offsets[node + 1]):
+            yield neighbors[index], incident_edges[index]
+
+    def number_of_nodes(self):
+        return len(self)
+
+    def number_of_edges(self):
+        return len(set(self.incident_edges))
+
+    def edge_ids(self):
+        """ The indices of the edges in the graph, which skip the edges left out of a view. """
+        return sorted(set(self.incident_edges))
+
+    def __getstate__(self):
+        # The arrays of a memory-mapped dataset are memoryviews, which can not be pickled, so
+        # graphs sent to spawned worker processes carry copies of them
+        return tuple(array('i', value.tobytes()) if isinstance(value, memoryview) else value
+                     for value in (getattr(self, name) for name in LineGraph.__slots__))
+
+    def __setstate__(self, state):
+        for name, value in zip(LineGraph.__slots__, state):
+            setattr(self, name, value)
+
+class Subgraph(object):
+    """
+    A connected subgraph of a LineGraph stored as a node tuple and the subgraph it extends.
+    Used as the occurrence of a pattern, in which case nodes are ordered like the pattern nodes.
+
+    nodes: node indices
+    parent: the subgraph without edge, or None for a single node
+    edge: the edge index added to parent
+    key: the XOR of the Zobrist keys of the edges, updated in O(1) when an edge is added
+    """
+
+    __slots__ = ('source_graph', 'nodes', 'parent', 'edge', 'key')
 
-        figure = plt.figure(graph_id)
+    def __init__(self, source_graph, nodes, parent=None, edge=None):
+        self.source_graph = source_graph
+        self.nodes = nodes
+        self.parent = parent
+        self.edge = edge
+        self.key = 0 if parent is None else parent.key ^ source_graph.edge_keys[edge]
 
-        node_labels = {id: data['label'] for (id, data) in graph.nodes_iter(data=True)}
-        edge_labels = {(u, v): data['label'] for (u, v, data) in graph.edges_iter(data=True)}
+    @staticmethod
+    def from_edges(source_graph, nodes, edges):
+        """ Creates a subgraph with the given nodes and edge indices. """
+        subgraph = Subgraph(source_graph, nodes)
+        for edge in edges:
+            subgraph = Subgraph(source_graph, nodes, subgraph, edge)
+        return subgraph
 
-        pos = nx.spring_layout(graph, k=0.8)
-        nx.draw_networkx(graph, pos, node_color='b', alpha=0.5, labels=node_labels)
-        nx.draw_networkx_edge_labels(graph, pos, edge_color='b', alpha=0.3, edge_labels=edge_labels)
+    @property
+    def edges(self):
+        """ The frozenset of edge indices, collected from the chain of extended subgraphs. """
+        edges, subgraph = [], self
+        while subgraph.parent is not None:
+            edges.append(subgraph.edge)
+            subgraph = subgraph.parent
+        return frozenset(edges)
 
-        plt.axis('off')
-        plt.title("{}\nGraph Type: {}, Frequency: {}".format(
-            ''.join(embedding), graph_type, frequency))
-        plt.savefig("{}graph{}.png".format(output_file_path, graph_id))
+    def extend(self, nodes, edge):
+        """ Returns a new subgraph with the given nodes and the edge added. """
+        return Subgraph(self.source_graph, nodes, self, edge)
 
-        plt.close(figure)
+    def __hash__(self):
+        return hash((self.source_graph.index, self.key if self.parent is not None else self.nodes))
 
-def create_nx_node_graph(source_node_id, node_label):
-    current_graph = nx.Graph()
-    current_graph.add_node(source_node_id, label=node_label)
-    return nx.freeze(current_graph)
+    def __eq__(self, other):
+        # Equal keys are confirmed by comparing the edge sets, so collisions are harmless
+        if self.key != other.key or self.source_graph is not other.source_graph:
+            return False
+        if self.parent is None or other.parent is None:
+            return self.parent is other.parent and self.nodes == other.nodes
+        return self.edges == other.edges
+
+def interned_labels(embedding_list, label_ids):
+    """
+    Translates the original labels of an embedding list to label ids, given as a dictionary
+    {label: label id}.  The inverse of LineGraph.original_labels.
+    """
+    return tuple((x[0], x[1], label_ids[x[2]], label_ids[x[3]]) if isinstance(x, tuple)
+                 else label_ids[x] for x in embedding_list)
+
+def format_embedding_list(embedding_list):
+    """ Joins the labels of an embedding list, writing DFS code entries as [i,j,edge,node]. """
+    return ''.join(entry if isinstance(entry, str) else '[{}]'.format(','.join(map(str, entry)))
+                   for entry in embedding_list)
+
+def to_nx_graph(subgraph):
+    """ Creates a networkx graph with the original node ids and labels of a subgraph. """
+    return from_graph_structure(*subgraph_structure(subgraph))
+
+def subgraph_structure(subgraph):
+    """ Returns the (nodes, edges) of a subgraph like graph_structure, without networkx. """
+    source_graph = subgraph.source_graph
+    labels, node_ids, edge_nodes = source_graph.labels, source_graph.node_ids, source_graph.edge_nodes
+
+    nodes = [(node_ids[node], labels[source_graph.node_labels[node]]) for node in subgraph.nodes]
+    edges = [(node_ids[edge_nodes[2 * edge_id]], node_ids[edge_nodes[2 * edge_id + 1]],
+              labels[source_graph.edge_labels[edge_id]]) for edge_id in sorted(subgraph.edges)]
+    return nodes, edges
+
+def graph_structure(nx_graph):
+    """ Returns the (nodes, edges) of a networkx graph, with their labels, as plain lists. """
+    nodes = [(node_id, data['label']) for node_id, data in nx_graph.nodes_iter(data=True)]
+    edges = [(u, v, data['label']) for u, v, data in nx_graph.edges_iter(data=True)]
+    return nodes, edges
+
+def from_graph_structure(nodes, edges):
+    """ Creates the frozen networkx graph of the (nodes, edges) returned by graph_structure. """
+    import networkx as nx
 
-def create_nx_graph(origin_id, origin_label, target_id, target_label, edge_label):
     graph = nx.Graph()
-    graph.add_node(origin_id, label=origin_label)
-    graph.add_node(target_id, label=target_label)
-    graph.add_edge(origin_id, target_id, label=edge_label)
+    for node_id, label in nodes:
+        graph.add_node(node_id, label=label)
+    for u, v, label in edges:
+        graph.add_edge(u, v, label=label)
     return nx.freeze(graph)
 
-def extend_nx_graph(prev_graph, origin_node_id, target_node_id, node_label, edge_label):
-    graph = nx.Graph(prev_graph)
-    graph.add_node(target_node_id, label=node_label)
-    graph.add_edge(origin_node_id, target_node_id, label=edge_label)
-    return nx.freeze(graph)
+def from_nx_graphs(nx_graphs):
+    """ Converts networkx graphs with 'label' attributes into LineGraphs. """
+    raw_graphs = []
+    for g_id, nx_graph in enumerate(nx_graphs):
+        raw_graph = _RawGraph(nx_graph.graph.get('id', g_id))
+        for node_id, data in nx_graph.nodes_iter(data=True):
+            raw_graph.add_node(node_id, data['label'])
+        for u, v, data in nx_graph.edges_iter(data=True):
+            raw_graph.add_edge(u, v, data['label'])
+        raw_graph.embeddings.extend(nx_graph.graph.get('embeddings', []))
+        raw_graphs.append(raw_graph)
+    return _intern_line_graphs(raw_graphs)
 
-def read_line_graphs(file_path):
+def read_line_graphs(file_path, workers=1):
     """
-    Returns a list of NetworkX graph objects read from a line graph file.
+    Returns a list of LineGraph objects read from a line graph file.
+
+    Files ending in .gz, .bz2 or .xz are decompressed, and '-' reads from stdin.  The file is
+    read in chunks of about PARSE_CHUNK_SIZE characters that end at a graph boundary, and
+    with workers > 1 and more than one chunk, the chunks are parsed in a pool of processes.
     """
-    graph_map = {}
+    with _open_line_graph_file(file_path) as f:
+        chunks = _graph_chunks(f, PARSE_CHUNK_SIZE)
+        if workers > 1:
+            chunks = list(chunks)
+
+        if workers > 1 and len(chunks) > 1:
+            pool = multiprocessing.Pool(min(workers, len(chunks)))
+            try:
+                chunk_graphs = pool.map(_parse_graphs, chunks)
+            finally:
+                pool.terminate()
+        else:
+            chunk_graphs = [_parse_graphs(chunk) for chunk in chunks]
+
+    raw_graphs = [raw_graph for raw_graphs in chunk_graphs for raw_graph in raw_graphs]
+    for graph_id, raw_graph in enumerate(raw_graphs, 1):
+        raw_graph.id = graph_id
+    return _intern_line_graphs(raw_graphs)
+
+def _open_line_graph_file(file_path):
+    if file_path == '-':
+        return open(sys.stdin.fileno(), 'r', closefd=False)
+    if file_path.endswith('.gz'):
+        return gzip.open(file_path, 'rt')
+    if file_path.endswith('.bz2'):
+        return bz2.open(file_path, 'rt')
+    if file_path.endswith('.xz'):
+        return lzma.open(file_path, 'rt')
+    return open(file_path, 'r')
+
+def _graph_chunks(f, chunk_size):
+    """ Yields the text of a file in chunks of whole graphs, each starting with a 't #' line. """
+    rest, block = '', f.read(chunk_size)
+    while block:
+        text, block = rest + block, f.read(chunk_size)
+        boundary = text.rfind('\nt #') if block else -1
+        if boundary < 0:
+            rest = text
+        else:
+            yield text[:boundary + 1]
+            rest = text[boundary + 1:]
+    if rest:
+        yield rest
 
-    with open(file_path, "r") as f:
-        graph_id = 0
+def _parse_graphs(text):
+    """ Parses the graphs in a chunk of a line graph file into _RawGraphs. """
+    raw_graphs = []
+    raw_graph = None
 
-        for line in f:
-            line = line.strip()
-            characters = line.split(" ")
+    for line in text.split('\n'):
+        line = line.strip()
+        if not line:
+            continue
+        first_character = line[0]
 
-            if line.startswith("t #"):
-                graph_id += 1
-                graph = nx.Graph(id=graph_id, embeddings=[])
-                graph_map[graph_id] = graph
+        if first_character == 'v':
+            characters = line.split(' ', 2)
+            raw_graph.add_node(characters[1], characters[2].strip('\'') if len(characters) > 2
+                               else '')
 
-            elif line.startswith("v"):
-                label = " ".join(characters[2:]).strip('\'')
-                graph_map[graph_id].add_node(characters[1], label=label)
+        elif first_character == 'e':
+            characters = line.split(' ', 3)
+            raw_graph.add_edge(characters[1], characters[2],
+                               characters[3].strip('\'') if len(characters) > 3 else '')
 
-            elif line.startswith("e"):
-                label = " ".join(characters[3:]).strip('\'')
-                graph_map[graph_id].add_edge(characters[1], characters[2], label=label)
+        elif line.startswith('t #'):
+            raw_graph = _RawGraph(len(raw_graphs) + 1)
+            raw_graphs.append(raw_graph)
 
-            elif line.startswith("#=>"):
-                embedding = characters[1]
-                graph_map[graph_id].graph['embeddings'].append(embedding)
-                
-    return graph_map.values()
+        elif line.startswith('#=>'):
+            raw_graph.embeddings.append(line.split(' ')[1])
+
+    return raw_graphs
+
+class _RawGraph(object):
+    """ A graph with original node ids and labels, collected before labels are interned. """
+
+    def __init__(self, graph_id):
+        self.id = graph_id
+        self.node_index = {} # {node_id: node}
+        self.node_ids = []
+        self.node_labels = []
+        self.edge_index = {} # {(u, v): edge}
+        self.edges = []
+        self.embeddings = []
+
+    def add_node(self, node_id, label):
+        if node_id in self.node_index:
+            self.node_labels[self.node_index[node_id]] = label
+        else:
+            self.node_index[node_id] = len(self.node_ids)
+            self.node_ids.append(node_id)
+            self.node_labels.append(label)
+
+    def add_edge(self, u_id, v_id, label):
+        u, v = self.node_index[u_id], self.node_index[v_id]
+        key = (u, v) if u <= v else (v, u)
+        if key in self.edge_index:
+            self.edges[self.edge_index[key]] = (u, v, label)
+        else:
+            self.edge_index[key] = len(self.edges)
+            self.edges.append((u, v, label))
+
+    def __getstate__(self):
+        # The indexes are only needed while parsing, so they are not sent back by parse workers
+        return (self.id, self.node_ids, self.node_labels, self.edges, self.embeddings)
+
+    def __setstate__(self, state):
+        self.id, self.node_ids, self.node_labels, self.edges, self.embeddings = state
+
+_ZOBRIST_KEYS = array('Q')
+_ZOBRIST_RANDOM = random.Random(0)
+
+def _zobrist_keys(count):
+    """ Returns count random 64 bit keys, the same ones on every call and in every process. """
+    while len(_ZOBRIST_KEYS) < count:
+        _ZOBRIST_KEYS.append(_ZOBRIST_RANDOM.getrandbits(64))
+    return _ZOBRIST_KEYS[:count]
+
+def _intern_line_graphs(raw_graphs):
+    labels = sorted(set(label for raw_graph in raw_graphs for label in raw_graph.node_labels) |
+                    set(label for raw_graph in raw_graphs for _, _, label in raw_graph.edges))
+    label_ids = {label: label_id for label_id, label in enumerate(labels)}
+
+    return [LineGraph(raw_graph.id, labels, raw_graph.node_ids,
+                      [label_ids[label] for label in raw_graph.node_labels],
+                      [(u, v, label_ids[label]) for u, v, label in raw_graph.edges],
+                      raw_graph.embeddings, index)
+            for index, raw_graph in enumerate(raw_graphs)]
 
 def write_line_graphs(graphs, file_path):
     """ Write line graphs to file path. """
     with open(file_path, "w") as f:
         for g_id, graph in enumerate(graphs):
-            if "id" in graph.graph:
-                f.write("t # {}\n".format(graph.graph['id']))
-            else:
-                f.write("t # {}\n".format(g_id))
+            write_line_graph(f, graph, g_id)
+
+def write_line_graph(f, graph, g_id):
+    """ Writes a networkx graph to an open file in line graph format, with g_id if it has no id. """
+    if "id" in graph.graph:
+        f.write("t # {}\n".format(graph.graph['id']))
+    else:
+        f.write("t # {}\n".format(g_id))
 
-            node_dict = {}
+    node_dict = {}
 
-            for index, (node_id, data) in enumerate(graph.nodes_iter(data=True)):
-                node_dict[node_id] = index
-                node_label = data['label']
-                f.write("v {} {}\n".format(index, node_label))
+    for index, (node_id, data) in enumerate(graph.nodes_iter(data=True)):
+        node_dict[node_id] = index
+        node_label = data['label']
+        f.write("v {} {}\n".format(index, node_label))
 
-            for source, target, data in graph.edges_iter(data=True):
-                f.write("e {} {} {}\n".format(node_dict[source], node_dict[target], data['label']))
+    for source, target, data in graph.edges_iter(data=True):
+        f.write("e {} {} {}\n".format(node_dict[source], node_dict[target], data['label']))
 
 def count_total_nodes(graphs):
     return functools.reduce(lambda total, graph: total + graph.number_of_nodes(), graphs, 0)
@@ -99,7 +435,18 @@ def count_total_edges(graphs):
     return functools.reduce(lambda total, graph: total + graph.number_of_edges(), graphs, 0)
 
 def count_unique_nodes(graphs):
-    return len(set(data['label'] for graph in graphs for _, data in graph.nodes_iter(data=True)))
+    return len(set(graph.node_labels[node] for graph in graphs for node in graph))
 
 def count_unique_edges(graphs):
-    return len(set(edge['label'] for graph in graphs for _, _, edge in graph.edges_iter(data=True)))
+    return len(set(graph.edge_labels[edge_id] for graph in graphs for edge_id in graph.edge_ids()))
+
+def update_digest(digest, graphs):
+    """
+    Updates a hashlib digest with the node ids, original labels and edges of graphs, so that
+    graphs parsed from different files or runs have the same digest if they are the same.
+    """
+    for graph in graphs:
+        labels = graph.labels
+        digest.update(repr((graph.node_ids, [labels[label] for label in graph.node_labels],
+                            list(graph.edge_nodes),
+                            [labels[label] for label in graph.edge_labels])).encode())
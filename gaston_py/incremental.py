@@ -0,0 +1,160 @@
+
+# Incremental mining keeps the state of a run in a pattern index file: the frequent subgraphs
+# with their frequencies, the border of infrequent subgraphs refined from them, and a digest
+# of the graphs mined.  When graphs are appended to the input, only the new graphs are mined
+# for the frequent subgraphs and the border, and only the subgraphs that became frequent are
+# mined on all graphs.
+import hashlib
+import itertools
+import os
+
+import gaston_py.embedding as embedding
+import gaston_py.factory as factory
+import gaston_py.graph as graph_module
+import gaston_py.index as index_module
+import gaston_py.search as search
+
+def mine_incrementally(graphs, min_support, state_file, settings, search_order='bfs',
+                       workers=1, stats=None, memory_limit=None):
+    """
+    Finds the frequent subgraphs of graphs at min_support, counted by transaction, and keeps
+    the state of the run in state_file.  If state_file holds the state of a run with the same
+    min_support and settings over the first graphs of graphs, only the graphs added since
+    are mined.
+
+    Args:
+        graphs: the line graphs to mine
+        min_support: a float specifying the minimum support
+        state_file: the path of the state file, which is created if it does not exist
+        settings: a dictionary of the search options dont_generate_cycles,
+            dont_generate_trees, max_edges and max_nodes
+        search_order, workers, stats, memory_limit: as in gaston, used when all graphs are
+            mined
+
+    Returns:
+        a gaston_py.index.PatternIndex of the frequent subgraphs of graphs at min_support
+    """
+    state = _read_state(state_file, min_support, settings)
+
+    digest = hashlib.sha1()
+    if state is not None:
+        graph_module.update_digest(digest, graphs[:state.graph_count])
+        if state.graph_count > len(graphs) or digest.hexdigest() != state.digest:
+            state, digest = None, hashlib.sha1()
+
+    if state is None:
+        pattern_index = _mine(graphs, min_support, settings, search_order, workers, stats,
+                              memory_limit)
+        graph_module.update_digest(digest, graphs)
+    elif state.graph_count == len(graphs):
+        return state
+    else:
+        pattern_index = _update(state, graphs, min_support, settings)
+        graph_module.update_digest(digest, graphs[state.graph_count:])
+
+    pattern_index.digest = digest.hexdigest()
+    pattern_index.write(state_file)
+    return pattern_index
+
+def _read_state(state_file, min_support, settings):
+    """ Returns the state in state_file, or None if there is none for min_support and settings. """
+    if not os.path.exists(state_file):
+        return None
+
+    state = index_module.read_index(state_file)
+    if state.border is None:
+        raise ValueError("The pattern index file '{}' holds no state for incremental "
+                         "mining.".format(state_file))
+    if state.min_support != min_support or state.settings != settings:
+        return None
+    return state
+
+def _mine(graphs, min_support, settings, search_order, workers, stats, memory_limit):
+    border = {}
+    min_frequency = search.checked_min_frequency(min_support, len(graphs))
+    frequent_subgraphs = search.iter_frequent_subgraphs(
+        factory.initial_node_fragments(graphs), min_frequency,
+        settings['dont_generate_cycles'], settings['dont_generate_trees'], search_order,
+        workers, stats=stats, modes=_modes(settings), border=border, memory_limit=memory_limit)
+
+    pattern_index = index_module.PatternIndex.from_subgraphs(frequent_subgraphs, len(graphs),
+                                                             min_support, settings)
+    pattern_index.border = {graphs[0].original_labels(embedding_list): frequency
+                            for embedding_list, frequency in border.items()}
+    return pattern_index
+
+def _update(state, graphs, min_support, settings):
+    """
+    Updates the state of a run over the first state.graph_count graphs to all graphs.
+
+    Every subgraph contained in the old graphs that has a frequent parent is either frequent
+    or in the border of the state, so the new frequency of each such subgraph is its old one
+    plus its frequency in the new graphs.  Subgraphs with a parent frequent in the old graphs
+    that only the new graphs contain are found by refining the frequent subgraphs on the new
+    graphs.  A subgraph that becomes frequent is mined on all graphs, with everything refined
+    from it.
+    """
+    original_labels = graphs[0].original_labels
+    label_ids = {label: label_id for label_id, label in enumerate(graphs[0].labels)}
+    min_frequency = search.checked_min_frequency(min_support, len(graphs))
+    options = {'dont_generate_cycles': settings['dont_generate_cycles'],
+               'dont_generate_trees': settings['dont_generate_trees'],
+               'modes': _modes(settings)}
+
+    patterns = {graph_module.interned_labels(embedding_list, label_ids): pattern
+                for embedding_list, *pattern in state.patterns}
+    old_border = {graph_module.interned_labels(embedding_list, label_ids): frequency
+                  for embedding_list, frequency in state.border.items()}
+
+    new_frequencies = {}
+    for _ in search.iter_guided_fragments(
+            factory.initial_node_fragments(graphs[state.graph_count:]), patterns,
+            supports=new_frequencies, **options):
+        pass
+
+    frequencies = {}
+    for embedding_list in itertools.chain(patterns, old_border, new_frequencies):
+        old_frequency = patterns[embedding_list][1] if embedding_list in patterns \
+            else old_border.get(embedding_list, 0)
+        frequencies[embedding_list] = old_frequency + new_frequencies.get(embedding_list, 0)
+
+    # Subgraphs that became frequent all have a parent that was frequent before
+    became_frequent = set(embedding_list for embedding_list, frequency in frequencies.items()
+                          if frequency >= min_frequency and embedding_list not in patterns)
+    ancestors = set()
+    for embedding_list in became_frequent:
+        parent = embedding.parent_embedding_list(embedding_list)
+        while parent is not None and parent not in ancestors:
+            ancestors.add(parent)
+            parent = embedding.parent_embedding_list(parent)
+
+    fragments = [fragment for fragment in search.iter_guided_fragments(
+                     factory.initial_node_fragments(graphs), ancestors, became_frequent,
+                     **options)
+                 if fragment.embedding_list in became_frequent]
+    border = {}
+    new_subgraphs = list(search.iter_refined_subgraphs(fragments, min_frequency,
+                                                       border=border, **options))
+
+    frequent = set(graph_module.interned_labels(embedding_list, label_ids)
+                   for embedding_list, _, _, _ in new_subgraphs)
+    subgraphs = list(new_subgraphs)
+    for embedding_list, (graph_type, _, nodes, edges) in patterns.items():
+        if frequencies[embedding_list] >= min_frequency:
+            frequent.add(embedding_list)
+            subgraphs.append((original_labels(embedding_list), (nodes, edges), graph_type,
+                              frequencies[embedding_list]))
+
+    for embedding_list, frequency in frequencies.items():
+        if frequency < min_frequency and (len(embedding_list) == 1 or
+                                          embedding.parent_embedding_list(embedding_list)
+                                          in frequent):
+            border[embedding_list] = frequency
+
+    return index_module.PatternIndex.from_subgraphs(
+        subgraphs, len(graphs), min_support, settings,
+        {original_labels(embedding_list): frequency
+         for embedding_list, frequency in border.items()})
+
+def _modes(settings):
+    return search.Modes(settings['max_edges'], settings['max_nodes'])
@@ -0,0 +1,139 @@
+
+import json
+
+import gaston_py.graph as graph_module
+import gaston_py.search as search
+
+# A pattern index file is a JSON object holding the settings of the run that built it and,
+# for each frequent subgraph in output order, its embedding list, graph type, frequency and
+# the original node ids and labels of one of its occurrences.  An index kept for incremental
+# mining also holds the border of the run and a digest of the graphs it mined.
+FORMAT = 'gaston pattern index'
+VERSION = 1
+
+class PatternIndex(object):
+    """
+    The frequent subgraphs of a run at min_support, from which the frequent subgraphs at any
+    higher min_support are answered without mining again.
+
+    graph_count: the number of graphs mined
+    min_support: the support the index was built at
+    settings: the search options of the run, such as dont_generate_cycles and closed
+    patterns: a list of (embedding_list, graph_type, frequency, nodes, edges) in output order,
+        where nodes are (node id, label) and edges (u, v, label) tuples
+    border: for incremental mining, a dictionary {embedding_list: frequency} of the border
+        found by the search, or None
+    digest: for incremental mining, the digest of the mined graphs, or None
+    """
+
+    def __init__(self, graph_count, min_support, settings, patterns, border=None, digest=None):
+        self.graph_count = graph_count
+        self.min_support = min_support
+        self.settings = settings
+        self.patterns = patterns
+        self.border = border
+        self.digest = digest
+
+    @staticmethod
+    def from_subgraphs(frequent_subgraphs, graph_count, min_support, settings, border=None,
+                       digest=None):
+        """
+        Creates the index of the frequent subgraphs of a run, given as tuples (embedding_list,
+        subgraph, graph_type, frequency) like those of iter_frequent_subgraphs, or with the
+        (nodes, edges) of a pattern in place of its networkx subgraph.
+        """
+        # Only the labels of each subgraph are kept, not its networkx graph
+        patterns = search.ordered_output(
+            (embedding_list, graph if isinstance(graph, tuple) else graph_module.graph_structure(graph),
+             graph_type, frequency)
+            for embedding_list, graph, graph_type, frequency in frequent_subgraphs)
+
+        return PatternIndex(graph_count, min_support, settings,
+                            [(embedding_list, graph_type, frequency) + structure
+                             for embedding_list, (structure, graph_type, frequency)
+                             in patterns.items()],
+                            border, digest)
+
+    def min_frequency(self, min_support):
+        """ Returns the frequency a subgraph needs to reach min_support, like gaston. """
+        return search.checked_min_frequency(min_support, self.graph_count)
+
+    def count(self, min_support):
+        """ Returns the number of frequent subgraphs at min_support. """
+        min_frequency = self._checked_min_frequency(min_support)
+        return sum(1 for _, _, frequency, _, _ in self.patterns if frequency >= min_frequency)
+
+    def query(self, min_support):
+        """
+        Returns the frequent subgraphs at min_support, as gaston would with the settings of
+        the index.
+
+        Returns:
+            a dictionary of the form {embedding_list: (subgraph, graph type, frequency)}
+        """
+        min_frequency = self._checked_min_frequency(min_support)
+        return {embedding_list: (graph_module.from_graph_structure(nodes, edges), graph_type, frequency)
+                for embedding_list, graph_type, frequency, nodes, edges in self.patterns
+                if frequency >= min_frequency}
+
+    def write(self, file_path):
+        """ Writes the index to a file that read_index reads. """
+        contents = {'format': FORMAT, 'version': VERSION, 'graph_count': self.graph_count,
+                    'min_support': self.min_support, 'settings': self.settings,
+                    'patterns': self.patterns}
+        if self.border is not None:
+            contents['border'] = list(self.border.items())
+            contents['digest'] = self.digest
+        with open(file_path, 'w') as f:
+            json.dump(contents, f)
+
+    def _checked_min_frequency(self, min_support):
+        min_frequency = self.min_frequency(min_support)
+        if min_frequency < self.min_frequency(self.min_support):
+            raise ValueError("The index was built at support {}, so it can not answer support "
+                             "{}.".format(self.min_support, min_support))
+        return min_frequency
+
+def write_index(frequent_subgraphs, file_path, graph_count, min_support, settings):
+    """
+    Writes the frequent subgraphs of a run to a pattern index file and returns the index.
+
+    Args:
+        frequent_subgraphs: an iterator from iter_frequent_subgraphs, mined with transaction
+            support counting
+        file_path: the path of the index file
+        graph_count: the number of graphs mined
+        min_support: the support the subgraphs were mined at
+        settings: a JSON serializable dictionary of the search options of the run
+    """
+    index = PatternIndex.from_subgraphs(frequent_subgraphs, graph_count, min_support, settings)
+    index.write(file_path)
+    return index
+
+def read_index(file_path):
+    """ Returns the PatternIndex of a file written by write_index. """
+    with open(file_path) as f:
+        try:
+            contents = json.load(f)
+        except ValueError:
+            contents = None
+
+    if not isinstance(contents, dict) or contents.get('format') != FORMAT:
+        raise ValueError("'{}' is not a gaston pattern index file.".format(file_path))
+    if contents['version'] != VERSION:
+        raise ValueError("The pattern index file '{}' was written by an incompatible version, "
+                         "build it again.".format(file_path))
+
+    # JSON turns the tuples of embedding lists and edges into lists
+    patterns = [(_embedding_list(embedding_list), graph_type, frequency,
+                 [tuple(node) for node in nodes], [tuple(edge) for edge in edges])
+                for embedding_list, graph_type, frequency, nodes, edges in contents['patterns']]
+    border = None
+    if 'border' in contents:
+        border = {_embedding_list(embedding_list): frequency
+                  for embedding_list, frequency in contents['border']}
+    return PatternIndex(contents['graph_count'], contents['min_support'], contents['settings'],
+                        patterns, border, contents.get('digest'))
+
+def _embedding_list(entries):
+    return tuple(tuple(entry) if isinstance(entry, list) else entry for entry in entries)
@@ -1,19 +1,17 @@
 
-import gaston_py.graph as graph_module
 from gaston_py.fragment import Fragment
 from gaston_py.level import Level
 
 class Node(Fragment):
     """ A fragment containing a node subgraph. """
 
-    def __init__(self, source_node_id, source_graph):
+    __slots__ = ()
 
-        node_label = source_graph.node[source_node_id]['label']
-        current_graph = graph_module.create_nx_node_graph(source_node_id, node_label)
+    def __init__(self, node_label, occurrences):
 
         embedding_list = tuple([node_label])
 
-        super().__init__(source_node_id, current_graph, source_graph, embedding_list)
+        super().__init__(embedding_list, occurrences)
 
     def __str__(self):
         return "Node"
@@ -0,0 +1,173 @@
+
+# Drawing needs matplotlib, which takes longer to import than a small dataset takes to mine,
+# so this module is only imported when frequent subgraphs are drawn.
+import heapq
+import multiprocessing
+from collections import defaultdict
+
+import matplotlib
+matplotlib.use('Agg')
+import matplotlib.pyplot as plt
+import networkx as nx
+from networkx.algorithms import isomorphism
+
+import gaston_py.graph as graph_module
+
+# The number of drawings sent to a drawing process at a time
+DRAWING_BATCH_SIZE = 16
+
+class DrawingPool(object):
+    """
+    Draws graphs with node and edge labels into a folder in a pool of processes, as they are
+    added, so they are drawn while the search runs.
+
+    Graphs are drawn in batches of graphs with the same shape, so the layout of a shape is
+    computed once per batch.  Only the graphs select_drawings would select are kept, so with
+    top_frequency, only the top_frequency most frequent graphs found so far wait to be drawn
+    until the pool is closed.  Each drawing is named graph[i].png after its graph_id i.
+
+    Args:
+        output_file_path: the folder the drawings are saved to, ending with a separator
+        workers: the number of drawing processes
+        max_drawings: if given, only the graphs with the first max_drawings graph ids are drawn
+        top_frequency: if given, only the top_frequency most frequent graphs are drawn
+    """
+
+    def __init__(self, output_file_path, workers=1, max_drawings=None, top_frequency=None):
+        self.output_file_path = output_file_path
+        self.selection = _DrawingSelection(max_drawings, top_frequency)
+        self.shapes = defaultdict(list) # {shape_key(graph): [drawing]}
+        self.drawn = []
+        self.pool = multiprocessing.Pool(workers)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        try:
+            if exc_type is None:
+                self.close()
+        finally:
+            self.pool.terminate()
+
+    def add(self, graph_id, embedding, graph, graph_type, frequency):
+        """ Adds a graph, whose graph_id is its position in the output, to draw. """
+        drawing = (graph_id, embedding, graph, graph_type, frequency)
+        if self.selection.add(drawing):
+            self._batch(drawing)
+
+    def close(self):
+        """ Draws the graphs left and waits until every graph is drawn. """
+        for drawing in self.selection.kept():
+            self._batch(drawing)
+        for drawings in self.shapes.values():
+            if len(drawings) > 0:
+                self._draw(drawings)
+        self.shapes.clear()
+
+        for drawn in self.drawn:
+            drawn.get()
+
+    def _batch(self, drawing):
+        drawings = self.shapes[shape_key(drawing[2])]
+        drawings.append(drawing)
+        if len(drawings) == DRAWING_BATCH_SIZE:
+            self._draw(list(drawings))
+            del drawings[:]
+
+    def _draw(self, drawings):
+        self.drawn.append(self.pool.apply_async(_draw_batch,
+                                                ((self.output_file_path, drawings),)))
+
+def select_drawings(frequent_output, max_drawings=None, top_frequency=None):
+    """
+    Returns the graphs to draw as a list of (graph_id, embedding, graph, graph type, frequency)
+    in output order, where graph_id is the position of the graph in frequent_output.
+    """
+    selection = _DrawingSelection(max_drawings, top_frequency)
+    drawings = [drawing for drawing
+                in ((graph_id, embedding, graph, graph_type, frequency)
+                    for graph_id, (embedding, (graph, graph_type, frequency))
+                    in enumerate(frequent_output.items()))
+                if selection.add(drawing)]
+    return drawings + selection.kept()
+
+class _DrawingSelection(object):
+    """
+    Selects drawings in order of their graph ids, one at a time.  The first max_drawings are
+    selected as they are added.  With top_frequency, the most frequent drawings are kept in a
+    heap, the earliest first among equally frequent ones, until kept() returns them.
+    """
+
+    def __init__(self, max_drawings, top_frequency):
+        self.max_drawings = max_drawings
+        self.top_frequency = top_frequency
+        self.most_frequent = [] # a heap of (frequency, -graph_id, drawing)
+
+    def add(self, drawing):
+        """ Returns True if the drawing is selected now.  Otherwise it may be kept. """
+        graph_id, frequency = drawing[0], drawing[4]
+        if self.top_frequency is None:
+            return self.max_drawings is None or graph_id < self.max_drawings
+
+        if len(self.most_frequent) < self.top_frequency:
+            heapq.heappush(self.most_frequent, (frequency, -graph_id, drawing))
+        elif self.top_frequency > 0:
+            heapq.heappushpop(self.most_frequent, (frequency, -graph_id, drawing))
+        return False
+
+    def kept(self):
+        """ Returns the kept drawings that are selected, in order of their graph ids. """
+        drawings = sorted((drawing for _, _, drawing in self.most_frequent),
+                          key=lambda drawing: drawing[0])
+        return drawings[:self.max_drawings] if self.max_drawings is not None else drawings
+
+class LayoutCache(object):
+    """
+    Layouts of graph shapes, where graphs have the same shape if they are isomorphic when
+    their labels are ignored.  A cached layout is mapped onto the nodes of each graph of
+    its shape.
+    """
+
+    def __init__(self):
+        self.layouts = defaultdict(list) # {shape_key(graph): [(graph, layout)]}
+
+    def layout(self, graph):
+        """ Returns the spring layout of a graph, computing it once for every shape. """
+        layouts = self.layouts[shape_key(graph)]
+        for cached_graph, cached_layout in layouts:
+            matcher = isomorphism.GraphMatcher(graph, cached_graph)
+            if matcher.is_isomorphic():
+                return {node: cached_layout[cached_node]
+                        for node, cached_node in matcher.mapping.items()}
+
+        layout = nx.spring_layout(graph, k=0.8)
+        layouts.append((graph, layout))
+        return layout
+
+def shape_key(graph):
+    """ Returns a key that is equal for graphs of the same shape. """
+    return tuple(sorted(graph.degree().values()))
+
+def _draw_batch(arguments):
+    output_file_path, drawings = arguments
+    layout_cache = LayoutCache()
+    for graph_id, embedding, graph, graph_type, frequency in drawings:
+        _draw_graph(output_file_path, graph_id, embedding, graph, graph_type, frequency,
+                    layout_cache.layout(graph))
+
+def _draw_graph(output_file_path, graph_id, embedding, graph, graph_type, frequency, pos):
+    figure = plt.figure(graph_id)
+
+    node_labels = {id: data['label'] for (id, data) in graph.nodes_iter(data=True)}
+    edge_labels = {(u, v): data['label'] for (u, v, data) in graph.edges_iter(data=True)}
+
+    nx.draw_networkx(graph, pos, node_color='b', alpha=0.5, labels=node_labels)
+    nx.draw_networkx_edge_labels(graph, pos, edge_color='b', alpha=0.3, edge_labels=edge_labels)
+
+    plt.axis('off')
+    plt.title("{}\nGraph Type: {}, Frequency: {}".format(
+        graph_module.format_embedding_list(embedding), graph_type, frequency))
+    plt.savefig("{}graph{}.png".format(output_file_path, graph_id))
+
+    plt.close(figure)
@@ -5,12 +5,12 @@ from gaston_py.level import Level
 class Path(Fragment):
     """ A fragment containing a path subgraph. """
 
-    def __init__(self, source_node_id, back_node_id, current_graph,
-                 source_graph, embedding_list,
-                 total_symmetry, front_symmetry, back_symmetry):
+    __slots__ = ('total_symmetry', 'front_symmetry', 'back_symmetry')
 
-        super().__init__(source_node_id, current_graph, source_graph, embedding_list)
-        self.back_node_id = back_node_id
+    def __init__(self, embedding_list, occurrences, total_symmetry, front_symmetry, back_symmetry,
+                 bitset=None):
+
+        super().__init__(embedding_list, occurrences, bitset)
         self.total_symmetry = total_symmetry
         self.front_symmetry = front_symmetry
         self.back_symmetry = back_symmetry
@@ -34,29 +34,41 @@ class Path(Fragment):
             reversed_list = tuple(reversed(embedding_list))
         return 0 if embedding_list == reversed_list else 1 if embedding_list < reversed_list else -1
 
-    # @staticmethod
-    # def new_path_symmetries(prev_symmetries, edge1, new_edge):
-        
-        # old_total, old_front, old_back = prev_symmetries
+    def extend(self, origin, edge_label, node_label):
+        """
+        Returns (embedding_list, order, symmetries) of the path created by adding a node
+        to the end of this path at origin, which is either 0 or the last node.
 
-        # O(1) method is direction dependent (needs to be changed if used for prepending)
-        # new_front = old_total
-        # if old_back == 0:
-        #     new_total = 1 if edge1 < new_edge else 0 if edge1 == new_edge else -1
-        # elif old_back == 1:
-        #     new_total = 1 if edge1 <= new_edge else -1
+        The direction and total symmetry of the new path are decided by its end labels and,
+        if those are equal, by the back (or front) symmetry of this path.  The symmetry of the
+        new path without its first node does not follow from the symmetries of this path, so
+        it is computed with one O(n) comparison.
+        """
+        embedding_list = self.embedding_list
+        last_node = len(self.node_labels) - 1
+        total, front, back = self.symmetries
 
-        # new_back = calculate new back
+        # Extending the front is extending the end of the reversed path
+        if origin == last_node:
+            base, base_total, base_back = embedding_list, total, back
+            base_order = list(range(last_node + 1))
+        else:
+            base, base_total, base_back = embedding_list[::-1], -total, -front
+            base_order = list(range(last_node, -1, -1))
 
-        # return (new_total, new_front, new_back)
+        ends = Path._compare(base[:2], (node_label, edge_label))
+        is_reversed = ends > 0 or (ends == 0 and base_back < 0)
+        new_total = 0 if ends == 0 and base_back == 0 else 1
 
-    @staticmethod
-    def new_path_symmetries(embedding_list):
-        # slower methods being used to ensure correctness
-        reversed_list = tuple(reversed(embedding_list))
+        # The symmetry of the new path without its first node, the only one that is not known
+        inner_symmetry = Path.compute_symmetry(base[2:] + (edge_label, node_label))
 
-        new_front = Path.compute_symmetry(embedding_list[:-2], reversed_list[:-2])
-        new_total = Path.compute_symmetry(embedding_list, reversed_list)
-        new_back = Path.compute_symmetry(embedding_list[2:], reversed_list[2:])
+        if is_reversed:
+            return ((node_label, edge_label) + base[::-1], [last_node + 1] + base_order[::-1],
+                    (new_total, -inner_symmetry, -base_total))
+        return (base + (edge_label, node_label), base_order + [last_node + 1],
+                (new_total, base_total, inner_symmetry))
 
-        return (new_total, new_front, new_back)
\ No newline at end of file
+    @staticmethod
+    def _compare(a, b):
+        return 0 if a == b else -1 if a < b else 1
\ No newline at end of file
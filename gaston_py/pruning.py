@@ -0,0 +1,87 @@
+
+from collections import Counter
+
+def label_support(graphs, support_counting='transaction'):
+    """
+    Counts the support of each node label and of each edge triple in one sweep over the graphs.
+
+    An edge triple is (node label, edge label, node label), with the smaller node label first.
+
+    Args:
+        graphs: a list of LineGraphs
+        support_counting: 'transaction' to count the graphs containing a label or triple, or
+            'occurrence' to count every node and edge
+
+    Returns:
+        a tuple (node_support, edge_support) of Counters keyed by node label and edge triple
+    """
+    node_support, edge_support = Counter(), Counter()
+
+    for graph in graphs:
+        node_labels, edge_nodes = graph.node_labels, graph.edge_nodes
+        graph_node_labels = [node_labels[node] for node in graph]
+        graph_edge_triples = [_edge_triple(node_labels[edge_nodes[2 * edge_id]],
+                                           graph.edge_labels[edge_id],
+                                           node_labels[edge_nodes[2 * edge_id + 1]])
+                              for edge_id in graph.edge_ids()]
+
+        if support_counting == 'transaction':
+            node_support.update(set(graph_node_labels))
+            edge_support.update(set(graph_edge_triples))
+        else:
+            node_support.update(graph_node_labels)
+            edge_support.update(graph_edge_triples)
+
+    return node_support, edge_support
+
+def prune_graphs(graphs, min_freq, support_counting='transaction'):
+    """
+    Returns a pruned view of each graph, without the nodes whose label is infrequent and,
+    when counting transactions, without the edges whose triple is infrequent.
+    The given graphs are not changed, so they can be pruned again for another min_freq.
+
+    Every occurrence of a subgraph contains an occurrence of each of its edges, so a graph
+    containing a subgraph also contains all of its triples.  Occurrences may share an edge, so
+    with support_counting='occurrence' a triple can be less frequent than a subgraph containing
+    it, and only node labels are pruned, as the search always did.
+    """
+    return prune_to_labels(graphs, *frequent_labels(graphs, min_freq, support_counting))
+
+def frequent_labels(graphs, min_freq, support_counting='transaction'):
+    """
+    Returns a tuple (node_labels, edge_triples) of the sets of node labels and edge triples
+    that prune_graphs keeps, where edge_triples is None if all edges are kept.
+    """
+    node_support, edge_support = label_support(graphs, support_counting)
+    node_labels = set(label for label, support in node_support.items() if support >= min_freq)
+    if support_counting != 'transaction':
+        return node_labels, None
+    return node_labels, set(triple for triple, support in edge_support.items()
+                            if support >= min_freq)
+
+def prune_to_labels(graphs, node_labels, edge_triples=None):
+    """
+    Returns a pruned view of each graph, without the nodes whose label is not in node_labels
+    and, unless edge_triples is None, without the edges whose triple is not in edge_triples.
+    """
+    views = []
+    for graph in graphs:
+        graph_node_labels, edge_nodes, edge_labels = \
+            graph.node_labels, graph.edge_nodes, graph.edge_labels
+
+        def keep_node(node):
+            return graph_node_labels[node] in node_labels
+
+        def keep_edge(edge_id):
+            if edge_triples is None:
+                return True
+            return _edge_triple(graph_node_labels[edge_nodes[2 * edge_id]],
+                                edge_labels[edge_id],
+                                graph_node_labels[edge_nodes[2 * edge_id + 1]]) in edge_triples
+
+        views.append(graph.pruned_view(keep_node, keep_edge))
+
+    return views
+
+def _edge_triple(u_label, edge_label, v_label):
+    return (u_label, edge_label, v_label) if u_label <= v_label else (v_label, edge_label, u_label)
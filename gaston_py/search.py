@@ -1,112 +1,866 @@
 
-from collections import deque
+import copy
+import functools
+import hashlib
+import heapq
+import itertools
+import multiprocessing
+import queue
+import time
+from collections import deque, namedtuple
 
 import gaston_py.factory as factory
+import gaston_py.graph as graph_module
+import gaston_py.pruning as pruning
+import gaston_py.spill as spill
+from gaston_py.fragment import graph_bitset, popcount
 from gaston_py.level import Level
+from gaston_py.stats import SearchStats
+
+SEARCH_ORDERS = ('bfs', 'dfs')
+SUPPORT_COUNTINGS = ('transaction', 'occurrence')
+TASK_SECONDS = 1.0
+
+_Options = namedtuple('_Options', ['min_freq', 'dont_generate_cycles', 'dont_generate_trees',
+                                   'search_order', 'support_counting', 'max_edges', 'max_nodes',
+                                   'top_frequencies', 'closed', 'maximal', 'border',
+                                   'nx_graphs'])
+
+class Modes(object):
+    """
+    The options limiting which frequent subgraphs a search finds, passed as modes to gaston
+    or find_frequent_subgraphs.
+
+    max_edges: if given, subgraphs with this many edges are not refined further
+    max_nodes: if given, no node is added to subgraphs with this many nodes, though cycles
+        may still be closed on them
+    top_k: if given, only the top_k most frequent subgraphs are found, and those as frequent
+        as the k-th.  min_freq is raised to the k-th frequency found so far while searching,
+        so subgraphs must be counted by transaction
+    closed: a flag to only find subgraphs contained in more graphs than each supergraph with
+        one more edge that the search could find
+    maximal: a flag to only find subgraphs none of whose supergraphs is frequent
+    """
+
+    def __init__(self, max_edges=None, max_nodes=None, top_k=None, closed=False, maximal=False):
+        if any(limit is not None and limit < 1 for limit in (max_edges, max_nodes, top_k)):
+            raise ValueError("max_edges, max_nodes and top_k must be at least 1.")
+        if maximal and top_k is not None:
+            raise ValueError("Maximal subgraphs can not be mined with top_k.")
+        self.max_edges = max_edges
+        self.max_nodes = max_nodes
+        self.top_k = top_k
+        self.closed = closed
+        self.maximal = maximal
+
+    @property
+    def limits_size_only(self):
+        """ True if the modes only limit the size of subgraphs, as incremental mining needs. """
+        return self.top_k is None and not self.closed and not self.maximal
+
+_DEFAULT_MODES = Modes()
 
 def find_frequent_subgraphs(initial_node_fragments, min_freq,
-                            dont_generate_cycles=False, dont_generate_trees=False):
+                            dont_generate_cycles=False, dont_generate_trees=False,
+                            search_order='bfs', workers=1, support_counting='transaction',
+                            stats=None, modes=None, checkpoint=None, memory_limit=None):
     """
-    Perform a level-order search for frequently occurring subgraphs.
+    Perform a level-order or depth-first search for frequently occurring subgraphs.
     An iterative approach is used rather than the recursive approach used by
     the original Gaston algorithm.
 
-    Levels:
+    Each fragment holds the occurrence list of one pattern, and every refined pattern is only
+    generated from a single parent fragment, so every search order and number of workers
+    finds the same subgraphs.  The output is ordered by graph type and then embedding list.
+
+    Levels (bfs):
     level 0: nodes
     level 1: paths
     level 2: trees
     level 3: cycles
 
+    Args:
+        search_order: 'bfs' to search level by level or 'dfs' one branch at a time
+        workers: the number of processes mining the branches of the frequent edges
+        support_counting: 'transaction' to count the graphs containing a subgraph or
+            'occurrence' to count each of its occurrences
+        stats: a gaston_py.stats.SearchStats to count the events of the search in
+        modes: a Modes limiting which frequent subgraphs are found
+        checkpoint: a gaston_py.checkpoint.Checkpoint the level-order search saves its state to
+        memory_limit: the estimated bytes of queued fragments the level-order search keeps
+            in memory, beyond which they are written to temporary files
+
     Returns:
         a dictionary of the form {embedding_list: (subgraph, graph_type, frequency)}
     """
+    return ordered_output(iter_frequent_subgraphs(initial_node_fragments, min_freq,
+                                                  dont_generate_cycles, dont_generate_trees,
+                                                  search_order, workers, support_counting, stats,
+                                                  modes, checkpoint=checkpoint,
+                                                  memory_limit=memory_limit))
 
-    frequencies = {} # {embedding_list : frequency}
-    frequent_fragments = {} # {embedding_list: fragment}
-    visited_fragments = {} # {graph_id: set(fragments)}
+def iter_frequent_subgraphs(initial_node_fragments, min_freq,
+                            dont_generate_cycles=False, dont_generate_trees=False,
+                            search_order='bfs', workers=1, support_counting='transaction',
+                            stats=None, modes=None, border=None, checkpoint=None,
+                            memory_limit=None, nx_graphs=True):
+    """
+    Searches like find_frequent_subgraphs, but returns an iterator over the frequent
+    subgraphs that yields each one as soon as it is found, or at the end with top_k.
 
-    levels = (Level.NODE, Level.PATH, Level.TREE, Level.CYCLE)
-    queues = (deque(initial_node_fragments), deque(), deque(), deque())
+    If nx_graphs is not set, each subgraph is the (nodes, edges) of graph_module.graph_structure
+    instead of a networkx graph, so networkx is not imported.
 
-    for level in levels:
+    If border is a dictionary, the graph count of every infrequent node pattern and of every
+    infrequent pattern refined from a frequent fragment is stored in it by embedding list.
+    The graphs are then not pruned, so no such pattern is missed.
 
-        if dont_generate_trees and level == Level.TREE or \
-            dont_generate_cycles and level == Level.CYCLE:
-            break
+    Returns:
+        an iterator of tuples (embedding_list, subgraph, graph_type, frequency)
+    """
+    modes = _DEFAULT_MODES if modes is None else modes
+    top_k, closed, maximal = modes.top_k, modes.closed, modes.maximal
+    if search_order not in SEARCH_ORDERS:
+        raise ValueError("Unknown search order '{}', expected one of {}.".format(
+            search_order, ', '.join(SEARCH_ORDERS)))
+    if support_counting not in SUPPORT_COUNTINGS:
+        raise ValueError("Unknown support counting '{}', expected one of {}.".format(
+            support_counting, ', '.join(SUPPORT_COUNTINGS)))
+    if workers < 1:
+        raise ValueError("The number of workers must be at least 1.")
+    if (closed or maximal) and support_counting != 'transaction':
+        raise ValueError("Closed and maximal subgraphs can only be mined when counting "
+                         "transactions.")
+    if top_k is not None and support_counting != 'transaction':
+        raise ValueError("The top_k subgraphs can only be mined when counting transactions.")
+    if (closed or maximal) and dont_generate_trees:
+        raise ValueError("Closed and maximal subgraphs can not be mined without trees.")
+    if border is not None and (support_counting != 'transaction' or top_k is not None):
+        raise ValueError("The border can only be found when counting transactions, "
+                         "without top_k.")
+    if (checkpoint is not None or memory_limit is not None) and \
+            (search_order != 'bfs' or workers > 1 or top_k is not None):
+        raise ValueError("Only the level-order search of a single process can be "
+                         "checkpointed or spill its queues, without top_k.")
+
+    options = _Options(min_freq, dont_generate_cycles, dont_generate_trees,
+                       search_order, support_counting, modes.max_edges, modes.max_nodes,
+                       _TopFrequencies(top_k) if top_k is not None else None, closed, maximal,
+                       border, nx_graphs)
+
+    # Infrequent node labels and edges can not be part of any frequent fragment.
+    # The search runs on pruned views, so the source graphs can be mined again.
+    if stats is not None:
+        start = time.perf_counter()
+
+    node_fragments = list(initial_node_fragments)
+    node_labels = set(fragment.embedding_list for fragment in node_fragments)
+    source_graphs = _source_graphs(node_fragments)
+    if border is None:
+        pruned_graphs = pruning.prune_graphs(source_graphs, min_freq, support_counting)
+        node_fragments = factory.initial_node_fragments(pruned_graphs)
+    else:
+        pruned_graphs = source_graphs
+
+    frequent_node_fragments = []
+    for fragment in node_fragments:
+        if fragment.embedding_list not in node_labels:
+            continue
+        if _is_frequent(fragment, options):
+            frequent_node_fragments.append(fragment)
+        elif border is not None:
+            border[fragment.embedding_list] = fragment.graph_count
+
+    if stats is not None:
+        stats.count('pruned_nodes', graph_module.count_total_nodes(source_graphs) -
+                    graph_module.count_total_nodes(pruned_graphs))
+        stats.count('pruned_edges', graph_module.count_total_edges(source_graphs) -
+                    graph_module.count_total_edges(pruned_graphs))
+        stats.add_seconds('prune', start)
+
+    if checkpoint is not None or memory_limit is not None:
+        frequent_output = _out_of_core_search(frequent_node_fragments, pruned_graphs, options,
+                                              stats, checkpoint, memory_limit)
+    elif workers > 1:
+        frequent_output = _parallel_search(frequent_node_fragments, options, workers, stats)
+    else:
+        frequent_output = (_output(fragment, options)
+                           for fragment in _search(frequent_node_fragments, options, stats))
+
+    if options.top_frequencies is not None:
+        return _top_output(frequent_output, options)
+    return frequent_output
+
+def ordered_output(frequent_subgraphs):
+    """
+    Returns a dictionary of the form {embedding_list: (subgraph, graph_type, frequency)} of
+    the tuples yielded by iter_frequent_subgraphs, ordered by graph type and embedding list.
+    """
+    # The search order and the workers change the order fragments are found in, so the
+    # output is sorted to be the same in every mode
+    return {embedding: (subgraph, graph_type, frequency)
+            for embedding, subgraph, graph_type, frequency
+            in sorted(frequent_subgraphs, key=_output_key)}
+
+def checked_min_frequency(min_support, graph_count, support_counting='transaction'):
+    """
+    Returns the frequency a subgraph needs to reach min_support in graph_count graphs, at
+    least 1.  When counting transactions, min_support must be at most 1.
+    """
+    if min_support > 1 and support_counting == 'transaction':
+        raise ValueError("A subgraph can not be contained in more than all graphs, "
+                         "min_support must be at most 1 when counting transactions.")
+    return max(int(min_support * graph_count), 1)
+
+def iter_guided_fragments(initial_node_fragments, refined, wanted=(),
+                          dont_generate_cycles=False, dont_generate_trees=False,
+                          modes=None, supports=None, min_graph_counts=None):
+    """
+    Yields the fragments of the patterns in refined and wanted that occur in the graphs of the
+    node fragments, refining only the fragments of the patterns in refined.  The parent of
+    every pattern in refined and wanted, other than a node pattern, must be in refined.
+    Patterns are given by embedding lists over the label ids of the graphs.
+
+    If supports is a dictionary, the graph count of every node pattern and of every pattern
+    refined from a fragment in refined is stored in it by embedding list.  The fragments of
+    patterns that are neither refined nor wanted are not created.  If min_graph_counts is a
+    dictionary, the fragment of a pattern in it is only refined if its graph count is at least
+    the count given.  Only the size limits of modes are used.
+    """
+    modes = _DEFAULT_MODES if modes is None else modes
+    options = _Options(1, dont_generate_cycles, dont_generate_trees, 'dfs', 'transaction',
+                       modes.max_edges, modes.max_nodes, None, False, False, None, True)
+
+    fragments = list(initial_node_fragments)
+    while len(fragments) > 0:
+
+        fragment = fragments.pop()
+        if supports is not None and len(fragment.embedding_list) == 1:
+            supports[fragment.embedding_list] = fragment.graph_count
+        if fragment.embedding_list in wanted or fragment.embedding_list in refined:
+            yield fragment
+        if fragment.embedding_list not in refined:
+            continue
+        if min_graph_counts is not None and \
+                fragment.graph_count < min_graph_counts.get(fragment.embedding_list, 0):
+            continue
+
+        patterns, _ = _refined_patterns(fragment, options)
+        for refinements, bitset, graph_count in patterns:
+            embedding_list = refinements[0][1].embedding_list
+            if supports is not None:
+                supports[embedding_list] = graph_count
+            if embedding_list in refined or embedding_list in wanted:
+                fragments.append(factory.create_fragment(fragment, refinements, bitset))
 
-        fragments_dict = {} # {embedding_list: [fragments]}
+def iter_refined_subgraphs(fragments, min_freq, dont_generate_cycles=False,
+                           dont_generate_trees=False, modes=None, border=None):
+    """
+    Searches like iter_frequent_subgraphs with transaction support counting, depth-first from
+    frequent fragments, such as those of iter_guided_fragments, instead of the node fragments.
+    The graphs are not pruned, border is filled like in iter_frequent_subgraphs, and only the
+    size limits of modes are used.
+
+    Returns:
+        an iterator of tuples (embedding_list, subgraph, graph_type, frequency) of the given
+        fragments and of every frequent fragment refined from them
+    """
+    modes = _DEFAULT_MODES if modes is None else modes
+    options = _Options(min_freq, dont_generate_cycles, dont_generate_trees, 'dfs',
+                       'transaction', modes.max_edges, modes.max_nodes, None, False, False,
+                       border, True)
+    return (_output(fragment, options) for fragment in _depth_first_search(fragments, options))
+
+def _search(fragments, options, stats=None):
+    """
+    Yields the given fragments and all frequent fragments refined from them, except those
+    _refine does not report.
+    """
+    if options.top_frequencies is not None:
+        return _best_first_search(fragments, options, stats)
+    search = _depth_first_search if options.search_order == 'dfs' else _level_order_search
+    return search(fragments, options, stats)
+
+def _level_order_search(node_fragments, options, stats=None, resumed=None, save=None,
+                        new_queue=deque):
+    """
+    Yields frequent fragments level by level, nodes first and cycles last.  The queue of
+    each level is created by new_queue.
+
+    If save is given, save(level, queues, False) is called after each fragment is mined and
+    yielded, and save(next level, queues, True) at the end of each level but the last.
+    resumed is a (level, queues) tuple given to save, which the search continues from instead
+    of the node fragments.
+    """
+    levels = (Level.NODE, Level.PATH, Level.TREE, Level.CYCLE)
+    if resumed is not None:
+        first_level, queues = resumed
+    else:
+        first_level, queues = Level.NODE, tuple(new_queue() for _ in levels)
+        for fragment in node_fragments:
+            queues[Level.NODE].append(fragment)
+        if stats is not None:
+            for queue_size in range(1, len(queues[Level.NODE]) + 1):
+                stats.enqueued(Level.NODE, queue_size)
+
+    for level in levels[first_level:]:
 
         while len(queues[level]) > 0:
 
             fragment = queues[level].popleft()
-            embedding_list = fragment.embedding_list
 
-            _update_frequencies(frequencies, embedding_list)
-            _update_fragments_dict(fragments_dict, embedding_list, fragment)
+            if stats is not None:
+                stats.mined(level)
+                start = time.perf_counter()
 
-            if _is_frequent(frequencies, embedding_list, min_freq):
-                frequent_fragments[embedding_list] = fragment
+            # Generate the next fragments and
+            # append them to the queue that corresponds to their graph type
+            reported, next_fragments = _refine(fragment, options, stats)
+            for next_fragment in next_fragments:
+                next_queue = queues[next_fragment.queue_level]
+                next_queue.append(next_fragment)
+                if stats is not None:
+                    stats.enqueued(next_fragment.queue_level, len(next_queue))
 
-                # Generate the next fragment and
-                # append it to the queue that corresponds to its graph type
-                for next_fragment in _next_fragments(fragments_dict[embedding_list],
-                                                     dont_generate_cycles, dont_generate_trees,
-                                                     visited_fragments):
-                    queues[next_fragment.queue_level].append(next_fragment)
+            if stats is not None:
+                stats.add_seconds(level.name, start)
 
-                del fragments_dict[embedding_list]
+            if reported:
+                yield fragment
+            if save is not None:
+                save(level, queues, False)
 
-        # The remaining fragments in fragments_dict are infrequent
-        _remove_from_source_graphs(fragments_dict.values())
+        if save is not None and level < Level.CYCLE:
+            save(levels[level + 1], queues, True)
 
-    return {embedding: values for (embedding, values) in _output(frequent_fragments, frequencies)}
+    if stats is not None:
+        stats.finished()
 
-def _output(frequent_fragments, frequencies):
-    for embedding, fragment in frequent_fragments.items():
-        yield embedding, (fragment.current_graph, str(fragment), frequencies[embedding])
+def _out_of_core_search(node_fragments, graphs, options, stats, checkpoint=None,
+                        memory_limit=None):
+    """
+    Yields the output of a level-order search over graphs, whose queues spill to disk beyond
+    memory_limit bytes, and whose state is saved to checkpoint.  If the checkpoint holds the
+    state of the same search, the output it found before the state was saved is yielded
+    first, and the search continues from the saved queues.
+    """
+    graph_indices = {graph: graph_index for graph_index, graph in enumerate(graphs)}
+    pack = functools.partial(_pack_fragment, graph_indices=graph_indices)
+    unpack = functools.partial(_unpack_fragment, graphs=graphs)
 
-def _update_frequencies(frequencies, embedding_list):
-    if embedding_list in frequencies:
-        frequencies[embedding_list] += 1
-    else:
-        frequencies[embedding_list] = 1
+    budget = None
+    new_queue = deque
+    if memory_limit is not None:
+        budget = spill.MemoryBudget(memory_limit)
+        new_queue = functools.partial(spill.SpillingQueue, budget, pack, unpack)
 
-def _update_fragments_dict(fragments_dict, embedding_list, fragment):
-    if embedding_list not in fragments_dict:
-        fragments_dict[embedding_list] = [fragment]
-    else:
-        fragments_dict[embedding_list].append(fragment)
+    try:
+        if checkpoint is None:
+            for fragment in _level_order_search(node_fragments, options, stats,
+                                                new_queue=new_queue):
+                yield _output(fragment, options)
+        else:
+            for output in _checkpointed_search(node_fragments, graphs, options, stats,
+                                               checkpoint, new_queue, pack, unpack):
+                yield output
+    finally:
+        if budget is not None:
+            budget.remove()
+            if stats is not None:
+                stats.count('spilled_fragments', budget.spilled)
+                stats.peak('queued_bytes', budget.peak_used)
+
+def _checkpointed_search(node_fragments, graphs, options, stats, checkpoint, new_queue, pack,
+                         unpack):
+    """ Yields the output of a level-order search, saving its state to checkpoint. """
+    digest = hashlib.sha1()
+    graph_module.update_digest(digest, graphs)
+    # Outputs are saved without networkx graphs, so nx_graphs does not change the search
+    key = (digest.hexdigest(), tuple(options._replace(border=options.border is not None,
+                                                      nx_graphs=True)))
 
-def _is_frequent(frequencies, embedding_list, min_freq):
-    return frequencies[embedding_list] >= min_freq
+    resumed = None
+    saved = checkpoint.load(key)
+    if saved is not None:
+        state, outputs, packed_fragments = saved
+        queues = tuple(new_queue() for _ in Level)
+        for queue_index, packed_fragment in packed_fragments:
+            queues[queue_index].append(unpack(packed_fragment))
+        resumed = (Level(state['level']), queues)
+        if options.border is not None:
+            options.border.update(state['border'])
+        for embedding_list, nodes, edges, graph_type, frequency in outputs:
+            subgraph = graph_module.from_graph_structure(nodes, edges) if options.nx_graphs \
+                else (nodes, edges)
+            yield embedding_list, subgraph, graph_type, frequency
 
-def _next_fragments(fragments, dont_generate_cycles, dont_generate_trees, visited_fragments):
+    # The output found since the last checkpoint, without its networkx graphs
+    new_outputs = []
+    mined = 0
+
+    def save(level, queues, level_ended):
+        nonlocal mined
+        if not level_ended:
+            mined += 1
+            if mined % checkpoint.interval != 0:
+                return
+        checkpoint.save(key, {'level': int(level), 'border': options.border}, queues, pack,
+                        new_outputs)
+        new_outputs.clear()
+
+    for fragment in _level_order_search(node_fragments, options, stats, resumed, save,
+                                        new_queue):
+        output = _output(fragment, options)
+        embedding_list, _, graph_type, frequency = output
+        new_outputs.append((embedding_list,) +
+                           graph_module.subgraph_structure(fragment.occurrences[0]) +
+                           (graph_type, frequency))
+        yield output
+
+    checkpoint.remove()
+
+def _depth_first_search(node_fragments, options, stats=None, deadline=None, branch=None):
     """
-    Returns fragments that can be produced by refining previously created frequent fragments.
+    Yields frequent fragments in depth-first order, one branch of refinements at a time.
+
+    If deadline, a time.time() value, is given, the search stops after the first fragment
+    mined at or after it.  Given a list as branch, the iterators of the frequent fragments
+    not mined yet are left in it.
     """
-    for prev_fragment in fragments:
-        for edge in prev_fragment.frontier_edges:
-            next_fragment = factory.apply_refinement(prev_fragment, edge,
-                                                     dont_generate_cycles, dont_generate_trees)
-            if next_fragment is not None:
-                if _fragment_was_not_already_visited(visited_fragments, next_fragment):
-                    yield next_fragment
-                _update_visited_fragments(visited_fragments, next_fragment)
+    branch = [] if branch is None else branch
+    branch.append(iter(node_fragments))
+    # The level of the fragment each iterator in branch refines, None for the node fragments
+    branch_levels = [None]
 
-def _fragment_was_not_already_visited(visited_fragments, fragment):
-    graph_id = fragment.source_graph.graph['id']
-    return graph_id not in visited_fragments or fragment not in visited_fragments[graph_id]
+    while len(branch) > 0:
 
-def _update_visited_fragments(visited_fragments, fragment):
-    graph_id = fragment.source_graph.graph['id']
-    if graph_id in visited_fragments:
-        visited_fragments[graph_id].add(fragment)
-    else:
-        visited_fragments[graph_id] = set([fragment])
-
-def _remove_from_source_graphs(nested_fragments):
-    for fragments in nested_fragments:
-        for fragment in fragments:
-            for node_id in fragment.current_graph:
-                if node_id in fragment.source_graph:
-                    fragment.source_graph.remove_node(node_id)
+        if stats is not None:
+            start = time.perf_counter()
+        fragment = next(branch[-1], None)
+        if stats is not None and branch_levels[-1] is not None:
+            stats.add_seconds(branch_levels[-1].name, start)
+
+        if fragment is None:
+            branch.pop()
+            branch_levels.pop()
+            continue
+
+        if stats is not None:
+            stats.enqueued(fragment.queue_level)
+            stats.mined(fragment.queue_level)
+            start = time.perf_counter()
+
+        reported, next_fragments = _refine(fragment, options, stats)
+        if stats is not None:
+            stats.add_seconds(fragment.queue_level.name, start)
+
+        branch.append(next_fragments)
+        branch_levels.append(fragment.queue_level)
+        if reported:
+            yield fragment
+
+        # At least one fragment is mined, so a search with a deadline makes progress
+        if deadline is not None and time.time() >= deadline:
+            break
+
+    if stats is not None:
+        stats.finished()
+
+def _best_first_search(fragments, options, stats=None, frontier=None):
+    """
+    Yields frequent fragments, the most frequent first, for top_k.  A refined fragment is in at
+    most as many graphs as the fragment it is refined from, so the top k are found first and
+    min_freq is raised to its final value as early as possible.  A refined fragment can have
+    more occurrences than its parent, so top_k needs transaction support counting.
+
+    A fragment is refined before it is yielded, so if the search is stopped, the fragments
+    left to mine are in frontier, a heap of (-frequency, sequence number, fragment).
+    """
+    frontier = [] if frontier is None else frontier
+    sequence_numbers = itertools.count()
+
+    def push(fragment):
+        heapq.heappush(frontier, (-_frequency(fragment, options), next(sequence_numbers),
+                                  fragment))
+        if stats is not None:
+            stats.enqueued(fragment.queue_level, len(frontier))
+
+    for fragment in fragments:
+        push(fragment)
+
+    while len(frontier) > 0:
+
+        fragment = heapq.heappop(frontier)[2]
+        # min_freq may have been raised since the fragment was found
+        if not _is_frequent(fragment, options):
+            continue
+
+        if stats is not None:
+            stats.mined(fragment.queue_level)
+            start = time.perf_counter()
+
+        reported, next_fragments = _refine(fragment, options, stats)
+        for next_fragment in next_fragments:
+            push(next_fragment)
+
+        if stats is not None:
+            stats.add_seconds(fragment.queue_level.name, start)
+
+        if reported:
+            yield fragment
+
+    if stats is not None:
+        stats.finished()
+
+def _parallel_search(node_fragments, options, workers, stats=None):
+    """
+    Yields the output of the frequent nodes, then mines the frequent edges refined from
+    them (the seeds) in a process pool.
+
+    The branches of a few seeds can hold most of the search, so a worker mines a task for at
+    most TASK_SECONDS and returns the fragments it did not get to, which become new tasks.
+    Workers count the stats of each task, which are added to stats when the task returns.
+    With top_k, the most frequent waiting fragments are sent to the workers one task per
+    worker at a time, with the top frequencies found so far, so every task prunes with the
+    highest min_freq known when it starts.  Waiting fragments that become infrequent are
+    dropped.
+    """
+    seeds = []
+    for fragment in node_fragments:
+        if stats is not None:
+            stats.enqueued(Level.NODE)
+            stats.mined(Level.NODE)
+            start = time.perf_counter()
+        reported, next_fragments = _refine(fragment, options, stats)
+        seeds.extend(next_fragments)
+        if stats is not None:
+            stats.add_seconds(Level.NODE.name, start)
+        if reported:
+            yield _output(fragment, options)
+
+    graph_indices = {}
+    for seed in seeds:
+        for occurrence in seed.occurrences:
+            graph_indices.setdefault(occurrence.source_graph, len(graph_indices))
+
+    graphs = sorted(graph_indices, key=graph_indices.get)
+    finished_tasks = queue.Queue()
+    pool = multiprocessing.Pool(workers, _init_worker,
+                                (graphs, options._replace(top_frequencies=None, border=None),
+                                 stats is not None, options.border is not None))
+
+    waiting_fragments = [] # with top_k, a heap of (-frequency, sequence number, packed fragment)
+    sequence_numbers = itertools.count()
+    pending_tasks = 0
+
+    def submit(packed_fragments):
+        nonlocal pending_tasks
+        top_frequencies = options.top_frequencies
+        if top_frequencies is None:
+            for packed_fragment in packed_fragments:
+                pool.apply_async(_mine_task, (packed_fragment, None),
+                                 callback=finished_tasks.put, error_callback=finished_tasks.put)
+            pending_tasks += len(packed_fragments)
+            return
+
+        for packed_fragment in packed_fragments:
+            heapq.heappush(waiting_fragments, (-_frequency(packed_fragment, options),
+                                               next(sequence_numbers), packed_fragment))
+        while len(waiting_fragments) > 0 and pending_tasks < workers:
+            packed_fragment = heapq.heappop(waiting_fragments)[2]
+            if _is_frequent(packed_fragment, options):
+                task_top_frequencies = _TopFrequencies(top_frequencies.k, top_frequencies.heap)
+                pool.apply_async(_mine_task, (packed_fragment, task_top_frequencies),
+                                 callback=finished_tasks.put, error_callback=finished_tasks.put)
+                pending_tasks += 1
+
+    try:
+        # Large seeds first, so they are not the last tasks to finish
+        submit([_pack_fragment(seed, graph_indices)
+                for seed in sorted(seeds, key=lambda seed: -len(seed.occurrences))])
+
+        while pending_tasks > 0:
+            result = finished_tasks.get()
+            pending_tasks -= 1
+            if isinstance(result, Exception):
+                raise result
+
+            outputs, packed_fragments, task_stats, task_border = result
+            if stats is not None:
+                stats.merge(task_stats)
+            if options.border is not None:
+                options.border.update(task_border)
+            for output in outputs:
+                yield output
+            submit(packed_fragments)
+    finally:
+        pool.terminate()
+
+    if stats is not None:
+        stats.finished()
+
+def _pack_fragment(fragment, graph_indices):
+    """ Copies a fragment, referring to source graphs by index so it can be sent to workers. """
+    packed_fragment = copy.copy(fragment)
+    packed_fragment.occurrences = [(graph_indices[occurrence.source_graph],
+                                    occurrence.nodes, occurrence.edges)
+                                   for occurrence in fragment.occurrences]
+    return packed_fragment
+
+def _unpack_fragment(packed_fragment, graphs):
+    """ Restores the occurrences of a fragment packed by _pack_fragment, given its graphs. """
+    packed_fragment.occurrences = [graph_module.Subgraph.from_edges(graphs[graph_index],
+                                                                    nodes, edges)
+                                   for graph_index, nodes, edges in packed_fragment.occurrences]
+    return packed_fragment
+
+def _init_worker(graphs, options, collect_stats, collect_border):
+    global _worker_graphs, _worker_graph_indices, _worker_options, _worker_collect_stats, \
+        _worker_collect_border
+    _worker_graphs, _worker_options = graphs, options
+    _worker_collect_stats, _worker_collect_border = collect_stats, collect_border
+    _worker_graph_indices = {graph: graph_index for graph_index, graph in enumerate(graphs)}
+
+def _mine_task(packed_fragment, top_frequencies):
+    """
+    Mines the branch of a fragment depth-first inside a worker process, for TASK_SECONDS.
+    With top_k, top_frequencies are the top frequencies found by the search so far, and the
+    branch is mined most frequent first.
+
+    Returns:
+        a tuple (outputs, packed_fragments, stats, border) of the output of the mined
+        fragments, the frequent fragments that were found but not mined yet, the stats of the
+        task as a dictionary if the search collects stats, and the border found by the task
+        if the search finds the border
+    """
+    packed_fragment = _unpack_fragment(packed_fragment, _worker_graphs)
+    options = _worker_options._replace(top_frequencies=top_frequencies,
+                                       border={} if _worker_collect_border else None)
+    deadline = time.time() + TASK_SECONDS
+    stats = SearchStats() if _worker_collect_stats else None
+    outputs = []
+
+    if top_frequencies is not None:
+        frontier = []
+        for fragment in _best_first_search([packed_fragment], options, stats, frontier):
+            top_frequencies.add(_frequency(fragment, options))
+            outputs.append(_output(fragment, options))
+            if time.time() >= deadline:
+                break
+
+        packed_fragments = [_pack_fragment(fragment, _worker_graph_indices)
+                            for _, _, fragment in frontier]
+        return outputs, packed_fragments, stats.as_dict() if stats is not None else None, \
+            options.border
+
+    branch = []
+    for fragment in _depth_first_search([packed_fragment], options, stats, deadline, branch):
+        outputs.append(_output(fragment, options))
+
+    packed_fragments = [_pack_fragment(fragment, _worker_graph_indices)
+                        for fragments in branch for fragment in fragments]
+    return outputs, packed_fragments, stats.as_dict() if stats is not None else None, \
+        options.border
+
+def _output(fragment, options):
+    occurrence = fragment.occurrences[0]
+    subgraph = graph_module.to_nx_graph(occurrence) if options.nx_graphs \
+        else graph_module.subgraph_structure(occurrence)
+    return (occurrence.source_graph.original_labels(fragment.embedding_list), subgraph,
+            str(fragment), _frequency(fragment, options))
+
+def _output_key(output):
+    """ Orders output by graph type, nodes first and cycles last, then by embedding list. """
+    embedding, _, graph_type, _ = output
+    return Level[graph_type.upper()], embedding
+
+def _frequency(fragment, options):
+    if options.support_counting == 'transaction':
+        return fragment.graph_count
+    return fragment.frequency
+
+def _is_frequent(fragment, options):
+    return _frequency(fragment, options) >= _min_freq(options)
+
+def _min_freq(options):
+    if options.top_frequencies is None:
+        return options.min_freq
+    return max(options.min_freq, options.top_frequencies.min_freq)
+
+class _TopFrequencies(object):
+    """ The k highest frequencies found so far, in a heap with the lowest of them first. """
+
+    def __init__(self, k, heap=()):
+        self.k = k
+        self.heap = list(heap)
+
+    @property
+    def min_freq(self):
+        """ The k-th highest frequency once k frequencies are found, which the top k reach. """
+        return self.heap[0] if len(self.heap) == self.k else 0
+
+    def add(self, frequency):
+        if len(self.heap) < self.k:
+            heapq.heappush(self.heap, frequency)
+        elif frequency > self.heap[0]:
+            heapq.heapreplace(self.heap, frequency)
+
+def _top_output(frequent_output, options):
+    """
+    Adds the frequency of each output to the top frequencies while the search runs, and
+    yields the output at least as frequent as the k-th most frequent once it ends.
+    """
+    top_frequencies = options.top_frequencies
+    candidates = []
+    for output in frequent_output:
+        top_frequencies.add(output[3])
+        candidates.append(output)
+
+        # Output below the raised min_freq is dropped as the search goes
+        if len(candidates) >= 2 * top_frequencies.k:
+            candidates = [candidate for candidate in candidates
+                          if candidate[3] >= top_frequencies.min_freq]
+
+    for output in candidates:
+        if output[3] >= top_frequencies.min_freq:
+            yield output
+
+def _refine(fragment, options, stats=None):
+    """
+    Refines a frequent fragment and tells whether it is reported.  It is, unless it is not
+    closed or not maximal when only those subgraphs are mined.
+
+    Returns:
+        a tuple (reported, next_fragments), where next_fragments is an iterator creating the
+        frequent fragments refined from fragment
+    """
+    patterns, other_refinements = _refined_patterns(fragment, options, stats)
+    reported = not (options.closed or options.maximal) or \
+        _is_closed_or_maximal(fragment, patterns, other_refinements, options)
+    return reported, _next_fragments(fragment, patterns, options, stats)
+
+def _refined_patterns(fragment, options, stats=None):
+    """
+    Finds the refinements of a fragment, grouped by the pattern they produce before any
+    occurrence is extended.
+
+    Returns:
+        a tuple (patterns, other_refinements) of the patterns generated from fragment, as
+        (refinements, bitset, bound) tuples, and when only closed or maximal subgraphs are
+        mined, the (refinement, extensions) producing patterns generated from other fragments
+    """
+    if options.max_edges is not None and len(fragment.edges) >= options.max_edges:
+        return [], []
+
+    node_count = len(fragment.node_labels)
+    adds_nodes = options.max_nodes is None or node_count < options.max_nodes
+    checks_supergraphs = options.closed or options.maximal
+
+    fragment_refinements = factory.refinements(fragment, extend_cycles=checks_supergraphs)
+    if not adds_nodes:
+        # Only refinements closing a cycle keep the number of nodes
+        fragment_refinements = {refinement: extensions
+                                for refinement, extensions in fragment_refinements.items()
+                                if refinement[1] != node_count}
+
+    refined_patterns = {} # {embedding_list: [(refinement, refined_pattern, extensions)]}
+    # Refinements producing patterns the search generates from other fragments
+    other_refinements = [] # [(refinement, extensions)]
+    for refinement, extensions in fragment_refinements.items():
+        refined_pattern = factory.refine_pattern(fragment, refinement,
+                                                 options.dont_generate_cycles,
+                                                 options.dont_generate_trees)
+        if refined_pattern is not None:
+            # Different refinements produce the same pattern when they are symmetric
+            refined_patterns.setdefault(refined_pattern.embedding_list, []).append(
+                (refinement, refined_pattern, extensions))
+        elif checks_supergraphs and (refinement[1] == node_count or
+                                     not options.dont_generate_cycles):
+            other_refinements.append((refinement, extensions))
+
+    if stats is not None:
+        stats.count('refinements', len(fragment_refinements))
+        stats.count('rejected_refinements', len(fragment_refinements) -
+                    sum(len(refinements) for refinements in refined_patterns.values()))
+
+    patterns = [] # [(refinements, bitset, bound)]
+    for refinements in refined_patterns.values():
+        # The extensions bound the frequency: the graphs they are in, or their number
+        if options.support_counting == 'transaction':
+            bitset = graph_bitset(occurrence.source_graph for _, _, extensions in refinements
+                                  for occurrence, _, _ in extensions)
+            patterns.append((refinements, bitset, popcount(bitset)))
+        else:
+            patterns.append((refinements, None,
+                             sum(len(extensions) for _, _, extensions in refinements)))
+
+    return patterns, other_refinements
+
+def _next_fragments(fragment, patterns, options, stats=None):
+    """
+    Yields the frequent fragments of the patterns found by _refined_patterns.  Patterns whose
+    frequency bound is already below min_freq are skipped without extending any occurrence.
+    """
+    for refinements, bitset, bound in patterns:
+        if bound < _min_freq(options):
+            if stats is not None:
+                stats.count('bound_pruned_patterns')
+            # The border is only found when counting transactions, where the bound is exact
+            if options.border is not None:
+                options.border[refinements[0][1].embedding_list] = bound
+            continue
+
+        next_fragment = factory.create_fragment(fragment, refinements, bitset, stats)
+        if _is_frequent(next_fragment, options):
+            yield next_fragment
+        elif stats is not None:
+            stats.count('infrequent_patterns')
+
+def _is_closed_or_maximal(fragment, patterns, other_refinements, options):
+    """
+    Returns False if a supergraph of a fragment with one more edge is in as many graphs as the
+    fragment, or with maximal, in min_freq graphs.  A supergraph is in the graphs of the
+    extensions of the refinements producing it.
+
+    The patterns generated from the fragment are checked first, since their graphs are already
+    known.  Refinements producing the same pattern add the same edge label between the same
+    node labels, so the other refinements are grouped by those labels, and only the groups
+    whose extensions are in enough graphs are told apart by the pattern they produce.
+    """
+    min_graph_count = options.min_freq if options.maximal else fragment.graph_count
+    if any(graph_count >= min_graph_count for _, _, graph_count in patterns):
+        return False
+
+    node_count = len(fragment.node_labels)
+    label_groups = {} # {(adds node, edge label, node labels): [(refinement, bitset)]}
+    for refinement, extensions in other_refinements:
+        bitset = graph_bitset(occurrence.source_graph for occurrence, _, _ in extensions)
+        if popcount(bitset) >= min_graph_count:
+            return False
+
+        origin, target, edge_label, target_label = refinement
+        key = (target == node_count, edge_label,
+               tuple(sorted((fragment.node_labels[origin], target_label))))
+        label_groups.setdefault(key, []).append((refinement, bitset))
+
+    for refinements in label_groups.values():
+        group_bitset = 0
+        for _, bitset in refinements:
+            group_bitset |= bitset
+        if len(refinements) == 1 or popcount(group_bitset) < min_graph_count:
+            continue
+
+        pattern_bitsets = {}
+        for refinement, bitset in refinements:
+            embedding_list = factory.refined_embedding_list(fragment, refinement)
+            pattern_bitsets[embedding_list] = pattern_bitsets.get(embedding_list, 0) | bitset
+        if any(popcount(bitset) >= min_graph_count for bitset in pattern_bitsets.values()):
+            return False
+
+    return True
+
+def _source_graphs(fragments):
+    """ Returns the source graphs of the occurrences of fragments, ordered by index. """
+    source_graphs = set(occurrence.source_graph
+                        for fragment in fragments for occurrence in fragment.occurrences)
+    return sorted(source_graphs, key=lambda source_graph: source_graph.index)
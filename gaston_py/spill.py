@@ -0,0 +1,148 @@
+
+# Fragments spilled to disk are packed like the tasks of the parallel search, with each
+# occurrence as (graph index, nodes, edges), and pickled one after another into segment files
+# that are read back one fragment at a time.  A fragment holds every occurrence of its pattern,
+# so each segment holds whole patterns, and no frequency needs more than one segment.
+import itertools
+import os
+import pickle
+import shutil
+import tempfile
+from collections import deque
+
+# Estimated bytes of a queued fragment and of each occurrence, besides 8 bytes for each node
+FRAGMENT_BYTES = 500
+OCCURRENCE_BYTES = 180
+
+class MemoryBudget(object):
+    """
+    The memory the queues of a level-order search may use, shared by its SpillingQueues.
+
+    limit: the budget in bytes
+    used: the estimated bytes of the fragments the queues hold in memory
+    peak_used: the largest value used has had
+    spilled: the number of fragments written to segment files
+    directory: the temporary directory of the segment files, removed by remove
+    segment_bytes: the size a segment file is closed at and a new one started
+    """
+
+    def __init__(self, limit, directory=None):
+        if limit < 1:
+            raise ValueError("The memory limit must be at least 1 byte.")
+        self.limit = limit
+        self.used = 0
+        self.peak_used = 0
+        self.spilled = 0
+        self.directory = tempfile.mkdtemp(prefix='gaston-spill-', dir=directory)
+        self.segment_bytes = max(limit // 4, 1 << 20)
+        self._segment_numbers = itertools.count()
+
+    def segment_path(self):
+        return os.path.join(self.directory,
+                            'segment{}.pickle'.format(next(self._segment_numbers)))
+
+    def remove(self):
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+class SpillingQueue(object):
+    """
+    A first in, first out queue of fragments, which holds its first fragments in memory while
+    the budget allows and writes the others to segment files.  Segments are read back in order
+    once the fragments in memory are used up, so fragments leave the queue in the order they
+    were appended.
+
+    pack: a function returning a picklable copy of a fragment
+    unpack: a function restoring a fragment from its packed copy
+    """
+
+    def __init__(self, budget, pack, unpack):
+        self.budget = budget
+        self.pack = pack
+        self.unpack = unpack
+        self._head = deque() # fragments in memory, before the spilled ones
+        self._segments = deque() # paths of full segment files, oldest first
+        self._reader = None # the segment file being read
+        self._writer = None # the segment file being written
+        self._spilled_length = 0
+
+    def __len__(self):
+        return len(self._head) + self._spilled_length
+
+    def __iter__(self):
+        """ Yields the queued fragments in order, without removing them. """
+        for fragment in self._head:
+            yield fragment
+
+        if self._writer is not None:
+            self._writer.flush()
+        if self._reader is not None:
+            for fragment in self._read(self._reader.name, self._reader.tell()):
+                yield fragment
+        segment_paths = list(self._segments)
+        if self._writer is not None:
+            segment_paths.append(self._writer.name)
+        for segment_path in segment_paths:
+            for fragment in self._read(segment_path):
+                yield fragment
+
+    def append(self, fragment):
+        fragment_bytes = estimated_bytes(fragment)
+        if self._spilled_length == 0 and \
+                self.budget.used + fragment_bytes <= self.budget.limit:
+            self._head.append(fragment)
+            self.budget.used += fragment_bytes
+            self.budget.peak_used = max(self.budget.peak_used, self.budget.used)
+            return
+
+        if self._writer is None:
+            self._writer = open(self.budget.segment_path(), 'wb')
+        pickle.dump(self.pack(fragment), self._writer, pickle.HIGHEST_PROTOCOL)
+        self._spilled_length += 1
+        self.budget.spilled += 1
+        if self._writer.tell() >= self.budget.segment_bytes:
+            self._close_writer()
+
+    def popleft(self):
+        if len(self._head) > 0:
+            fragment = self._head.popleft()
+            self.budget.used -= estimated_bytes(fragment)
+            return fragment
+
+        while True:
+            if self._reader is None:
+                if len(self._segments) == 0:
+                    if self._writer is None:
+                        raise IndexError("pop from an empty queue")
+                    self._close_writer()
+                self._reader = open(self._segments.popleft(), 'rb')
+            try:
+                packed_fragment = pickle.load(self._reader)
+            except EOFError:
+                self._reader.close()
+                os.remove(self._reader.name)
+                self._reader = None
+                continue
+            self._spilled_length -= 1
+            return self.unpack(packed_fragment)
+
+    def _close_writer(self):
+        self._writer.close()
+        self._segments.append(self._writer.name)
+        self._writer = None
+
+    def _read(self, segment_path, offset=0):
+        with open(segment_path, 'rb') as f:
+            f.seek(offset)
+            while True:
+                try:
+                    packed_fragment = pickle.load(f)
+                except EOFError:
+                    return
+                yield self.unpack(packed_fragment)
+
+def estimated_bytes(fragment):
+    """ Returns the estimated memory of a fragment and its occurrences. """
+    occurrences = fragment.occurrences
+    if len(occurrences) == 0:
+        return FRAGMENT_BYTES
+    return FRAGMENT_BYTES + len(occurrences) * (OCCURRENCE_BYTES + 8 * len(occurrences[0].nodes))
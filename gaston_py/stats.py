@@ -0,0 +1,111 @@
+
+import sys
+import time
+from collections import Counter
+
+from gaston_py.level import Level
+
+class SearchStats(object):
+    """
+    Counters of a search, filled in when passed as stats to gaston or find_frequent_subgraphs.
+    Searches without stats skip all counting.
+
+    counters: a Counter of search events
+        'refinements': distinct refinements found on the occurrences of mined fragments
+        'rejected_refinements': refinements not allowed, or producing a pattern that is
+            generated from a different fragment
+        'bound_pruned_patterns': refined patterns skipped before extending their occurrences,
+            because their frequency bound is below min_freq
+        'infrequent_patterns': refined patterns found to be infrequent after extending them
+        'duplicate_occurrences': extended occurrences that were already reached from another
+            occurrence of the same fragment
+        'pruned_nodes', 'pruned_edges': nodes and edges left out of the search by pruning
+        'spilled_fragments': queued fragments written to disk to stay within memory_limit
+    levels: a dictionary {level name: Counter} counting, for each Level, the fragments
+        'enqueued' and 'mined', and the 'peak_queue' size when searching level by level
+    seconds: a Counter of the time spent in each phase: 'parse', 'prune', and the name of
+        each Level for refining its fragments
+    memory: a dictionary of peak memory figures in bytes
+        'rss': the peak resident set size of the search process, or of the largest worker
+            process, where the platform reports it
+        'queued_bytes': the estimated bytes of the fragments the queues held in memory at
+            most, with a memory_limit
+    callback: if given, a function called with the stats every callback_interval mined
+        fragments and when the search ends
+    """
+
+    def __init__(self, callback=None, callback_interval=1000):
+        self.counters = Counter()
+        self.levels = {level.name: Counter() for level in Level}
+        self.seconds = Counter()
+        self.memory = {}
+        self.callback = callback
+        self.callback_interval = callback_interval
+        self._mined = 0
+
+    def count(self, name, value=1):
+        self.counters[name] += value
+
+    def add_seconds(self, phase, start):
+        """ Adds the time since start, a time.perf_counter() value, to a phase. """
+        self.seconds[phase] += time.perf_counter() - start
+
+    def peak(self, name, value):
+        """ Keeps the larger of value and the memory figure name. """
+        if value > self.memory.get(name, 0):
+            self.memory[name] = value
+
+    def enqueued(self, level, queue_size=None):
+        level_counters = self.levels[level.name]
+        level_counters['enqueued'] += 1
+        if queue_size is not None and queue_size > level_counters['peak_queue']:
+            level_counters['peak_queue'] = queue_size
+
+    def mined(self, level):
+        self.levels[level.name]['mined'] += 1
+        self._mined += 1
+        if self.callback is not None and self._mined % self.callback_interval == 0:
+            self.callback(self)
+
+    def finished(self):
+        self.peak('rss', peak_rss())
+        if self.callback is not None:
+            self.callback(self)
+
+    def merge(self, stats_dict):
+        """
+        Adds the counts of another search, given as returned by as_dict, such as the part of a
+        search mined by a worker process.  Peak queue sizes and memory figures are not added,
+        the larger is kept.
+        """
+        self.counters.update(stats_dict['counters'])
+        self.seconds.update(stats_dict['seconds'])
+        for name, value in stats_dict['memory'].items():
+            self.peak(name, value)
+        for name, level_counters in stats_dict['levels'].items():
+            merged_counters = self.levels[name]
+            peak_queue = max(merged_counters['peak_queue'], level_counters.get('peak_queue', 0))
+            merged_counters.update(level_counters)
+            if peak_queue > 0:
+                merged_counters['peak_queue'] = peak_queue
+            self._mined += level_counters.get('mined', 0)
+        if self.callback is not None:
+            self.callback(self)
+
+    def as_dict(self):
+        """ Returns the stats as a dictionary of plain dictionaries, which is JSON serializable. """
+        self.peak('rss', peak_rss())
+        return {'counters': dict(self.counters),
+                'levels': {name: dict(counters) for name, counters in self.levels.items()},
+                'seconds': dict(self.seconds),
+                'memory': dict(self.memory)}
+
+def peak_rss():
+    """ Returns the peak resident set size of this process in bytes, or 0 if it is unknown. """
+    try:
+        import resource
+    except ImportError:
+        return 0
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in kilobytes on Linux and in bytes on macOS
+    return peak if sys.platform == 'darwin' else peak << 10
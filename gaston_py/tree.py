@@ -5,6 +5,8 @@ from gaston_py.level import Level
 class Tree(Fragment):
     """ A fragment containing a tree subgraph. """
 
+    __slots__ = ()
+
     def __str__(self):
         return "Tree"
 
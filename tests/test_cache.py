@@ -0,0 +1,22 @@
+
+import unittest
+from gaston_py.cache import LRUCache
+
+class LRUCacheTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.cache = LRUCache(maxsize=2)
+        self.cache.put('a', 1)
+        self.cache.put('b', 2)
+
+    def test_get_counts_hits_and_misses(self):
+        self.assertEqual(self.cache.get('a'), 1)
+        self.assertEqual(self.cache.get('c'), None)
+        self.assertEqual(self.cache.info(), (1, 1, 2, 2))
+
+    def test_evicts_least_recently_used_entry(self):
+        self.cache.get('a')
+        self.cache.put('c', 3)
+        self.assertTrue('a' in self.cache)
+        self.assertFalse('b' in self.cache)
+        self.assertEqual(len(self.cache), 2)
@@ -0,0 +1,84 @@
+import itertools
+import os
+import shutil
+import tempfile
+import unittest
+from gaston_py.checkpoint import Checkpoint
+from gaston_py.gaston import gaston, iter_frequent_subgraphs
+from gaston_py.search import Modes
+
+class CheckpointTestCase(unittest.TestCase):
+
+    MEDIUM_DATASET = 'test_files/medium_chemical.txt'
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.checkpoint_file = os.path.join(self.directory, 'medium_chemical.ckpt')
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def assertResumedLikeUninterrupted(self, stop_after, **options):
+        expected_output = gaston(0.3, CheckpointTestCase.MEDIUM_DATASET, **options)
+
+        checkpoint = Checkpoint(self.checkpoint_file, interval=7)
+        frequent_subgraphs = iter_frequent_subgraphs(0.3, CheckpointTestCase.MEDIUM_DATASET,
+                                                     checkpoint=checkpoint, **options)
+        list(itertools.islice(frequent_subgraphs, stop_after))
+        self.assertGreater(checkpoint.saved, 0)
+        self.assertTrue(os.path.exists(self.checkpoint_file))
+        # Output written after the last checkpoint, as by a search killed while saving
+        with open(checkpoint.outputs_path, 'ab') as f:
+            f.write(b'partial output')
+
+        frequent_output = gaston(0.3, CheckpointTestCase.MEDIUM_DATASET,
+                                 checkpoint=Checkpoint(self.checkpoint_file, resume=True),
+                                 **options)
+        self.assertEqual([(embedding_list, graph_type, frequency)
+                          for embedding_list, (_, graph_type, frequency)
+                          in frequent_output.items()],
+                         [(embedding_list, graph_type, frequency)
+                          for embedding_list, (_, graph_type, frequency)
+                          in expected_output.items()])
+        self.assertFalse(os.path.exists(self.checkpoint_file))
+        self.assertFalse(os.path.exists(checkpoint.outputs_path))
+
+    def test_resumed_search_finds_the_output_of_an_uninterrupted_one(self):
+        self.assertResumedLikeUninterrupted(200)
+        self.assertResumedLikeUninterrupted(20, modes=Modes(closed=True))
+
+    def test_checkpoint_is_resumed_with_or_without_nx_graphs(self):
+        expected_output = gaston(0.3, CheckpointTestCase.MEDIUM_DATASET)
+
+        for nx_graphs in (True, False):
+            checkpoint = Checkpoint(self.checkpoint_file, interval=7)
+            list(itertools.islice(iter_frequent_subgraphs(
+                0.3, CheckpointTestCase.MEDIUM_DATASET, checkpoint=checkpoint,
+                nx_graphs=nx_graphs), 20))
+
+            # The resumed run first yields the output saved by the interrupted one
+            resumed_output = list(iter_frequent_subgraphs(
+                0.3, CheckpointTestCase.MEDIUM_DATASET,
+                checkpoint=Checkpoint(self.checkpoint_file, resume=True),
+                nx_graphs=not nx_graphs))
+            self.assertEqual(len(resumed_output), len(expected_output))
+            self.assertEqual({embedding_list: (graph_type, frequency)
+                              for embedding_list, _, graph_type, frequency in resumed_output},
+                             {embedding_list: (graph_type, frequency)
+                              for embedding_list, (_, graph_type, frequency)
+                              in expected_output.items()})
+            self.assertTrue(all(isinstance(subgraph, tuple) == nx_graphs
+                                for _, subgraph, _, _ in resumed_output))
+            self.assertFalse(os.path.exists(self.checkpoint_file))
+
+    def test_checkpoint_of_another_search_is_not_resumed(self):
+        checkpoint = Checkpoint(self.checkpoint_file, interval=7)
+        list(itertools.islice(iter_frequent_subgraphs(0.3, CheckpointTestCase.MEDIUM_DATASET,
+                                                      checkpoint=checkpoint), 50))
+
+        with self.assertRaises(ValueError):
+            gaston(0.3, CheckpointTestCase.MEDIUM_DATASET, dont_generate_cycles=True,
+                   checkpoint=Checkpoint(self.checkpoint_file, resume=True))
+        with self.assertRaises(ValueError):
+            gaston(0.3, CheckpointTestCase.MEDIUM_DATASET, search_order='dfs',
+                   checkpoint=Checkpoint(self.checkpoint_file))
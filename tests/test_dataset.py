@@ -0,0 +1,72 @@
+import multiprocessing
+import os
+import shutil
+import tempfile
+import unittest
+from gaston_py import dataset, sampling, search
+from gaston_py.gaston import gaston
+import gaston_py.graph as graph_module
+
+class DatasetTestCase(unittest.TestCase):
+
+    SMALL_DATASET = 'test_files/small_chemical.txt'
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.dataset_file = os.path.join(self.directory, 'small_chemical.gds')
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_read_dataset_returns_written_graphs(self):
+        graphs = graph_module.read_line_graphs(DatasetTestCase.SMALL_DATASET)
+        dataset.write_dataset(graphs, self.dataset_file)
+        dataset_graphs = dataset.read_dataset(self.dataset_file)
+
+        self.assertTrue(dataset.is_dataset(self.dataset_file))
+        self.assertEqual(len(dataset_graphs), len(graphs))
+        for graph, dataset_graph in zip(graphs, dataset_graphs):
+            self.assertEqual((dataset_graph.id, dataset_graph.labels, dataset_graph.node_ids),
+                             (graph.id, graph.labels, graph.node_ids))
+            self.assertEqual(list(dataset_graph.neighbors), list(graph.neighbors))
+            self.assertEqual(list(dataset_graph.edge_keys), list(graph.edge_keys))
+
+    def test_gaston_with_cache_file(self):
+        expected_output = gaston(6, DatasetTestCase.SMALL_DATASET, support_counting='occurrence')
+        for _ in range(2):
+            frequent_output = gaston(6, DatasetTestCase.SMALL_DATASET,
+                                     support_counting='occurrence', cache_file=self.dataset_file)
+            self.assertEqual({key: value[1:] for key, value in frequent_output.items()},
+                             {key: value[1:] for key, value in expected_output.items()})
+        self.assertTrue(dataset.is_dataset(self.dataset_file))
+
+    def test_cache_file_of_another_input_file_is_replaced(self):
+        medium_dataset = 'test_files/medium_chemical.txt'
+        dataset.load_graphs(DatasetTestCase.SMALL_DATASET, self.dataset_file)
+        graphs = dataset.load_graphs(medium_dataset, self.dataset_file)
+
+        self.assertEqual(len(graphs), len(graph_module.read_line_graphs(medium_dataset)))
+        self.assertEqual(len(dataset.read_dataset(self.dataset_file)), len(graphs))
+
+    def test_dataset_graphs_are_sent_to_spawned_workers(self):
+        chemical_dataset = 'test_files/Chemical_340.txt'
+        dataset.write_dataset(graph_module.read_line_graphs(chemical_dataset), self.dataset_file)
+        expected_output = gaston(0.2, chemical_dataset)
+
+        # Memory-mapped arrays are not inherited by spawned workers, they are pickled
+        modules = (search, sampling)
+        default_multiprocessing = [module.multiprocessing for module in modules]
+        for module in modules:
+            module.multiprocessing = multiprocessing.get_context('spawn')
+        try:
+            frequent_output = gaston(0.2, self.dataset_file, workers=2)
+            sampled_output = gaston(0.2, self.dataset_file, workers=2,
+                                    sample=sampling.Sample(0.8, confidence=0.9, seed=0))
+        finally:
+            for module, module_multiprocessing in zip(modules, default_multiprocessing):
+                module.multiprocessing = module_multiprocessing
+
+        self.assertEqual({key: value[1:] for key, value in frequent_output.items()},
+                         {key: value[1:] for key, value in expected_output.items()})
+        for key, value in sampled_output.items():
+            self.assertEqual(value[1:], expected_output[key][1:])
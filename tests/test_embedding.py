@@ -1,38 +1,62 @@
-
 import unittest
-import networkx as nx
 import gaston_py.embedding as emb_module
 
 class EmbeddingTestCase(unittest.TestCase):
 
     def setUp(self):
-        graph = nx.Graph(id=1)
-        graph.add_node(1, label=0)
-        graph.add_node(2, label=0)
-        graph.add_edge(1, 2, label=0)
-        graph.add_node(3, label=3)
-        graph.add_node(4, label=4)
-        graph.add_edge(1, 3, label=13)
-        graph.add_edge(3, 4, label=34)
-        self.small_graph = nx.freeze(graph)
-
-    def test_initial_source_label_is_greater_than_alt_label(self):
-        # if source_label > alt_label, should return None
-        embedding = emb_module.create_embedding_list_if_unique(self.small_graph, 4, 1)
-        self.assertEqual(embedding, None)
-
-    def test_initial_source_label_is_less_than_alt_label(self):
-        # if source_label < alt_label, should jump to create_embedding()
-        embedding = emb_module.create_embedding_list_if_unique(self.small_graph, 1, 4)
-        self.assertEqual(embedding, (0, 0, 0, 13, 3, 34, 4))
+        # Path 1-2-3-4 with node labels 0, 0, 3, 4 given in two different node orders
+        self.path_labels = (0, 0, 3, 4)
+        self.path_edges = ((0, 1, 0), (0, 2, 13), (2, 3, 34))
+        self.permuted_path_labels = (3, 4, 0, 0)
+        self.permuted_path_edges = ((2, 3, 0), (2, 0, 13), (0, 1, 34))
+
+        # Triangle 1-2-3 with node labels 0, 0, 3
+        self.cycle_labels = (0, 0, 3)
+        self.cycle_edges = ((0, 1, 0), (0, 2, 13), (1, 2, 23))
 
-    def test_labels_are_identical_and_source_has_smaller_node_ids(self):
-        # Use ids to select embedding when labels are identical
-        embedding = emb_module.create_embedding_list_if_unique(self.small_graph, 1, 2)
+    def test_path_embedding_list_is_smallest_direction(self):
+        embedding, _ = emb_module.create_embedding_list(self.path_labels, self.path_edges)
         self.assertEqual(embedding, (0, 0, 0, 13, 3, 34, 4))
 
-    def test_labels_are_identical_and_source_has_larger_node_ids(self):
-        # Use ids to select embedding when labels are identical
-        embedding = emb_module.create_embedding_list_if_unique(self.small_graph, 2, 1)
-        self.assertEqual(embedding, None)
+    def test_embedding_list_does_not_depend_on_node_order(self):
+        embedding, order = emb_module.create_embedding_list(self.path_labels, self.path_edges)
+        permuted_embedding, permuted_order = emb_module.create_embedding_list(
+            self.permuted_path_labels, self.permuted_path_edges)
+        self.assertEqual(embedding, permuted_embedding)
+        self.assertEqual([self.path_labels[x] for x in order],
+                         [self.permuted_path_labels[x] for x in permuted_order])
+
+    def test_cycle_embedding_list_is_dfs_code(self):
+        embedding, _ = emb_module.create_embedding_list(self.cycle_labels, self.cycle_edges)
+        self.assertEqual(embedding, (0, (0, 1, 0, 0), (1, 2, 13, 3), (2, 0, 23, 0)))
+        self.assertTrue(emb_module.is_cyclic(embedding))
+
+    def test_parent_embedding_list(self):
+        embedding, _ = emb_module.create_embedding_list(self.cycle_labels, self.cycle_edges)
+        parent = emb_module.parent_embedding_list(embedding)
+        self.assertEqual(parent, (0, 0, 0, 13, 3))
+        self.assertEqual(emb_module.parent_embedding_list(parent), (0, 0, 0))
+        self.assertEqual(emb_module.pattern_structure(parent), ((0, 0, 3), ((0, 1, 0), (1, 2, 13))))
+
+    def test_parent_embedding_list_of_cycle_is_cached(self):
+        emb_module.parent_cache.clear()
+        embedding, _ = emb_module.create_embedding_list(self.cycle_labels, self.cycle_edges)
+        parent = emb_module.parent_embedding_list(embedding)
+        self.assertIs(emb_module.parent_embedding_list(embedding), parent)
+        self.assertEqual(emb_module.parent_cache.info()[:2], (1, 1))
+
+    def test_tree_embedding_list_starts_with_parent(self):
+        labels = (0, 0, 3, 4)
+        edges = ((0, 1, 0), (0, 2, 13), (0, 3, 14))
+        embedding, order = emb_module.create_embedding_list(labels, edges)
+
+        # The node discovered last is the leaf labeled 4
+        self.assertEqual(labels[order[-1]], 4)
+        self.assertEqual(emb_module.parent_embedding_list(embedding),
+                         emb_module.create_embedding_list((0, 0, 3), ((0, 1, 0), (0, 2, 13)))[0])
+
+        self.assertEqual(emb_module.create_embedding_list(labels, edges, prefix=embedding[:-1]),
+                         emb_module.create_embedding_list(labels, edges))
+        self.assertEqual(emb_module.create_embedding_list(labels, edges, prefix=(0, (0, 1, 13, 3))),
+                         None)
         
\ No newline at end of file
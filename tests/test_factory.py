@@ -2,6 +2,7 @@
 import unittest
 import networkx as nx
 import gaston_py.factory as factory
+import gaston_py.graph as graph_module
 from gaston_py.node import Node
 from gaston_py.path import Path
 from gaston_py.tree import Tree
@@ -18,16 +19,18 @@ class FactoryTestCase(unittest.TestCase):
         graph.add_node(4, label=4)
         graph.add_edge(1, 3, label=13)
         graph.add_edge(3, 4, label=34)
-        self.small_graph = nx.freeze(graph)
+        self.small_graph = graph_module.from_nx_graphs([graph])[0]
 
     def test_initial_node_fragments(self):
         node_fragments = factory.initial_node_fragments([self.small_graph])
         self.assertTrue(all(isinstance(x, Node) for x in node_fragments))
 
     def test_apply_refinement_func_creates_paths_from_nodes(self):
-        prev_fragment = Node(1, self.small_graph)
-        edge = (1, 2)
-        fragment = factory.apply_refinement(prev_fragment, edge,
+        prev_fragment = next(factory.initial_node_fragments([self.small_graph]))
+        refinement, extensions = next((refinement, extensions) for refinement, extensions
+                                      in factory.refinements(prev_fragment).items()
+                                      if refinement[3] == prev_fragment.node_labels[0])
+        fragment = factory.apply_refinement(prev_fragment, refinement, extensions,
                                             dont_generate_cycles=False, dont_generate_trees=False)
         self.assertTrue(isinstance(fragment, Path))
-        
\ No newline at end of file
+        self.assertEqual(fragment.frequency, 1)
\ No newline at end of file
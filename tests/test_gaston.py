@@ -1,7 +1,13 @@
 
+import subprocess
+import sys
 import unittest
 import networkx as nx
-from gaston_py.gaston import gaston
+from gaston_py.gaston import gaston, iter_frequent_subgraphs
+import gaston_py.embedding as embedding
+import gaston_py.graph as graph_module
+import gaston_py.search as search
+from gaston_py.search import Modes
 
 class GastonTestCase(unittest.TestCase):
 
@@ -12,7 +18,8 @@ class GastonTestCase(unittest.TestCase):
     def test_gaston_with_small_dataset(self):
 
         frequent_output = gaston(min_support=6,
-                                 input_file=GastonTestCase.SMALL_DATASET)
+                                 input_file=GastonTestCase.SMALL_DATASET,
+                                 support_counting='occurrence')
 
         self.assertTrue(all(isinstance(key, tuple) for key in frequent_output.keys()))
         self.assertTrue(all(isinstance(value, tuple) for value in frequent_output.values()))
@@ -24,12 +31,170 @@ class GastonTestCase(unittest.TestCase):
             self.assertTrue(isinstance(frequency, int))
             self.assertTrue(frequency >= 0)
 
+    def test_rejects_support_above_one_when_counting_transactions(self):
+        with self.assertRaises(ValueError):
+            gaston(min_support=6, input_file=GastonTestCase.SMALL_DATASET)
+
     def test_does_not_generate_unwanted_graph_types(self):
         frequent_output = gaston(min_support=0.95,
                                  input_file=GastonTestCase.SMALL_DATASET,
+                                 support_counting='occurrence',
                                  dont_generate_trees=True,
                                  dont_generate_cycles=True)
 
         unwanted_graph_types = set(['Tree', 'Cycle'])
         for _, graph_type, _ in frequent_output.values():
             self.assertTrue(graph_type not in unwanted_graph_types)
+
+    def test_dfs_search_order_finds_same_subgraphs(self):
+        bfs_output = gaston(min_support=3, input_file=GastonTestCase.SMALL_DATASET,
+                            support_counting='occurrence')
+        dfs_output = gaston(min_support=3, input_file=GastonTestCase.SMALL_DATASET,
+                            support_counting='occurrence', search_order='dfs')
+
+        self.assertEqual(list(bfs_output), list(dfs_output))
+        for key, (nx_graph, graph_type, frequency) in bfs_output.items():
+            dfs_graph, dfs_graph_type, dfs_frequency = dfs_output[key]
+            self.assertEqual((graph_type, frequency), (dfs_graph_type, dfs_frequency))
+            self.assertEqual(sorted(nx_graph.edges()), sorted(dfs_graph.edges()))
+
+    def test_parallel_search_splits_branches_into_tasks(self):
+        serial_output = gaston(min_support=0.5, input_file=GastonTestCase.MEDIUM_DATASET)
+
+        task_seconds, search.TASK_SECONDS = search.TASK_SECONDS, 0
+        try:
+            parallel_output = gaston(min_support=0.5, input_file=GastonTestCase.MEDIUM_DATASET,
+                                     workers=2)
+        finally:
+            search.TASK_SECONDS = task_seconds
+
+        self.assertEqual({key: value[1:] for key, value in serial_output.items()},
+                         {key: value[1:] for key, value in parallel_output.items()})
+
+    def test_parallel_search_finds_same_subgraphs(self):
+        serial_output = gaston(min_support=3, input_file=GastonTestCase.SMALL_DATASET,
+                               support_counting='occurrence')
+        parallel_output = gaston(min_support=3, input_file=GastonTestCase.SMALL_DATASET,
+                                 support_counting='occurrence', workers=2)
+
+        self.assertEqual(list(serial_output), list(parallel_output))
+        for key, (nx_graph, graph_type, frequency) in serial_output.items():
+            parallel_graph, parallel_graph_type, parallel_frequency = parallel_output[key]
+            self.assertEqual((graph_type, frequency), (parallel_graph_type, parallel_frequency))
+            self.assertEqual(sorted(nx_graph.edges()), sorted(parallel_graph.edges()))
+
+    def test_mining_does_not_import_matplotlib(self):
+        script = ("import sys\n"
+                  "import gaston_py.command_line\n"
+                  "assert 'networkx' not in sys.modules\n"
+                  "gaston_py.gaston.gaston(0.5, '{}')\n"
+                  "assert 'matplotlib' not in sys.modules\n").format(GastonTestCase.MEDIUM_DATASET)
+        subprocess.check_call([sys.executable, '-c', script])
+
+    def test_iter_frequent_subgraphs_without_nx_graphs_does_not_import_networkx(self):
+        script = ("import sys\n"
+                  "import gaston_py.gaston\n"
+                  "output = list(gaston_py.gaston.iter_frequent_subgraphs(0.5, '{}', "
+                  "nx_graphs=False))\n"
+                  "assert len(output) > 0\n"
+                  "assert 'networkx' not in sys.modules\n").format(GastonTestCase.MEDIUM_DATASET)
+        subprocess.check_call([sys.executable, '-c', script])
+
+        def undirected(edges):
+            return sorted((min(u, v), max(u, v), label) for u, v, label in edges)
+
+        frequent_output = gaston(min_support=0.5, input_file=GastonTestCase.MEDIUM_DATASET)
+        for embedding_list, (nodes, edges), _, _ in iter_frequent_subgraphs(
+                min_support=0.5, input_file=GastonTestCase.MEDIUM_DATASET, nx_graphs=False):
+            nx_nodes, nx_edges = graph_module.graph_structure(frequent_output[embedding_list][0])
+            self.assertEqual(sorted(nodes), sorted(nx_nodes))
+            self.assertEqual(undirected(edges), undirected(nx_edges))
+
+    def test_iter_frequent_subgraphs_yields_the_output_of_gaston(self):
+        frequent_output = gaston(min_support=0.5, input_file=GastonTestCase.MEDIUM_DATASET)
+        frequent_subgraphs = iter_frequent_subgraphs(min_support=0.5,
+                                                     input_file=GastonTestCase.MEDIUM_DATASET)
+
+        key, _, graph_type, frequency = next(frequent_subgraphs)
+        self.assertEqual(frequent_output[key][1:], (graph_type, frequency))
+        found_subgraphs = {key: (graph_type, frequency)
+                           for key, _, graph_type, frequency in frequent_subgraphs}
+        found_subgraphs[key] = (graph_type, frequency)
+        self.assertEqual(found_subgraphs,
+                         {key: value[1:] for key, value in frequent_output.items()})
+
+    def test_size_limits_leave_out_larger_subgraphs(self):
+        frequent_output = gaston(min_support=0.3, input_file=GastonTestCase.MEDIUM_DATASET)
+        for limit in (1, 3):
+            limited_edges = gaston(min_support=0.3, input_file=GastonTestCase.MEDIUM_DATASET,
+                                   modes=Modes(max_edges=limit))
+            limited_nodes = gaston(min_support=0.3, input_file=GastonTestCase.MEDIUM_DATASET,
+                                   modes=Modes(max_nodes=limit), search_order='dfs')
+
+            self.assertEqual(set(limited_edges), set(
+                key for key, (nx_graph, _, _) in frequent_output.items()
+                if nx_graph.number_of_edges() <= limit))
+            self.assertEqual(set(limited_nodes), set(
+                key for key, (nx_graph, _, _) in frequent_output.items()
+                if nx_graph.number_of_nodes() <= limit))
+
+    def test_top_k_finds_the_most_frequent_subgraphs(self):
+        frequent_output = gaston(min_support=0.3, input_file=GastonTestCase.MEDIUM_DATASET)
+        frequencies = sorted((frequency for _, _, frequency in frequent_output.values()),
+                             reverse=True)
+
+        for top_k, workers in ((5, 1), (20, 1), (20, 2)):
+            top_output = gaston(min_support=0.01, input_file=GastonTestCase.MEDIUM_DATASET,
+                                modes=Modes(top_k=top_k), workers=workers)
+            self.assertEqual(set(top_output), set(
+                key for key, (_, _, frequency) in frequent_output.items()
+                if frequency >= frequencies[top_k - 1]))
+
+    def test_closed_and_maximal_leave_out_subgraphs_of_larger_ones(self):
+        frequent_output = gaston(min_support=0.3, input_file=GastonTestCase.MEDIUM_DATASET)
+        not_closed, not_maximal = set(), set()
+        for supergraph, (_, _, frequency) in frequent_output.items():
+            for subgraph in _one_edge_subgraphs(supergraph):
+                not_maximal.add(subgraph)
+                if frequent_output[subgraph][2] == frequency:
+                    not_closed.add(subgraph)
+
+        for search_order, workers in (('bfs', 1), ('dfs', 1), ('bfs', 2)):
+            closed_output = gaston(min_support=0.3, input_file=GastonTestCase.MEDIUM_DATASET,
+                                   search_order=search_order, workers=workers,
+                                   modes=Modes(closed=True))
+            maximal_output = gaston(min_support=0.3, input_file=GastonTestCase.MEDIUM_DATASET,
+                                    search_order=search_order, workers=workers,
+                                    modes=Modes(maximal=True))
+            self.assertEqual(set(closed_output), set(frequent_output) - not_closed)
+            self.assertEqual(set(maximal_output), set(frequent_output) - not_maximal)
+
+    def test_closed_maximal_and_top_k_need_transaction_counting(self):
+        with self.assertRaises(ValueError):
+            gaston(min_support=6, input_file=GastonTestCase.SMALL_DATASET,
+                   support_counting='occurrence', modes=Modes(closed=True))
+        with self.assertRaises(ValueError):
+            gaston(min_support=6, input_file=GastonTestCase.SMALL_DATASET,
+                   support_counting='occurrence', modes=Modes(top_k=5))
+        with self.assertRaises(ValueError):
+            Modes(top_k=5, maximal=True)
+
+def _one_edge_subgraphs(embedding_list):
+    """ Returns the embedding lists of the connected patterns with one edge less. """
+    node_labels, edges = embedding.pattern_structure(embedding_list)
+    if len(edges) == 1:
+        return set((node_labels[node],) for node in range(2))
+
+    subgraphs = set()
+    for removed in range(len(edges)):
+        rest = edges[:removed] + edges[removed + 1:]
+        nodes = sorted(set(node for u, v, _ in rest for node in (u, v)))
+        graph = nx.Graph([(u, v) for u, v, _ in rest])
+        if len(nodes) < len(node_labels) - 1 or not nx.is_connected(graph):
+            continue
+
+        positions = {node: position for position, node in enumerate(nodes)}
+        subgraphs.add(embedding.create_embedding_list(
+            tuple(node_labels[node] for node in nodes),
+            tuple((positions[u], positions[v], label) for u, v, label in rest))[0])
+    return subgraphs
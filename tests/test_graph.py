@@ -0,0 +1,71 @@
+import bz2
+import gzip
+import lzma
+import os
+import shutil
+import tempfile
+import unittest
+import gaston_py.graph as graph_module
+
+class SubgraphTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.graph = graph_module.LineGraph(1, ['a'], [1, 2, 3], [0, 0, 0],
+                                            [(0, 1, 0), (1, 2, 0), (0, 2, 0)])
+
+    def subgraph(self, edges):
+        return graph_module.Subgraph.from_edges(self.graph, (0, 1, 2), edges)
+
+    def test_subgraphs_with_the_same_edges_are_equal(self):
+        first, second = self.subgraph([0, 1]), self.subgraph([1, 0])
+        self.assertEqual(first.key, second.key)
+        self.assertEqual(first, second)
+        self.assertEqual(hash(first), hash(second))
+        self.assertEqual(len(set([first, second, self.subgraph([0, 2])])), 2)
+
+    def test_colliding_keys_are_told_apart_by_edges(self):
+        first, second = self.subgraph([0, 1]), self.subgraph([0, 2])
+        second.key = first.key
+        self.assertEqual(hash(first), hash(second))
+        self.assertNotEqual(first, second)
+        self.assertEqual(len(set([first, second])), 2)
+
+class ReadLineGraphsTestCase(unittest.TestCase):
+
+    DATASET = 'test_files/medium_chemical.txt'
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.expected_graphs = graph_module.read_line_graphs(ReadLineGraphsTestCase.DATASET)
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def assertSameGraphs(self, graphs):
+        self.assertEqual(len(graphs), len(self.expected_graphs))
+        for graph, expected_graph in zip(graphs, self.expected_graphs):
+            self.assertEqual((graph.id, graph.labels, graph.node_ids, graph.embeddings),
+                             (expected_graph.id, expected_graph.labels, expected_graph.node_ids,
+                              expected_graph.embeddings))
+            self.assertEqual(list(graph.edge_nodes), list(expected_graph.edge_nodes))
+            self.assertEqual(list(graph.neighbors), list(expected_graph.neighbors))
+
+    def test_compressed_files_are_read_like_plain_files(self):
+        with open(ReadLineGraphsTestCase.DATASET, 'rb') as f:
+            text = f.read()
+
+        for extension, module in (('.gz', gzip), ('.bz2', bz2), ('.xz', lzma)):
+            file_path = os.path.join(self.directory, 'medium_chemical.txt' + extension)
+            with module.open(file_path, 'wb') as f:
+                f.write(text)
+            self.assertSameGraphs(graph_module.read_line_graphs(file_path))
+
+    def test_graphs_split_across_chunks_are_read_like_one_chunk(self):
+        chunk_size = graph_module.PARSE_CHUNK_SIZE
+        graph_module.PARSE_CHUNK_SIZE = 1000
+        try:
+            self.assertSameGraphs(graph_module.read_line_graphs(ReadLineGraphsTestCase.DATASET))
+            self.assertSameGraphs(graph_module.read_line_graphs(ReadLineGraphsTestCase.DATASET,
+                                                                workers=2))
+        finally:
+            graph_module.PARSE_CHUNK_SIZE = chunk_size
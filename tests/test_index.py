@@ -0,0 +1,95 @@
+import os
+import shutil
+import tempfile
+import unittest
+from gaston_py import index
+from gaston_py.gaston import gaston, sweep
+from gaston_py.search import Modes
+from gaston_py.stats import SearchStats
+
+class OutputTestCase(unittest.TestCase):
+
+    def assertSameOutput(self, frequent_output, expected_output):
+        self.assertEqual(list(frequent_output), list(expected_output))
+        for embedding_list, (nx_graph, graph_type, frequency) in frequent_output.items():
+            expected_graph, expected_type, expected_frequency = expected_output[embedding_list]
+            self.assertEqual((graph_type, frequency), (expected_type, expected_frequency))
+            self.assertEqual(sorted(nx_graph.nodes(data=True)),
+                             sorted(expected_graph.nodes(data=True)))
+            self.assertEqual(sorted(nx_graph.edges(data=True)),
+                             sorted(expected_graph.edges(data=True)))
+
+class PatternIndexTestCase(OutputTestCase):
+
+    MEDIUM_DATASET = 'test_files/medium_chemical.txt'
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.index_file = os.path.join(self.directory, 'medium_chemical.idx')
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_query_answers_higher_supports_like_gaston(self):
+        sweep([0.5, 0.3], PatternIndexTestCase.MEDIUM_DATASET, self.index_file)
+        pattern_index = index.read_index(self.index_file)
+
+        for min_support in (0.3, 0.4, 0.5, 0.9):
+            self.assertSameOutput(pattern_index.query(min_support),
+                                  gaston(min_support, PatternIndexTestCase.MEDIUM_DATASET))
+        with self.assertRaises(ValueError):
+            pattern_index.query(0.2)
+
+    def test_closed_index_answers_like_closed_gaston(self):
+        pattern_index = sweep([0.3], PatternIndexTestCase.MEDIUM_DATASET, self.index_file,
+                              modes=Modes(closed=True))
+        self.assertSameOutput(pattern_index.query(0.4),
+                              gaston(0.4, PatternIndexTestCase.MEDIUM_DATASET,
+                                     modes=Modes(closed=True)))
+
+    def test_read_index_rejects_other_files(self):
+        with self.assertRaises(ValueError):
+            index.read_index(PatternIndexTestCase.MEDIUM_DATASET)
+
+class IncrementalMiningTestCase(OutputTestCase):
+
+    CHEMICAL_DATASET = 'test_files/Chemical_340.txt'
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.input_file = os.path.join(self.directory, 'Chemical_340.txt')
+        self.state_file = os.path.join(self.directory, 'Chemical_340.state')
+        with open(IncrementalMiningTestCase.CHEMICAL_DATASET) as f:
+            self.graphs = ['t #' + graph for graph in f.read().split('t #')[1:]]
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def write_graphs(self, count):
+        with open(self.input_file, 'w') as f:
+            f.write(''.join(self.graphs[:count]))
+
+    def test_appended_graphs_give_the_output_of_a_full_run(self):
+        for count in (300, 320, 340):
+            self.write_graphs(count)
+            frequent_output = gaston(0.2, self.input_file, state_file=self.state_file)
+            self.assertSameOutput(frequent_output, gaston(0.2, self.input_file))
+        self.assertEqual(index.read_index(self.state_file).graph_count, 340)
+
+    def test_state_is_built_with_a_memory_limit(self):
+        self.write_graphs(300)
+        stats = SearchStats()
+        self.assertSameOutput(gaston(0.2, self.input_file, state_file=self.state_file,
+                                     stats=stats, memory_limit=1),
+                              gaston(0.2, self.input_file))
+        self.assertGreater(stats.counters['spilled_fragments'], 0)
+
+    def test_state_is_rebuilt_when_earlier_graphs_change(self):
+        self.write_graphs(300)
+        gaston(0.2, self.input_file, state_file=self.state_file, modes=Modes(max_nodes=4))
+        with open(self.input_file, 'w') as f:
+            f.write(''.join(self.graphs[40:]))
+        self.assertSameOutput(gaston(0.2, self.input_file, state_file=self.state_file,
+                                     modes=Modes(max_nodes=4)),
+                              gaston(0.2, self.input_file, modes=Modes(max_nodes=4)))
+        self.assertEqual(index.read_index(self.state_file).graph_count, 300)
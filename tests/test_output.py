@@ -0,0 +1,36 @@
+import unittest
+import networkx as nx
+from gaston_py import output
+
+class OutputTestCase(unittest.TestCase):
+
+    def labeled_path(self, node_ids, label):
+        graph = nx.Graph()
+        for node_id in node_ids:
+            graph.add_node(node_id, label=label)
+        for u, v in zip(node_ids, node_ids[1:]):
+            graph.add_edge(u, v, label=label)
+        return graph
+
+    def test_select_drawings_caps_or_keeps_most_frequent(self):
+        frequent_output = {('a',): ('graph a', 'Node', 3), ('b',): ('graph b', 'Node', 5),
+                           ('c',): ('graph c', 'Node', 4)}
+        select = output.select_drawings
+
+        self.assertEqual([drawing[0] for drawing in select(frequent_output)], [0, 1, 2])
+        self.assertEqual([drawing[0] for drawing in select(frequent_output, 2)], [0, 1])
+        self.assertEqual([drawing[0] for drawing in select(frequent_output, top_frequency=2)],
+                         [1, 2])
+        self.assertEqual([drawing[0] for drawing in select(frequent_output, 1, top_frequency=2)],
+                         [1])
+
+    def test_layout_cache_maps_layout_onto_graphs_of_the_same_shape(self):
+        layout_cache = output.LayoutCache()
+        first = self.labeled_path([1, 2, 3], 'a')
+        second = self.labeled_path([7, 5, 6], 'b')
+        first_layout, second_layout = layout_cache.layout(first), layout_cache.layout(second)
+
+        self.assertEqual(len(layout_cache.layouts), 1)
+        self.assertEqual(sorted(map(tuple, first_layout.values())),
+                         sorted(map(tuple, second_layout.values())))
+        self.assertEqual(tuple(first_layout[2]), tuple(second_layout[5]))
@@ -0,0 +1,43 @@
+import unittest
+import networkx as nx
+from gaston_py import search, factory, pruning
+import gaston_py.graph as graph_module
+
+class PruningTestCase(unittest.TestCase):
+
+    def setUp(self):
+        graphs = []
+        for graph_id in range(2):
+            graph = nx.Graph(id=graph_id)
+            graph.add_node(1, label='a')
+            graph.add_node(2, label='a')
+            graph.add_node(3, label='b')
+            graph.add_edge(1, 2, label='x')
+            graph.add_edge(2, 3, label='x' if graph_id == 0 else 'y')
+            graphs.append(graph)
+        graphs[1].add_node(4, label='c')
+        graphs[1].add_edge(3, 4, label='x')
+        self.graphs = graph_module.from_nx_graphs(graphs)
+
+    def test_label_support_counts_graphs_or_occurrences(self):
+        node_support, edge_support = pruning.label_support(self.graphs)
+        self.assertEqual(node_support, {0: 2, 1: 2, 2: 1})
+        self.assertEqual(edge_support[(0, 3, 0)], 2)
+        self.assertEqual(edge_support[(0, 3, 1)], 1)
+
+        node_support, _ = pruning.label_support(self.graphs, 'occurrence')
+        self.assertEqual(node_support[0], 4)
+
+    def test_prune_graphs_returns_views_and_keeps_graphs(self):
+        views = pruning.prune_graphs(self.graphs, 2)
+        self.assertEqual([view.number_of_nodes() for view in views], [3, 3])
+        self.assertEqual([view.number_of_edges() for view in views], [1, 1])
+        self.assertEqual([graph.number_of_nodes() for graph in self.graphs], [3, 4])
+        self.assertEqual([graph.number_of_edges() for graph in self.graphs], [2, 3])
+
+    def test_find_frequent_subgraphs_does_not_change_source_graphs(self):
+        for min_freq in (2, 1):
+            output = search.find_frequent_subgraphs(factory.initial_node_fragments(self.graphs),
+                                                    min_freq)
+        self.assertEqual(len(output), 11)
+        self.assertEqual([graph.number_of_edges() for graph in self.graphs], [2, 3])
@@ -0,0 +1,66 @@
+import unittest
+from gaston_py.gaston import gaston
+from gaston_py.sampling import MIN_SUPPORT_RATIO, Sample, mine_sample
+from gaston_py.search import Modes
+
+class SampleTestCase(unittest.TestCase):
+
+    CHEMICAL_DATASET = 'test_files/Chemical_340.txt'
+
+    @classmethod
+    def setUpClass(cls):
+        cls.expected_output = gaston(0.2, SampleTestCase.CHEMICAL_DATASET)
+
+    def assertExactSubset(self, frequent_output):
+        for embedding_list, (_, graph_type, frequency) in frequent_output.items():
+            self.assertIn(embedding_list, self.expected_output)
+            _, expected_type, expected_frequency = self.expected_output[embedding_list]
+            self.assertEqual((graph_type, frequency), (expected_type, expected_frequency))
+
+    def test_sampled_subgraphs_are_frequent_with_exact_frequencies(self):
+        sample = Sample(0.8, confidence=0.85, seed=1)
+        frequent_output = gaston(0.2, SampleTestCase.CHEMICAL_DATASET, sample=sample, workers=2)
+
+        self.assertExactSubset(frequent_output)
+        self.assertEqual(list(frequent_output), [embedding_list for embedding_list
+                                                 in self.expected_output
+                                                 if embedding_list in frequent_output])
+        self.assertEqual((sample.graph_count, sample.sample_size), (340, 272))
+        self.assertFalse(sample.exact)
+        self.assertEqual(sample.false_positives, sample.candidates - len(frequent_output))
+        self.assertGreater(sample.estimated_false_negative_rate, 0)
+        self.assertLess(sample.estimated_false_negative_rate, 0.1)
+
+    def test_subgraphs_missed_by_the_sample_are_reported(self):
+        sample = Sample(0.1, confidence=0.05, seed=5)
+        frequent_output = gaston(0.2, SampleTestCase.CHEMICAL_DATASET, sample=sample)
+
+        self.assertExactSubset(frequent_output)
+        self.assertGreater(len(sample.missed), 0)
+        for embedding_list, frequency in sample.missed.items():
+            self.assertNotIn(embedding_list, frequent_output)
+            self.assertLessEqual(frequency, self.expected_output[embedding_list][2])
+
+    def test_sample_with_a_collapsed_support_is_mined_exactly(self):
+        sample = Sample(0.3, confidence=0.9, seed=1)
+        frequent_output = gaston(0.2, SampleTestCase.CHEMICAL_DATASET, sample=sample)
+
+        self.assertLess(sample.lowered_support(0.2), MIN_SUPPORT_RATIO * 0.2)
+        self.assertTrue(sample.exact)
+        self.assertEqual(list(frequent_output), list(self.expected_output))
+        self.assertExactSubset(frequent_output)
+        self.assertEqual((sample.candidates, sample.false_positives), (len(frequent_output), 0))
+
+    def test_sample_of_no_graphs_finds_nothing(self):
+        sample = Sample(0.5)
+        self.assertEqual(mine_sample([], 0.2, sample), {})
+        self.assertEqual((sample.graph_count, sample.sample_size, sample.candidates), (0, 0, 0))
+
+    def test_invalid_samples_are_rejected(self):
+        with self.assertRaises(ValueError):
+            Sample(0)
+        with self.assertRaises(ValueError):
+            Sample(0.5, confidence=1)
+        with self.assertRaises(ValueError):
+            gaston(0.2, SampleTestCase.CHEMICAL_DATASET, sample=Sample(0.5),
+                   modes=Modes(closed=True))
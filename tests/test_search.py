@@ -2,6 +2,7 @@
 import unittest
 import networkx as nx
 from gaston_py import search, factory
+import gaston_py.graph as graph_module
 
 class SearchTestCase(unittest.TestCase):
 
@@ -13,13 +14,14 @@ class SearchTestCase(unittest.TestCase):
         graph_a.add_node(1, label=0)
         graph_a.add_node(2, label=0)
         graph_a.add_edge(1, 2, label=0)
-        self.tiny_graph = nx.freeze(graph_a)
+        self.tiny_graph = graph_module.from_nx_graphs([graph_a])[0]
 
         graph_b = nx.Graph(graph_a)
         graph_b.add_node(3, label=3)
         graph_b.add_edge(1, 3, label=13)
         graph_b.add_edge(2, 3, label=23)
-        self.small_graph = nx.freeze(graph_b)
+        self.small_graph = graph_module.from_nx_graphs([graph_b])[0]
+        self.graphs = (graph_a, graph_b)
     
     def test_find_frequent_subgraphs_in_tiny_graph(self):
 
@@ -28,12 +30,46 @@ class SearchTestCase(unittest.TestCase):
 
         expected_frequencies = {(0,): 2, (0, 0, 0): 1}
 
+        fragments = factory.initial_node_fragments(input_graphs)
+        frequent_output = search.find_frequent_subgraphs(fragments, min_freq,
+                                                         support_counting='occurrence')
+        frequencies = {embedding: frequent_output[embedding][2] for embedding in frequent_output}
+
+        self.assertEqual(frequencies, expected_frequencies)
+
+    def test_checked_min_frequency(self):
+        self.assertEqual(search.checked_min_frequency(0.25, 10), 2)
+        self.assertEqual(search.checked_min_frequency(0.01, 10), 1)
+        self.assertEqual(search.checked_min_frequency(6, 1, 'occurrence'), 6)
+        with self.assertRaises(ValueError):
+            search.checked_min_frequency(6, 1)
+
+    def test_transaction_support_counts_graphs(self):
+
+        min_freq = 2
+        input_graphs = graph_module.from_nx_graphs([self.graphs[0], self.graphs[1]])
+
+        expected_frequencies = {(0,): 2, (0, 0, 0): 2}
+
         fragments = factory.initial_node_fragments(input_graphs)
         frequent_output = search.find_frequent_subgraphs(fragments, min_freq)
         frequencies = {embedding: frequent_output[embedding][2] for embedding in frequent_output}
 
         self.assertEqual(frequencies, expected_frequencies)
 
+    def test_self_loops_are_not_refined(self):
+        # Both graphs are two A nodes joined by a y edge, and graph 1 has an x
+        # self-loop on node 0
+        input_graphs = [graph_module.LineGraph(graph_id, ['A', 'y', 'x'], [0, 1], [0, 0],
+                                               edges, index=graph_id)
+                        for graph_id, edges in ((0, [(0, 1, 1)]), (1, [(0, 1, 1), (0, 0, 2)]))]
+
+        fragments = factory.initial_node_fragments(input_graphs)
+        frequent_output = search.find_frequent_subgraphs(fragments, 1)
+        frequencies = {embedding: frequent_output[embedding][2] for embedding in frequent_output}
+
+        self.assertEqual(frequencies, {('A',): 2, ('A', 'y', 'A'): 2})
+
     def test_find_frequent_subgraphs_in_small_graph(self):
 
         min_freq = 0
@@ -44,8 +80,7 @@ class SearchTestCase(unittest.TestCase):
             (0, 0, 0): 1,
             (0, 0, 0, 13, 3): 1,
             (0, 0, 0, 23, 3): 1,
-            # (0, 0, 0, 13, 3, 23, 3): 1,
-            (0, 0, 0, 23, 3, 13, 0): 1,
+            (0, (0, 1, 0, 0), (1, 2, 13, 3), (2, 0, 23, 0)): 1,
             (0, 13, 3): 1,
             (0, 13, 3, 23, 0): 1,
             (0, 23, 3): 1,
@@ -53,7 +88,8 @@ class SearchTestCase(unittest.TestCase):
         }
 
         initial_fragments = factory.initial_node_fragments(input_graphs)
-        frequent_output = search.find_frequent_subgraphs(initial_fragments, min_freq)
+        frequent_output = search.find_frequent_subgraphs(initial_fragments, min_freq,
+                                                         support_counting='occurrence')
         frequencies = {embedding: frequent_output[embedding][2] for embedding in frequent_output}
 
         # print(frequencies)
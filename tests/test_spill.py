@@ -0,0 +1,80 @@
+import itertools
+import os
+import unittest
+from gaston_py import spill
+from gaston_py.checkpoint import Checkpoint
+from gaston_py.gaston import gaston, iter_frequent_subgraphs
+from gaston_py.stats import SearchStats
+
+class QueuedFragment(object):
+
+    def __init__(self, number, occurrence_count):
+        self.number = number
+        self.occurrences = [QueuedOccurrence()] * occurrence_count
+
+class QueuedOccurrence(object):
+    nodes = (0, 1)
+
+def pack(fragment):
+    return fragment.number, len(fragment.occurrences)
+
+def unpack(packed_fragment):
+    return QueuedFragment(*packed_fragment)
+
+class SpillingQueueTestCase(unittest.TestCase):
+
+    MEDIUM_DATASET = 'test_files/medium_chemical.txt'
+
+    def setUp(self):
+        self.budget = spill.MemoryBudget(3 * spill.estimated_bytes(QueuedFragment(0, 10)))
+        self.budget.segment_bytes = 20
+
+    def tearDown(self):
+        self.budget.remove()
+
+    def test_fragments_leave_in_the_order_they_were_appended(self):
+        queue = spill.SpillingQueue(self.budget, pack, unpack)
+        numbers = itertools.count()
+        popped = []
+        for _ in range(3):
+            for _ in range(7):
+                queue.append(QueuedFragment(next(numbers), 10))
+            self.assertEqual([fragment.number for fragment in queue],
+                             list(range(len(popped), len(popped) + len(queue))))
+            for _ in range(4):
+                popped.append(queue.popleft().number)
+        while len(queue) > 0:
+            popped.append(queue.popleft().number)
+
+        self.assertEqual(popped, list(range(21)))
+        self.assertGreater(self.budget.spilled, 0)
+        self.assertEqual(self.budget.used, 0)
+        self.assertEqual(self.budget.peak_used, self.budget.limit)
+        with self.assertRaises(IndexError):
+            queue.popleft()
+
+    def test_spilled_search_finds_the_same_subgraphs(self):
+        expected_output = gaston(0.3, SpillingQueueTestCase.MEDIUM_DATASET)
+        stats = SearchStats()
+        frequent_output = gaston(0.3, SpillingQueueTestCase.MEDIUM_DATASET, stats=stats,
+                                 memory_limit=1)
+        self.assertEqual([(embedding_list, graph_type, frequency)
+                          for embedding_list, (_, graph_type, frequency)
+                          in frequent_output.items()],
+                         [(embedding_list, graph_type, frequency)
+                          for embedding_list, (_, graph_type, frequency)
+                          in expected_output.items()])
+        self.assertEqual(stats.counters['spilled_fragments'], len(expected_output))
+
+    def test_spilled_search_resumes_from_a_checkpoint(self):
+        checkpoint_file = os.path.join(self.budget.directory, 'medium_chemical.ckpt')
+        frequent_subgraphs = iter_frequent_subgraphs(
+            0.3, SpillingQueueTestCase.MEDIUM_DATASET,
+            checkpoint=Checkpoint(checkpoint_file, interval=7), memory_limit=1)
+        list(itertools.islice(frequent_subgraphs, 200))
+
+        frequent_output = gaston(0.3, SpillingQueueTestCase.MEDIUM_DATASET,
+                                 checkpoint=Checkpoint(checkpoint_file, resume=True),
+                                 memory_limit=1)
+        self.assertEqual(list(frequent_output),
+                         list(gaston(0.3, SpillingQueueTestCase.MEDIUM_DATASET)))
@@ -0,0 +1,55 @@
+import unittest
+from gaston_py.gaston import gaston
+from gaston_py.level import Level
+from gaston_py.stats import SearchStats
+
+class SearchStatsTestCase(unittest.TestCase):
+
+    MEDIUM_DATASET = 'test_files/medium_chemical.txt'
+
+    def test_counts_do_not_depend_on_search_order_or_workers(self):
+        stats = SearchStats()
+        frequent_output = gaston(0.5, SearchStatsTestCase.MEDIUM_DATASET, stats=stats)
+        dfs_stats = SearchStats()
+        gaston(0.5, SearchStatsTestCase.MEDIUM_DATASET, search_order='dfs', stats=dfs_stats)
+        parallel_stats = SearchStats()
+        gaston(0.5, SearchStatsTestCase.MEDIUM_DATASET, workers=2, stats=parallel_stats)
+
+        mined = sum(level_counters['mined'] for level_counters in stats.levels.values())
+        self.assertEqual(mined, len(frequent_output))
+        self.assertGreater(stats.counters['refinements'], 0)
+        self.assertGreater(stats.levels['PATH']['peak_queue'], 0)
+        for other_stats in (dfs_stats, parallel_stats):
+            self.assertEqual(other_stats.counters, stats.counters)
+            self.assertEqual({name: level_counters['mined']
+                              for name, level_counters in other_stats.levels.items()},
+                             {name: level_counters['mined']
+                              for name, level_counters in stats.levels.items()})
+        self.assertEqual(set(['parse', 'prune', 'NODE', 'PATH', 'TREE']) - set(stats.seconds),
+                         set())
+        self.assertGreater(stats.as_dict()['memory']['rss'], 0)
+
+    def test_callback_is_called_while_mining_and_at_the_end(self):
+        mined_counts = []
+
+        def callback(stats):
+            mined_counts.append(sum(level_counters['mined']
+                                    for level_counters in stats.levels.values()))
+
+        stats = SearchStats(callback, callback_interval=5)
+        frequent_output = gaston(0.5, SearchStatsTestCase.MEDIUM_DATASET, stats=stats)
+        self.assertEqual(mined_counts, [5, 10, 15, len(frequent_output)])
+
+    def test_merge_adds_counts_and_keeps_the_largest_peaks(self):
+        stats = SearchStats()
+        for queue_sizes in ((3, 7, 2), (5, 4)):
+            worker_stats = SearchStats()
+            for queue_size in queue_sizes:
+                worker_stats.enqueued(Level.TREE, queue_size)
+            worker_stats.mined(Level.TREE)
+            worker_stats.peak('queued_bytes', sum(queue_sizes))
+            stats.merge(worker_stats.as_dict())
+
+        self.assertEqual(stats.levels['TREE'], {'enqueued': 5, 'mined': 2, 'peak_queue': 7})
+        self.assertEqual(stats.memory['queued_bytes'], 12)
+        self.assertEqual(stats.levels['PATH'], {})